@@ -0,0 +1,311 @@
+import hashlib
+from datetime import date, datetime, timedelta, timezone
+from functools import wraps
+
+from flask import Blueprint, current_app, jsonify, make_response, request, session
+
+import cache
+import calendar_feed
+import changes
+import jobs
+import scheduling
+import search
+import versions
+from availability import RULE_TABLES, windows as office_hours
+from models import HOD, Staff, HODAvailability, Meeting
+from pagination import current_page, page_size
+from queries import MEETING_KEYS, meetings_with_people, meeting_filter_args, staff_picker, hod_picker
+from stats import principal_stats, hod_stats, staff_stats
+
+api = Blueprint("api", __name__, url_prefix="/api/v1")
+
+
+# ----------------------------------------------------
+# AUTH
+# ----------------------------------------------------
+@api.before_request
+def require_login():
+    if not session.get("role"):
+        return jsonify(error="login required"), 401
+
+
+def roles_required(*roles):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if session.get("role") not in roles:
+                return jsonify(error="forbidden"), 403
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ----------------------------------------------------
+# CONDITIONAL GET
+# The ETag is derived from the change counters of the
+# tables a response reads, plus who is asking and what
+# they asked for. A matching If-None-Match (or a fresh
+# If-Modified-Since) answers 304 after a single PK
+# lookup on table_version, before the view runs.
+# ----------------------------------------------------
+def conditional(*tables):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            snap = versions.snapshot(*tables)
+            key = repr((
+                sorted((name, v) for name, (v, _) in snap.items()),
+                session.get("role"), session.get("id"),
+                request.full_path, date.today().isoformat(),
+            ))
+            etag = hashlib.sha1(key.encode()).hexdigest()
+
+            stamps = [stamp for _, stamp in snap.values() if stamp is not None]
+            last_modified = max(stamps).replace(tzinfo=timezone.utc, microsecond=0) if stamps else None
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            else:
+                since = request.if_modified_since
+                not_modified = bool(last_modified and since and last_modified <= since)
+
+            if not_modified:
+                response = make_response("", 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
+
+
+# ----------------------------------------------------
+# SERIALIZERS
+# ----------------------------------------------------
+def _meeting_json(m):
+    return {
+        "id": m.id,
+        "staff_id": m.staff_id,
+        "staff": m.staff.name if m.staff else None,
+        "hod_id": m.hod_id,
+        "hod": m.hod.name if m.hod else None,
+        "date": m.date.isoformat(),
+        "time": m.time.strftime("%H:%M"),
+        "agenda": m.agenda,
+        "status": m.status
+    }
+
+
+def _availability_json(a):
+    return {
+        "id": a.id,
+        "hod_id": a.hod_id,
+        "date": a.date.isoformat(),
+        "start_time": a.start_time.strftime("%H:%M"),
+        "end_time": a.end_time.strftime("%H:%M")
+    }
+
+
+def _page_json(page, serialize):
+    return jsonify(items=[serialize(item) for item in page], next=page.next_cursor)
+
+
+# ----------------------------------------------------
+# MEETINGS
+# ----------------------------------------------------
+@api.route("/meetings")
+@conditional("meeting", "staff", "hod")
+def meetings():
+    role = session["role"]
+
+    if role == "hod":
+        criteria = (Meeting.hod_id == session["id"],)
+    elif role == "staff":
+        criteria = (Meeting.staff_id == session["id"],)
+    else:
+        criteria = ()
+
+    return _page_json(current_page(meetings_with_people(*criteria), MEETING_KEYS), _meeting_json)
+
+
+# ----------------------------------------------------
+# MEETING CHANGES (delta sync)
+# ?since=<sync_token from the last call>; no token
+# starts from the beginning. Keep calling with the new
+# token while "more" is true.
+# ----------------------------------------------------
+@api.route("/meetings/changes")
+@roles_required("hod", "staff")
+@conditional("meeting", "review", "staff", "hod")
+def meeting_changes():
+    try:
+        since = calendar_feed.parse_since(request.args["since"]) if "since" in request.args else None
+    except ValueError:
+        return jsonify(error="since must be a sync_token from this endpoint"), 400
+
+    rows, token, more = calendar_feed.changed(session["role"], session["id"], since, page_size())
+    return jsonify(
+        items=[changes.as_json(row) for row in rows],
+        sync_token=token,
+        more=more
+    )
+
+
+# ----------------------------------------------------
+# AVAILABILITY
+# HODs see their own slots; others pass ?hod_id=
+# ----------------------------------------------------
+@api.route("/availability")
+@conditional("hod_availability")
+def availability():
+    if session["role"] == "hod":
+        hod_id = session["id"]
+    else:
+        hod_id = request.args.get("hod_id", type=int)
+        if hod_id is None:
+            return jsonify(error="hod_id is required"), 400
+
+    query = HODAvailability.query.filter_by(hod_id=hod_id)
+    return _page_json(current_page(query, [HODAvailability.date, HODAvailability.id]), _availability_json)
+
+
+def _window_args():
+    start_day = datetime.strptime(request.args["from"], "%Y-%m-%d").date() \
+        if "from" in request.args else date.today()
+    days = max(1, min(request.args.get("days", 7, type=int), 90))
+    if start_day > date.max - timedelta(days=days):
+        raise ValueError("from is out of range")
+    return start_day, days
+
+
+@api.route("/hods/<int:hod_id>/windows")
+@conditional("hod_availability", *RULE_TABLES)
+def hod_windows(hod_id):
+    try:
+        start_day, days = _window_args()
+    except ValueError:
+        return jsonify(error="from must be YYYY-MM-DD"), 400
+
+    found = office_hours(hod_id, start_day, start_day + timedelta(days=days - 1))
+    return jsonify(
+        hod_id=hod_id,
+        windows=[
+            {
+                "date": day.isoformat(),
+                "start_time": start.strftime("%H:%M"),
+                "end_time": end.strftime("%H:%M"),
+                "rule_id": rule_id
+            }
+            for day, start, end, rule_id in found
+        ]
+    )
+
+
+@api.route("/hods/<int:hod_id>/free-slots")
+@conditional("hod_availability", *RULE_TABLES, "meeting")
+def free_slots(hod_id):
+    try:
+        start_day, days = _window_args()
+    except ValueError:
+        return jsonify(error="from must be YYYY-MM-DD"), 400
+
+    limit = max(1, min(request.args.get("limit", 10, type=int), 100))
+
+    slots = scheduling.free_slots(hod_id, start_day, days=days, limit=limit)
+    return jsonify(
+        hod_id=hod_id,
+        duration_minutes=current_app.config["MEETING_DURATION_MINUTES"],
+        slots=[s.isoformat(timespec="minutes") for s in slots]
+    )
+
+
+# ----------------------------------------------------
+# PEOPLE
+# ----------------------------------------------------
+@api.route("/staff")
+@roles_required("principal")
+@conditional("staff")
+def staff():
+    return _page_json(current_page(staff_picker(), [Staff.id]), lambda row: row._asdict())
+
+
+@api.route("/hods")
+@conditional("hod", "department")
+def hods():
+    return _page_json(current_page(hod_picker(), [HOD.id]), lambda row: row._asdict())
+
+
+@api.route("/search/people")
+@roles_required("principal")
+@conditional("staff", "hod", "department")
+def search_people():
+    role = request.args.get("role")
+    if role not in (None, "staff", "hod"):
+        return jsonify(error="role must be staff or hod"), 400
+
+    limit = max(1, min(request.args.get("limit", 8, type=int), 50))
+    return jsonify(items=search.autocomplete(request.args.get("q", ""), role=role, limit=limit))
+
+
+@api.route("/search/meetings")
+@roles_required("principal")
+@conditional("meeting", "review", "staff", "hod")
+def search_meetings():
+    page = max(request.args.get("page", 1, type=int), 1)
+    results, has_more = search.search_meetings(
+        request.args.get("q", ""), page, **meeting_filter_args(request.args)
+    )
+
+    items = []
+    for m in results:
+        item = _meeting_json(m)
+        item["review"] = {
+            "summary": m.review.summary,
+            "improvements": m.review.improvements,
+            "suggestions": m.review.suggestions
+        } if m.review else None
+        items.append(item)
+    return jsonify(items=items, next=page + 1 if has_more else None)
+
+
+# ----------------------------------------------------
+# CACHE METRICS
+# ----------------------------------------------------
+@api.route("/cache/stats")
+@roles_required("principal")
+def cache_stats():
+    return jsonify(cache.stats())
+
+
+# ----------------------------------------------------
+# BACKGROUND JOB PROGRESS
+# Principals see every job; others only their own.
+# ----------------------------------------------------
+@api.route("/jobs/<int:job_id>")
+def job_status(job_id):
+    job = jobs.get(job_id)
+    mine = job is not None and job["created_by"] == [session["role"], session.get("id")]
+    if job is None or not (mine or session["role"] == "principal"):
+        return jsonify(error="not found"), 404
+
+    return jsonify(job)
+
+
+# ----------------------------------------------------
+# DASHBOARD STATS
+# ----------------------------------------------------
+@api.route("/stats")
+@conditional("hod", "staff", "meeting", "blocklist")
+def stats():
+    role = session["role"]
+
+    if role == "principal":
+        return jsonify(principal_stats())
+    if role == "hod":
+        return jsonify(hod_stats(session["id"], date.today()))
+    return jsonify(staff_stats(session["id"], date.today()))
@@ -1,51 +1,119 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash
-from datetime import datetime, date
+from flask import Blueprint, Flask, abort, current_app, g, render_template, request, redirect, url_for, session, flash
+from flask_migrate import Migrate
+import flask_migrate
+import click
+import os
+import time
+from sqlalchemy import inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+from datetime import datetime, date, timedelta
 from models import (
-    db, Principal, HOD, Staff, Department,
-    HODAvailability, Meeting, Review, Blocklist
+    db, Principal, HOD, Staff,
+    HODAvailability, AvailabilityRule, Meeting, Review, Blocklist
 )
-
-app = Flask(__name__)
-app.config.update(
-    SECRET_KEY="svit_secret_key",
-    SQLALCHEMY_DATABASE_URI="sqlite:///csms.db",
-    SQLALCHEMY_TRACK_MODIFICATIONS=False
+from blocklist import blocklist_cache
+from identity import identity_cache
+from stats import principal_stats, hod_stats, staff_stats
+from queries import (
+    MEETING_KEYS, meetings_with_people, meetings_with_review, hods_with_department,
+    meeting_filter_args, meeting_criteria,
+    resolve_names, ref_label, init_lazy_load_guard
+)
+from pagination import current_page
+import pagination
+import meetings
+import reports
+import search
+import export
+import calendar_feed
+import importer
+import scheduling
+import availability
+import database
+import sessions
+import cache
+import instrumentation
+import jobs
+import outbox
+import push
+import idempotency
+from idempotency import idempotent
+from api import api
+from config import get_config
+
+main = Blueprint("main", __name__, cli_group=None)
+
+migrate = Migrate(
+    # found from any working directory (benchmarks, cron, ...)
+    directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations"),
+    render_as_batch=True,
+    # FTS shadow tables are managed by search.py, not autogenerate
+    include_name=lambda name, type_, parents: not (type_ == "table" and search.is_fts_table(name))
 )
 
-db.init_app(app)
 
 # ----------------------------------------------------
-# INITIAL DB SETUP
+# APP FACTORY
+# config: a config.py class, its name, or None for
+# $CSMS_CONFIG (default "development"). Neither import
+# nor create_app() touches the database; schema and
+# default rows come from "flask init-db".
 # ----------------------------------------------------
-with app.app_context():
-    db.create_all()
+def create_app(config=None):
+    app = Flask(__name__)
+    app.config.from_object(config if isinstance(config, type) else get_config(config))
+
+    database.init_app(app)
+    migrate.init_app(app, db)
+    init_lazy_load_guard(app)
+    instrumentation.init_app(app)
+    blocklist_cache.init_app(app)
+    identity_cache.init_app(app)
+    cache.init_app(app)
+    sessions.init_app(app)
+    scheduling.init_app(app)
+    jobs.init_app(app)
+    outbox.init_app(app)
+    pagination.init_app(app)
+    calendar_feed.init_app(app)
+    push.init_app(app)
+    idempotency.init_app(app)
+    app.register_blueprint(main)
+    app.register_blueprint(api)
+
+    return app
 
-    # Create default principal
-    if not Principal.query.first():
-        admin = Principal(
-            name="Principal",
-            email="principal@csms.com",
-            password="admin123"
-        )
-        db.session.add(admin)
-        db.session.commit()
 
-    # Insert Departments
-    if Department.query.count() == 0:
-        for dept in ["Computer Science", "Mechanical", "Civil", "Electronics", "Management"]:
-            db.session.add(Department(name=dept))
-        db.session.commit()
+# ----------------------------------------------------
+# FORM FIELDS
+# for request.form.get(name, type=...): a missing or
+# malformed value comes back as None
+# ----------------------------------------------------
+def _form_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def _form_time(value):
+    return datetime.strptime(value, "%H:%M").time()
+
+
+def _form_ids(name):
+    # None if any of the posted values isn't an id
+    values = request.form.getlist(name)
+    ids = request.form.getlist(name, type=int)
+    return ids if len(ids) == len(values) else None
 
 
 # ----------------------------------------------------
 # HOME + LOGOUT
 # ----------------------------------------------------
-@app.route("/")
+@main.route("/")
 def home():
     return render_template("home.html")
 
 
-@app.route("/logout")
+@main.route("/logout")
 def logout():
     session.clear()
     flash("Logged out successfully!", "info")
@@ -55,7 +123,7 @@ def logout():
 # ----------------------------------------------------
 # LOGIN ROUTES
 # ----------------------------------------------------
-@app.route("/login/principal", methods=["GET", "POST"])
+@main.route("/login/principal", methods=["GET", "POST"])
 def login_principal():
     if request.method == "POST":
         email = request.form.get("email")
@@ -74,7 +142,7 @@ def login_principal():
     return render_template("login_principal.html")
 
 
-@app.route("/login/hod", methods=["GET", "POST"])
+@main.route("/login/hod", methods=["GET", "POST"])
 def login_hod():
     if request.method == "POST":
         email = request.form.get("email")
@@ -89,8 +157,7 @@ def login_hod():
             return redirect("/login/hod")
 
         # Check if blacklisted
-        black = Blocklist.query.filter_by(role="hod", ref_id=u.id).first()
-        if black:
+        if blocklist_cache.contains("hod", u.id):
             flash("You are BLACKLISTED by Principal!", "danger")
             return redirect("/login/hod")
 
@@ -104,7 +171,7 @@ def login_hod():
     return render_template("login_hod.html")
 
 
-@app.route("/login/staff", methods=["GET", "POST"])
+@main.route("/login/staff", methods=["GET", "POST"])
 def login_staff():
     if request.method == "POST":
         email = request.form.get("email")
@@ -117,7 +184,7 @@ def login_staff():
             return redirect("/login/staff")
 
         # Check blacklist
-        if Blocklist.query.filter_by(role="staff", ref_id=u.id).first():
+        if blocklist_cache.contains("staff", u.id):
             flash("You are BLACKLISTED. Contact Principal.", "danger")
             return redirect("/login/staff")
 
@@ -132,7 +199,7 @@ def login_staff():
 # ----------------------------------------------------
 # REGISTRATION ROUTES (PUBLIC)
 # ----------------------------------------------------
-@app.route("/register/hod", methods=["GET", "POST"])
+@main.route("/register/hod", methods=["GET", "POST"])
 def register_hod_public():
     if session.get("role"):
         return redirect("/")
@@ -157,10 +224,10 @@ def register_hod_public():
         flash("HOD registered successfully!", "success")
         return redirect("/login/hod")
 
-    return render_template("register_hod.html", departments=Department.query.all())
+    return render_template("register_hod.html", departments=cache.departments())
 
 
-@app.route("/register/staff", methods=["GET", "POST"])
+@main.route("/register/staff", methods=["GET", "POST"])
 def register_staff_public():
     if session.get("role"):
         return redirect("/")
@@ -192,33 +259,32 @@ def register_staff_public():
 # ----------------------------------------------------
 # PRINCIPAL DASHBOARD
 # ----------------------------------------------------
-@app.route("/dashboard/principal")
+@main.route("/dashboard/principal")
 def dashboard_principal():
     if session.get("role") != "principal":
         return redirect("/login/principal")
 
     return render_template(
         "principal_dashboard.html",
-        hod_count=HOD.query.count(),
-        staff_count=Staff.query.count(),
-        meeting_count=Meeting.query.count(),
-        blacklist_count=Blocklist.query.count(),
-        meetings=Meeting.query.order_by(Meeting.date.desc()).limit(10).all()
+        # not executed here: the template only iterates it on a fragment-cache miss
+        meetings=meetings_with_people().order_by(Meeting.date.desc()).limit(10),
+        **principal_stats()
     )
 
 
 # ----------------------------------------------------
 # PRINCIPAL — MANAGE HODS
 # ----------------------------------------------------
-@app.route("/principal/hods")
+@main.route("/principal/hods")
 def principal_hods():
     if session.get("role") != "principal":
         return redirect("/login/principal")
 
-    return render_template("principal_hods.html", hods=HOD.query.all())
+    return render_template("principal_hods.html", hods=current_page(hods_with_department(), [HOD.id]))
 
 
-@app.route("/principal/hods/add", methods=["GET", "POST"])
+@main.route("/principal/hods/add", methods=["GET", "POST"])
+@idempotent("/principal/hods")
 def principal_add_hod():
     if session.get("role") != "principal":
         return redirect("/login/principal")
@@ -237,21 +303,46 @@ def principal_add_hod():
         flash("New HOD added!", "success")
         return redirect("/principal/hods")
 
-    return render_template("principal_add_hod.html", departments=Department.query.all())
+    return render_template("principal_add_hod.html", departments=cache.departments())
+
+
+# ----------------------------------------------------
+# PRINCIPAL — BULK CSV IMPORT
+# ----------------------------------------------------
+@main.route("/principal/import", methods=["GET", "POST"])
+def principal_import():
+    if session.get("role") != "principal":
+        return redirect("/login/principal")
+
+    report = None
+    if request.method == "POST":
+        kind = request.form.get("kind")
+        upload = request.files.get("file")
+        if kind not in importer.KINDS or not upload or not upload.filename:
+            flash("Choose what to import and a CSV file.", "danger")
+            return redirect("/principal/import")
+
+        report = importer.import_upload(kind, upload, dry_run=bool(request.form.get("dry_run")))
+        if report.failed:
+            flash(report.failed, "danger")
+            return redirect("/principal/import")
+
+    return render_template("principal_import.html", report=report)
 
 
 # ----------------------------------------------------
 # PRINCIPAL — MANAGE STAFF
 # ----------------------------------------------------
-@app.route("/principal/staff")
+@main.route("/principal/staff")
 def principal_staff():
     if session.get("role") != "principal":
         return redirect("/login/principal")
 
-    return render_template("principal_staff.html", staff=Staff.query.all())
+    return render_template("principal_staff.html", staff=current_page(Staff.query, [Staff.id]))
 
 
-@app.route("/principal/staff/add", methods=["GET", "POST"])
+@main.route("/principal/staff/add", methods=["GET", "POST"])
+@idempotent("/principal/staff")
 def principal_add_staff():
     if session.get("role") != "principal":
         return redirect("/login/principal")
@@ -272,10 +363,58 @@ def principal_add_staff():
     return render_template("principal_add_staff.html")
 
 
+# ----------------------------------------------------
+# PRINCIPAL — SEARCH STAFF / HODS
+# ----------------------------------------------------
+def _search_page(role, template):
+    q = request.args.get("q", "").strip()
+    page = max(request.args.get("page", 1, type=int), 1)
+    results, has_more = search.search_people(role, q, page) if q else ([], False)
+
+    return render_template(template, q=q, results=results, page=page, has_more=has_more)
+
+
+@main.route("/principal/search/staff")
+def principal_search_staff():
+    if session.get("role") != "principal":
+        return redirect("/login/principal")
+
+    return _search_page("staff", "principal_search_staff.html")
+
+
+@main.route("/principal/search/hod")
+def principal_search_hod():
+    if session.get("role") != "principal":
+        return redirect("/login/principal")
+
+    return _search_page("hod", "principal_search_hod.html")
+
+
+# ----------------------------------------------------
+# PRINCIPAL — SEARCH MEETING AGENDAS / REVIEWS
+# ----------------------------------------------------
+@main.route("/principal/search/meetings")
+def principal_search_meetings():
+    if session.get("role") != "principal":
+        return redirect("/login/principal")
+
+    q = request.args.get("q", "").strip()
+    page = max(request.args.get("page", 1, type=int), 1)
+    filters = meeting_filter_args(request.args)
+    results, has_more = search.search_meetings(q, page, **filters) if q else ([], False)
+
+    return render_template(
+        "principal_search_meetings.html",
+        q=q, filters=filters, results=results, page=page, has_more=has_more,
+        staff_list=cache.staff_picker_first_page(),
+        hod_list=cache.hod_picker_first_page()
+    )
+
+
 # ----------------------------------------------------
 # PRINCIPAL — BLACKLIST HOD
 # ----------------------------------------------------
-@app.route("/principal/hods/blacklist/<int:hod_id>")
+@main.route("/principal/hods/blacklist/<int:hod_id>")
 def principal_blacklist_hod(hod_id):
     if session.get("role") != "principal":
         return redirect("/login/principal")
@@ -288,7 +427,16 @@ def principal_blacklist_hod(hod_id):
 
     bl = Blocklist(role="hod", ref_id=hod.id, reason="Misconduct")
     db.session.add(bl)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # a concurrent submission got there first
+        db.session.rollback()
+        flash("HOD already blacklisted.", "warning")
+        return redirect("/principal/hods")
+    blocklist_cache.add("hod", hod.id)
+    identity_cache.invalidate("hod", hod.id)
+    sessions.revoke_user("hod", hod.id)
 
     flash(f"HOD '{hod.name}' blacklisted!", "danger")
     return redirect("/principal/hods")
@@ -297,7 +445,7 @@ def principal_blacklist_hod(hod_id):
 # ----------------------------------------------------
 # PRINCIPAL — BLACKLIST STAFF
 # ----------------------------------------------------
-@app.route("/principal/staff/blacklist/<int:staff_id>")
+@main.route("/principal/staff/blacklist/<int:staff_id>")
 def principal_blacklist_staff(staff_id):
     if session.get("role") != "principal":
         return redirect("/login/principal")
@@ -310,7 +458,16 @@ def principal_blacklist_staff(staff_id):
 
     bl = Blocklist(role="staff", ref_id=st.id, reason="Misconduct")
     db.session.add(bl)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # a concurrent submission got there first
+        db.session.rollback()
+        flash("Staff already blacklisted.", "warning")
+        return redirect("/principal/staff")
+    blocklist_cache.add("staff", st.id)
+    identity_cache.invalidate("staff", st.id)
+    sessions.revoke_user("staff", st.id)
 
     flash(f"Staff '{st.name}' blacklisted!", "danger")
     return redirect("/principal/staff")
@@ -319,31 +476,23 @@ def principal_blacklist_staff(staff_id):
 # ----------------------------------------------------
 # PRINCIPAL — VIEW BLACKLIST
 # ----------------------------------------------------
-@app.route("/principal/blacklist")
+@main.route("/principal/blacklist")
 def principal_blacklist():
     if session.get("role") != "principal":
         return redirect("/login/principal")
 
     entries = Blocklist.query.all()
-    view_rows = []
-
-    for e in entries:
-        name = "Unknown"
-
-        if e.role == "hod":
-            hod = HOD.query.get(e.ref_id)
-            name = hod.name if hod else f"HOD (ID {e.ref_id})"
-
-        elif e.role == "staff":
-            st = Staff.query.get(e.ref_id)
-            name = st.name if st else f"Staff (ID {e.ref_id})"
+    names = resolve_names((e.role, e.ref_id) for e in entries)
 
-        view_rows.append({
+    view_rows = [
+        {
             "id": e.id,
-            "name": name,
+            "name": ref_label(names, e.role, e.ref_id),
             "role": e.role,
             "reason": e.reason
-        })
+        }
+        for e in entries
+    ]
 
     return render_template("principal_blacklist.html", bl=view_rows)
 
@@ -351,40 +500,60 @@ def principal_blacklist():
 # ----------------------------------------------------
 # HOD DASHBOARD
 # ----------------------------------------------------
-@app.route("/dashboard/hod")
+@main.route("/dashboard/hod")
 def dashboard_hod():
     if session.get("role") != "hod":
         return redirect("/login/hod")
 
-    hod = HOD.query.get(session["id"])
+    hod = g.user
     today = date.today()
 
+    last_day = today + timedelta(days=current_app.config["OFFICE_HOURS_DAYS"] - 1)
+
     return render_template(
         "hod_dashboard.html",
-        today_meetings=Meeting.query.filter_by(hod_id=hod.id, date=today).count(),
-        upcoming_meetings=Meeting.query.filter(Meeting.hod_id == hod.id, Meeting.date > today).count(),
-        completed_meetings=Meeting.query.filter_by(hod_id=hod.id, status="Completed").count(),
-        availability=hod.availabilities,
-        meetings=Meeting.query.filter_by(hod_id=hod.id).order_by(Meeting.date).all()
+        office_hours=availability.windows(hod.id, today, last_day),
+        rules=availability.active_rules(hod.id, today),
+        calendar_url=calendar_url("hod", hod.id),
+        today=today,
+        meetings=current_page(meetings_with_people(Meeting.hod_id == hod.id), MEETING_KEYS),
+        **hod_stats(hod.id, today)
     )
 
 
 # ----------------------------------------------------
 # HOD — ADD AVAILABILITY
 # ----------------------------------------------------
-@app.route("/hod/availability/add", methods=["GET", "POST"])
+@main.route("/hod/availability/add", methods=["GET", "POST"])
+@idempotent("/dashboard/hod")
 def add_availability():
     if session.get("role") != "hod":
         return redirect("/login/hod")
 
     if request.method == "POST":
-        a = HODAvailability(
-            hod_id=session["id"],
-            date=datetime.strptime(request.form["date"], "%Y-%m-%d").date(),
-            start_time=datetime.strptime(request.form["start_time"], "%H:%M").time(),
-            end_time=datetime.strptime(request.form["end_time"], "%H:%M").time()
-        )
-        db.session.add(a)
+        day = request.form.get("date", type=_form_date)
+        start_time = request.form.get("start_time", type=_form_time)
+        end_time = request.form.get("end_time", type=_form_time)
+        repeat = request.form.get("repeat", "none")
+        until = request.form.get("until", type=_form_date) if repeat in availability.REPEATS else None
+        if day is None or start_time is None or end_time is None or (until is None and request.form.get("until")):
+            flash("Please enter a date, a start time and an end time.", "danger")
+            return redirect("/hod/availability/add")
+
+        problem = availability.check_window(day, start_time, end_time, until)
+        if problem:
+            flash(problem, "danger")
+            return redirect("/hod/availability/add")
+
+        if repeat in availability.REPEATS:
+            availability.add_rule(session["id"], day, start_time, end_time, repeat, until=until)
+        else:
+            db.session.add(HODAvailability(
+                hod_id=session["id"],
+                date=day,
+                start_time=start_time,
+                end_time=end_time
+            ))
         db.session.commit()
 
         flash("Availability added.", "success")
@@ -393,71 +562,140 @@ def add_availability():
     return render_template("hod_add_availability.html")
 
 
+# ----------------------------------------------------
+# HOD — RECURRING AVAILABILITY
+# Skip one occurrence, or stop the rule from today on.
+# ----------------------------------------------------
+def _own_rule(rule_id):
+    rule = db.session.get(AvailabilityRule, rule_id)
+    if rule is None or rule.hod_id != session["id"]:
+        abort(404)
+    return rule
+
+
+@main.route("/hod/availability/rules/<int:rule_id>/skip", methods=["POST"])
+def skip_availability(rule_id):
+    if session.get("role") != "hod":
+        return redirect("/login/hod")
+
+    day = datetime.strptime(request.form["date"], "%Y-%m-%d").date()
+    if availability.skip(_own_rule(rule_id), day):
+        db.session.commit()
+        flash(f"Office hours on {day} cancelled.", "success")
+    else:
+        flash("That date is not one of the rule's days.", "warning")
+    return redirect("/dashboard/hod")
+
+
+@main.route("/hod/availability/rules/<int:rule_id>/end", methods=["POST"])
+def end_availability(rule_id):
+    if session.get("role") != "hod":
+        return redirect("/login/hod")
+
+    availability.end_rule(_own_rule(rule_id), date.today())
+    db.session.commit()
+    flash("Recurring office hours stopped.", "success")
+    return redirect("/dashboard/hod")
+
+
 # ----------------------------------------------------
 # STAFF DASHBOARD
 # ----------------------------------------------------
-@app.route("/dashboard/staff")
+@main.route("/dashboard/staff")
 def dashboard_staff():
     if session.get("role") != "staff":
         return redirect("/login/staff")
 
-    st = Staff.query.get(session["id"])
+    st = g.user
+    today = date.today()
 
     return render_template(
         "staff_dashboard.html",
-        meetings=Meeting.query.filter_by(staff_id=st.id).all(),
-        total=Meeting.query.filter_by(staff_id=st.id).count(),
-        upcoming=Meeting.query.filter(Meeting.staff_id == st.id, Meeting.date >= date.today()).count(),
-        completed=Meeting.query.filter_by(staff_id=st.id, status="Completed").count()
+        meetings=current_page(meetings_with_review(Meeting.staff_id == st.id), MEETING_KEYS),
+        calendar_url=calendar_url("staff", st.id),
+        today=today,
+        **staff_stats(st.id, today)
     )
 
 
 # ----------------------------------------------------
 # STAFF — REQUEST MEETING
 # ----------------------------------------------------
-@app.route("/meeting/request", methods=["GET", "POST"])
+@main.route("/meeting/request", methods=["GET", "POST"])
+@idempotent("/dashboard/staff")
 def request_meeting():
     if session.get("role") != "staff":
         return redirect("/login/staff")
 
     if request.method == "POST":
+        hod_id = request.form.get("hod_id", type=int)
+        meeting_date = request.form.get("date", type=_form_date)
+        meeting_time = request.form.get("time", type=_form_time)
+        if hod_id is None or meeting_date is None or meeting_time is None:
+            flash("Please choose a HOD, a date and a time.", "danger")
+            return redirect("/meeting/request")
+
+        problem = scheduling.check_request(hod_id, meeting_date, meeting_time)
+        if problem:
+            flash(problem, "danger")
+            return redirect("/meeting/request")
+
         m = Meeting(
             staff_id=session["id"],
-            hod_id=request.form["hod_id"],
-            date=datetime.strptime(request.form["date"], "%Y-%m-%d").date(),
-            time=datetime.strptime(request.form["time"], "%H:%M").time(),
+            hod_id=hod_id,
+            date=meeting_date,
+            time=meeting_time,
             agenda=request.form["agenda"],
             status="Requested"
         )
         db.session.add(m)
+        reports.record_created(m.staff_id, m.hod_id)
         db.session.commit()
 
         flash("Meeting requested!", "success")
         return redirect("/dashboard/staff")
 
-    return render_template("staff_request_meeting.html", hods=HOD.query.all())
+    return render_template("staff_request_meeting.html", hods=cache.hod_picker_first_page())
 
 
 # ----------------------------------------------------
 # HOD — ADD REVIEW
+# One review per meeting. The form carries the meeting
+# version it was opened at: a meeting that has changed
+# since (or is reviewed meanwhile, which the versioned
+# UPDATE or the unique review index catches at commit)
+# is left as it is.
 # ----------------------------------------------------
-@app.route("/meeting/<int:id>/review", methods=["GET", "POST"])
+@main.route("/meeting/<int:id>/review", methods=["GET", "POST"])
+@idempotent("/dashboard/hod")
 def review_meeting(id):
     if session.get("role") != "hod":
         return redirect("/login/hod")
 
-    m = Meeting.query.get_or_404(id)
+    m = meetings_with_people(Meeting.id == id).first_or_404()
 
     if request.method == "POST":
-        r = Review(
+        if m.status == "Completed":
+            flash("This meeting has already been reviewed.", "info")
+            return redirect("/dashboard/hod")
+        if request.form.get("version", m.version, type=int) != m.version:
+            flash("This meeting changed after you opened it; please check it and submit again.", "warning")
+            return redirect(url_for("main.review_meeting", id=id))
+
+        db.session.add(Review(
             meeting_id=id,
             summary=request.form["summary"],
             improvements=request.form["improvements"],
             suggestions=request.form["suggestions"]
-        )
-        db.session.add(r)
+        ))
         m.status = "Completed"
-        db.session.commit()
+        reports.record_completed(m.staff_id, m.hod_id)
+        try:
+            db.session.commit()
+        except (IntegrityError, StaleDataError):
+            db.session.rollback()
+            flash("This meeting has already been reviewed.", "info")
+            return redirect("/dashboard/hod")
 
         flash("Review submitted!", "success")
         return redirect("/dashboard/hod")
@@ -468,99 +706,339 @@ def review_meeting(id):
 # ----------------------------------------------------
 # PRINCIPAL — SELECTIVE & BULK MEETING SCHEDULER (ONLY COPY LEFT)
 # ----------------------------------------------------
-@app.route("/principal/meeting/bulk", methods=["GET", "POST"])
+@main.route("/principal/meeting/bulk", methods=["GET", "POST"])
+@idempotent("/dashboard/principal")
 def principal_bulk_meeting_fixed():
     if session.get("role") != "principal":
         return redirect("/login/principal")
 
-    all_staff = Staff.query.all()
-    all_hods = HOD.query.all()
-
     if request.method == "POST":
         mode = request.form.get("mode")
-        date_str = request.form.get("date")
-        time_str = request.form.get("time")
+        date_val = request.form.get("date", type=_form_date)
+        time_val = request.form.get("time", type=_form_time)
         agenda = request.form.get("agenda")
 
-        if not date_str or not time_str:
+        if date_val is None or time_val is None:
             flash("Please select date and time.", "danger")
             return redirect("/principal/meeting/bulk")
+        if not agenda:
+            flash("Please enter an agenda.", "danger")
+            return redirect("/principal/meeting/bulk")
+
+        staff_ids = _form_ids("staff_ids")
+        hod_ids = _form_ids("hod_ids")
+        if staff_ids is None or hod_ids is None:
+            flash("The selection contains an invalid user.", "danger")
+            return redirect("/principal/meeting/bulk")
 
-        date_val = datetime.strptime(date_str, "%Y-%m-%d").date()
-        time_val = datetime.strptime(time_str, "%H:%M").time()
-
-        selected_staff = []
-        selected_hods = []
-
-        if mode == "all_staff":
-            selected_staff = all_staff
-
-        elif mode == "all_hod":
-            selected_hods = all_hods
-
-        elif mode == "all_both":
-            selected_staff = all_staff
-            selected_hods = all_hods
-
-        elif mode == "selected":
-            staff_ids = request.form.getlist("staff_ids")
-            hod_ids = request.form.getlist("hod_ids")
-
-            if staff_ids:
-                selected_staff = Staff.query.filter(Staff.id.in_(staff_ids)).all()
-            if hod_ids:
-                selected_hods = HOD.query.filter(HOD.id.in_(hod_ids)).all()
-
-        created = 0
-
-        for st in selected_staff:
-            m = Meeting(
-                staff_id=st.id,
-                hod_id=None,
-                date=date_val,
-                time=time_val,
-                agenda=agenda,
-                status="Scheduled"
-            )
-            db.session.add(m)
-            created += 1
-
-        for hd in selected_hods:
-            m = Meeting(
-                staff_id=None,
-                hod_id=hd.id,
-                date=date_val,
-                time=time_val,
-                agenda=agenda,
-                status="Scheduled"
-            )
-            db.session.add(m)
-            created += 1
-
-        if created == 0:
+        if mode not in meetings.MODES or (mode == "selected" and not staff_ids and not hod_ids):
             flash("No users selected.", "warning")
-        else:
-            db.session.commit()
-            flash(f"Meetings scheduled for {created} users!", "success")
+            return redirect("/dashboard/principal")
 
-        return redirect("/dashboard/principal")
+        # the inserts and notifications run in a background job
+        job_id = meetings.enqueue_bulk(
+            mode, date_val, time_val, agenda,
+            staff_ids=staff_ids, hod_ids=hod_ids,
+            created_by=("principal", session["id"])
+        )
+        idempotency.remember(f"/principal/jobs/{job_id}")
+        db.session.commit()
+
+        flash("Scheduling started; this page follows its progress.", "success")
+        return redirect(f"/principal/jobs/{job_id}")
 
     return render_template(
         "principal_bulk_meeting.html",
-        staff_list=all_staff,
-        hod_list=all_hods
+        staff_list=cache.staff_picker_first_page(),
+        hod_list=cache.hod_picker_first_page()
     )
 
 
+# ----------------------------------------------------
+# PRINCIPAL — BACKGROUND JOB PROGRESS
+# ----------------------------------------------------
+@main.route("/principal/jobs/<int:job_id>")
+def principal_job(job_id):
+    if session.get("role") != "principal":
+        return redirect("/login/principal")
+
+    job = jobs.get(job_id)
+    if job is None:
+        abort(404)
+
+    return render_template("principal_job.html", job=job)
+
+
+# ----------------------------------------------------
+# REPORTS
+# ----------------------------------------------------
+@main.route("/principal/reports")
+def principal_report_overview():
+    if session.get("role") != "principal":
+        return redirect("/login/principal")
+
+    return render_template(
+        "principal_report_overview.html",
+        departments=cache.departments(),
+        **reports.overview()
+    )
+
+
+@main.route("/principal/reports/hod/<int:hod_id>")
+def principal_report_hod(hod_id):
+    if session.get("role") != "principal":
+        return redirect("/login/principal")
+
+    hod = hods_with_department(HOD.id == hod_id).first_or_404()
+
+    return render_template(
+        "principal_report_hod.html",
+        hod=hod,
+        meeting_count=reports.counts("hod", hod.id)[0],
+        meetings=current_page(meetings_with_people(Meeting.hod_id == hod.id), MEETING_KEYS)
+    )
+
+
+@main.route("/principal/reports/staff/<int:staff_id>")
+def principal_report_staff(staff_id):
+    if session.get("role") != "principal":
+        return redirect("/login/principal")
+
+    st = Staff.query.get_or_404(staff_id)
+
+    return render_template(
+        "principal_report_staff.html",
+        staff=st,
+        meeting_count=reports.counts("staff", st.id)[0],
+        meetings=current_page(meetings_with_people(Meeting.staff_id == st.id), MEETING_KEYS)
+    )
+
+
+@main.route("/hod/report")
+def hod_report():
+    if session.get("role") != "hod":
+        return redirect("/login/hod")
+
+    hod = hods_with_department(HOD.id == session["id"]).first_or_404()
+    completed = meetings_with_review(Meeting.hod_id == hod.id, Meeting.status == "Completed")
+
+    return render_template(
+        "hod_report.html",
+        hod=hod,
+        meeting_count=reports.counts("hod", hod.id)[0],
+        completed=current_page(completed, MEETING_KEYS)
+    )
+
+
+@main.route("/staff/report")
+def staff_report():
+    if session.get("role") != "staff":
+        return redirect("/login/staff")
+
+    st = Staff.query.get_or_404(session["id"])
+    completed = meetings_with_review(Meeting.staff_id == st.id, Meeting.status == "Completed")
+
+    return render_template(
+        "staff_report.html",
+        staff=st,
+        meeting_count=reports.counts("staff", st.id)[0],
+        completed=current_page(completed, MEETING_KEYS)
+    )
+
+
+# ----------------------------------------------------
+# MEETING HISTORY (with reviews)
+# ----------------------------------------------------
+@main.route("/principal/staff/<int:staff_id>/history")
+def principal_view_history(staff_id):
+    if session.get("role") != "principal":
+        return redirect("/login/principal")
+
+    st = Staff.query.get_or_404(staff_id)
+    history = meetings_with_review(Meeting.staff_id == st.id)
+
+    return render_template(
+        "principal_view_history.html",
+        staff=st,
+        history=current_page(history, MEETING_KEYS)
+    )
+
+
+@main.route("/hod/history")
+def hod_meeting_history():
+    if session.get("role") != "hod":
+        return redirect("/login/hod")
+
+    meetings = meetings_with_review(Meeting.hod_id == session["id"])
+    return render_template("hod_meeting_history.html", meetings=current_page(meetings, MEETING_KEYS))
+
+
+@main.route("/staff/history")
+def staff_history():
+    if session.get("role") != "staff":
+        return redirect("/login/staff")
+
+    meetings = meetings_with_review(Meeting.staff_id == session["id"])
+    return render_template("staff_history.html", meetings=current_page(meetings, MEETING_KEYS))
+
+
+# ----------------------------------------------------
+# EXPORT (streamed CSV / XLSX)
+# HODs and staff only ever get their own meetings.
+# ----------------------------------------------------
+@main.route("/export/meetings.<any(csv, xlsx):fmt>")
+def export_meetings(fmt):
+    role = session.get("role")
+    if not role:
+        return redirect("/")
+
+    filters = meeting_filter_args(request.args)
+    if role == "hod":
+        filters["hod_id"] = session["id"]
+    elif role == "staff":
+        filters["staff_id"] = session["id"]
+
+    return export.export_response(fmt, meeting_criteria(**filters))
+
+
+# ----------------------------------------------------
+# CALENDAR FEEDS (iCalendar, see calendar_feed.py)
+# Calendar clients can't log in: the URL's token is
+# what lets them read one person's meetings.
+# ----------------------------------------------------
+def calendar_url(role, ref_id):
+    return url_for(
+        "main.calendar_feed", role=role, ref_id=ref_id,
+        token=calendar_feed.feed_token(role, ref_id), _external=True
+    )
+
+
+@main.route("/calendar/<any(hod, staff):role>/<int:ref_id>/<token>.ics", endpoint="calendar_feed")
+def calendar_feed_view(role, ref_id, token):
+    if not calendar_feed.valid_token(role, ref_id, token) or blocklist_cache.contains(role, ref_id):
+        abort(404)
+
+    owner = db.session.get(HOD if role == "hod" else Staff, ref_id)
+    if owner is None:
+        abort(404)
+
+    try:
+        return calendar_feed.feed_response(role, ref_id, owner.name)
+    except ValueError:
+        abort(400)
+
+
+# ----------------------------------------------------
+# LIVE MEETING EVENTS (dashboards; see push.py)
+# ----------------------------------------------------
+@main.route("/events/meetings")
+def meeting_events():
+    if not current_app.config["PUSH_ENABLED"]:
+        abort(404)
+    if session.get("role") not in ("hod", "staff") or g.user is None:
+        abort(403)
+
+    since = request.headers.get("Last-Event-ID") or request.args.get("since")
+    if since is not None and not since.isdigit():
+        abort(400)
+
+    return push.event_stream(session["role"], session["id"], int(since) if since is not None else None)
+
+
+# ----------------------------------------------------
+# CLI
+# ----------------------------------------------------
+@main.cli.command("init-db")
+def init_db_command():
+    inspector = inspect(db.engine)
+    if not inspector.has_table(Principal.__tablename__):
+        db.create_all()
+        flask_migrate.stamp()
+    elif inspector.has_table("alembic_version"):
+        flask_migrate.upgrade()
+    else:
+        raise click.ClickException(
+            "This database predates migrations: run 'flask db stamp 5a0f6c1e2b71' "
+            "and 'flask db upgrade' first."
+        )
+
+    added = database.seed()
+    db.session.commit()
+    print(f"Database ready ({added} default rows added).")
+
+
+@main.cli.command("import-csv")
+@click.argument("kind", type=click.Choice(list(importer.KINDS)))
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--dry-run", is_flag=True, help="Validate only, insert nothing.")
+def import_csv_command(kind, path, dry_run):
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        report = importer.import_csv(kind, f, dry_run=dry_run)
+    if report.failed:
+        raise click.ClickException(report.failed)
+
+    for line, message in report.errors:
+        print(f"line {line}: {message}")
+    verb = "would be imported" if dry_run else "imported"
+    count = report.rows - len(report.errors) if dry_run else report.inserted
+    print(f"{count} of {report.rows} {kind} rows {verb}, {len(report.errors)} rejected.")
+
+
+@main.cli.command("rebuild-search")
+def rebuild_search_command():
+    conn = db.session.connection()
+    if conn.dialect.name != "sqlite":
+        print("Full-text search needs SQLite; the in-memory index is used instead.")
+        return
+
+    search.install_fts(conn)
+    search.rebuild_fts(conn)
+    db.session.commit()
+    print("Search index rebuilt.")
+
+
+@main.cli.command("rebuild-reports")
+def rebuild_reports_command():
+    reports.rebuild()
+    db.session.commit()
+    print("Meeting summary rebuilt.")
+
+
+@main.cli.command("run-jobs")
+@click.option("--once", is_flag=True, help="Run what is queued now, then exit.")
+def run_jobs_command(once):
+    if once:
+        print(f"{jobs.run_pending()} job(s) run.")
+        return
+
+    # a dedicated worker process, for deployments with JOB_WORKERS = 0 in the web workers
+    app = current_app._get_current_object()
+    app.config["JOB_WORKERS"] = max(app.config["JOB_WORKERS"], 1)
+    jobs.runner.start(app)
+    print(f"Running jobs with {app.config['JOB_WORKERS']} thread(s); Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+@main.cli.command("prune-idempotency-keys")
+def prune_idempotency_keys_command():
+    removed = idempotency.prune()
+    db.session.commit()
+    print(f"{removed} expired idempotency key(s) removed.")
+
+
 # ----------------------------------------------------
 # ERROR HANDLERS
 # ----------------------------------------------------
-@app.errorhandler(404)
+@main.app_errorhandler(404)
 def error_404(e):
     return render_template("404.html"), 404
 
 
-@app.errorhandler(500)
+@main.app_errorhandler(500)
 def error_500(e):
     return render_template("500.html"), 500
 
@@ -569,4 +1047,5 @@ def error_500(e):
 # RUN SERVER
 # ----------------------------------------------------
 if __name__ == "__main__":
-    app.run(debug=True)
+    create_app().run(debug=True)
+
@@ -0,0 +1,159 @@
+from datetime import timedelta
+
+from sqlalchemy import exists, select, true
+
+from cache import recurrence_cache
+from models import db, AvailabilityException, AvailabilityRule, HODAvailability
+
+# ----------------------------------------------------
+# OFFICE-HOUR WINDOWS
+# A HOD's windows come from one-off hod_availability
+# rows and from recurring rules (weekly or biweekly,
+# minus the dates a rule skips). Rules are stored once
+# and only expanded for the days being asked about; a
+# HOD's rules and the expansions of each window sit in
+# the bounded "recurrence" cache until a rule or an
+# exception changes. Everything that reads
+# availability (dashboards, free slots, conflict checks)
+# goes through windows() / covering(), so one-off and
+# recurring hours are never told apart by the callers.
+# ----------------------------------------------------
+RULE_TABLES = ("availability_rule", "availability_exception")
+
+REPEATS = {"weekly": 1, "biweekly": 2}
+
+
+def occurrences(starts_on, ends_on, interval_weeks, first, last, skipped=()):
+    start = max(first, starts_on)
+    end = last if ends_on is None else min(last, ends_on)
+    step = 7 * interval_weeks
+
+    # first occurrence on or after start
+    day = starts_on + timedelta(days=-(-(start - starts_on).days // step) * step)
+    while day <= end:
+        if day not in skipped:
+            yield day
+        day += timedelta(days=step)
+
+
+def _load_rules(hod_id):
+    rules = db.session.execute(
+        select(
+            AvailabilityRule.id, AvailabilityRule.starts_on, AvailabilityRule.ends_on,
+            AvailabilityRule.interval_weeks, AvailabilityRule.start_time, AvailabilityRule.end_time,
+        )
+        .where(AvailabilityRule.hod_id == hod_id)
+        .order_by(AvailabilityRule.starts_on, AvailabilityRule.start_time)
+    ).all()
+    if not rules:
+        return (), {}
+
+    skipped = {}
+    for rule_id, day in db.session.execute(
+        select(AvailabilityException.rule_id, AvailabilityException.date)
+        .where(AvailabilityException.rule_id.in_([r.id for r in rules]))
+    ):
+        skipped.setdefault(rule_id, set()).add(day)
+    return tuple(rules), {rule_id: frozenset(days) for rule_id, days in skipped.items()}
+
+
+def rules_for(hod_id):
+    # (rules, {rule_id: skipped dates}): a handful of rows per HOD, whatever the window
+    return recurrence_cache.get_or_set(("rules", hod_id), RULE_TABLES, lambda: _load_rules(hod_id))
+
+
+def _expand(hod_id, first, last):
+    rules, skipped = rules_for(hod_id)
+    return tuple(sorted(
+        (day, r.start_time, r.end_time, r.id)
+        for r in rules
+        for day in occurrences(r.starts_on, r.ends_on, r.interval_weeks, first, last, skipped.get(r.id, ()))
+    ))
+
+
+def recurring(hod_id, first, last):
+    return recurrence_cache.get_or_set(
+        ("windows", hod_id, first, last), RULE_TABLES, lambda: _expand(hod_id, first, last)
+    )
+
+
+def windows(hod_id, first, last):
+    # (date, start, end, rule_id) in date/start order; rule_id is None for one-off rows
+    one_off = db.session.execute(
+        select(HODAvailability.date, HODAvailability.start_time, HODAvailability.end_time)
+        .where(HODAvailability.hod_id == hod_id, HODAvailability.date.between(first, last))
+    ).all()
+    return sorted([(day, start, end, None) for day, start, end in one_off] + list(recurring(hod_id, first, last)),
+                  key=lambda w: w[:3])
+
+
+def covering(hod_id, day, start, end):
+    # a SQL condition, so a conflict check still makes one round trip:
+    # true() when a rule covers the time, else an EXISTS over one-off rows
+    if any(s <= start and e >= end for _, s, e, _ in _expand(hod_id, day, day)):
+        return true()
+
+    return exists().where(
+        HODAvailability.hod_id == hod_id,
+        HODAvailability.date == day,
+        HODAvailability.start_time <= start,
+        HODAvailability.end_time >= end,
+    )
+
+
+# ----------------------------------------------------
+# RULE CHANGES (the caller commits)
+# ----------------------------------------------------
+def check_window(day, start_time, end_time, until=None):
+    # a problem to show the HOD, or None; applies to one-off hours too
+    if end_time <= start_time:
+        return "The end time must be after the start time."
+    if until is not None and until < day:
+        return "The repeat end date must not be before the first day."
+    return None
+
+
+def add_rule(hod_id, starts_on, start_time, end_time, repeat, until=None):
+    rule = AvailabilityRule(
+        hod_id=hod_id,
+        starts_on=starts_on,
+        ends_on=until,
+        interval_weeks=REPEATS[repeat],
+        start_time=start_time,
+        end_time=end_time,
+    )
+    db.session.add(rule)
+    return rule
+
+
+def skip(rule, day):
+    if not any(occurrences(rule.starts_on, rule.ends_on, rule.interval_weeks, day, day)):
+        return False
+
+    found = db.session.execute(
+        select(AvailabilityException.id).where(
+            AvailabilityException.rule_id == rule.id, AvailabilityException.date == day
+        )
+    ).scalar()
+    if found is None:
+        db.session.add(AvailabilityException(rule_id=rule.id, date=day))
+    return True
+
+
+def end_rule(rule, today):
+    # past occurrences stay on record; a rule that never ran is simply removed
+    if rule.starts_on >= today:
+        for e in db.session.execute(
+            select(AvailabilityException).where(AvailabilityException.rule_id == rule.id)
+        ).scalars():
+            db.session.delete(e)
+        db.session.delete(rule)
+    else:
+        # a rule that has already ended keeps its earlier end
+        yesterday = today - timedelta(days=1)
+        rule.ends_on = min(rule.ends_on, yesterday) if rule.ends_on else yesterday
+
+
+def active_rules(hod_id, today):
+    rules, _ = rules_for(hod_id)
+    return [r for r in rules if r.ends_on is None or r.ends_on >= today]
@@ -0,0 +1,329 @@
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, time as dtime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert  # noqa: E402
+
+from config import ProductionConfig  # noqa: E402
+
+# ----------------------------------------------------
+# Synthetic campus: departments, HODs, staff, HOD
+# availability (one-off and recurring), meetings and
+# reviews, at any scale from
+# 10k to 10M meetings. The same --seed and --today give
+# the same database, row for row. The schema comes from
+# "flask init-db"; full-text indexes and the meeting
+# summary are rebuilt once at the end instead of row by
+# row through triggers.
+#
+#   python benchmarks/datagen.py --db /tmp/campus.db --meetings 1000000
+# ----------------------------------------------------
+DEPARTMENTS = [
+    "Computer Science", "Mechanical", "Civil", "Electronics", "Management",
+    "Electrical", "Chemical", "Information Technology", "Mathematics", "Physics",
+    "Chemistry", "Humanities", "Biotechnology", "Architecture", "Aeronautics",
+]
+FIRST_NAMES = [
+    "Aarav", "Aditi", "Akash", "Ananya", "Arjun", "Deepa", "Divya", "Farah", "Gaurav", "Isha",
+    "Karan", "Kavya", "Lakshmi", "Manoj", "Meera", "Nikhil", "Nisha", "Pooja", "Rahul", "Ravi",
+    "Riya", "Rohan", "Sanjay", "Sneha", "Suresh", "Tanvi", "Varun", "Vikram", "Yash", "Zara",
+]
+LAST_NAMES = [
+    "Agarwal", "Bhat", "Chopra", "Das", "Desai", "Fernandes", "Gupta", "Iyer", "Joshi", "Kapoor",
+    "Kumar", "Menon", "Mishra", "Nair", "Patel", "Pillai", "Rao", "Reddy", "Shah", "Sharma",
+    "Singh", "Srinivasan", "Thomas", "Verma",
+]
+TOPICS = [
+    "course plan", "lab schedule", "exam moderation", "research proposal", "student feedback",
+    "attendance shortfall", "project guidance", "timetable change", "leave request",
+    "workshop planning", "accreditation documents", "syllabus revision", "placement drive",
+    "budget request", "mentoring", "internal assessment", "conference travel", "lab equipment",
+]
+AGENDAS = ["Discuss {}", "Review of {}", "{} follow-up", "Update on {}", "Planning: {}"]
+SUMMARIES = [
+    "Went through the {} in detail.", "Agreed next steps on {}.", "{} is on track.",
+    "Concerns raised about {}.", "{} approved with minor changes.",
+]
+IMPROVEMENTS = [
+    "Share material earlier", "More student involvement", "Tighter deadlines",
+    "Better documentation", "Clearer grading rubric", None,
+]
+SUGGESTIONS = [
+    "Pair with a senior colleague", "Use the shared drive", "Book the seminar hall early",
+    "Collect feedback mid-semester", "Attend the faculty workshop", None,
+]
+GENDERS = ["Female", "Male"]
+
+CHUNK = 50_000
+PAST_DAYS = 730
+FUTURE_DAYS = 60
+
+
+def scale(meetings):
+    # roughly 40 meetings per staff member and 2,000 per HOD over two years
+    return {
+        "departments": min(len(DEPARTMENTS), max(5, meetings // 100_000 + 5)),
+        "hods": max(10, meetings // 2_000),
+        "staff": max(50, meetings // 40),
+    }
+
+
+def _person(rng, i, role):
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    return {
+        "name": f"{first} {last}",
+        "email": f"{first}.{last}.{i}@{role}.campus.edu".lower(),
+        "password": "password",
+        "phone": f"9{rng.randrange(10**9):09d}",
+    }
+
+
+def _chunks(rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == CHUNK:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _load(conn, table, rows, label):
+    began = time.perf_counter()
+    count = 0
+    for batch in _chunks(rows):
+        conn.execute(insert(table), batch)
+        count += len(batch)
+    print(f"  {label:<14} {count:>10,} rows  {time.perf_counter() - began:6.1f}s")
+    return count
+
+
+def _hods(rng, n, departments):
+    for i in range(1, n + 1):
+        row = _person(rng, i, "hod")
+        row["department_id"] = (i - 1) % departments + 1
+        yield row
+
+
+def _staff(rng, n):
+    for i in range(1, n + 1):
+        row = _person(rng, i, "staff")
+        row["gender"] = rng.choice(GENDERS)
+        row["address"] = f"{rng.randrange(1, 400)} Campus Road, Block {rng.choice('ABCDEF')}"
+        yield row
+
+
+def _availability(rng, hods, today):
+    # three or so office-hour windows a week per HOD, a month back and two ahead
+    first = today - timedelta(days=30)
+    for hod_id in range(1, hods + 1):
+        days = [d for d in range(90 + FUTURE_DAYS) if (first + timedelta(days=d)).weekday() < 5]
+        for d in days:
+            if rng.random() < 0.6:
+                start = rng.randrange(9, 16)
+                yield {
+                    "hod_id": hod_id,
+                    "date": first + timedelta(days=d),
+                    "start_time": dtime(start),
+                    "end_time": dtime(start + rng.choice((1, 2))),
+                }
+
+
+def _rules(hods, today):
+    # a weekly office hour per HOD, a biweekly one for every other HOD;
+    # fixed by hod_id so the seeded data above stays the same
+    first = today - timedelta(days=90)
+    for hod_id in range(1, hods + 1):
+        starts_on = first + timedelta(days=(hod_id % 5 - first.weekday()) % 7)
+        yield {"hod_id": hod_id, "starts_on": starts_on, "ends_on": None, "interval_weeks": 1,
+               "start_time": dtime(16), "end_time": dtime(17)}
+        if hod_id % 2:
+            yield {"hod_id": hod_id, "starts_on": starts_on + timedelta(days=1), "ends_on": None,
+                   "interval_weeks": 2, "start_time": dtime(8), "end_time": dtime(9)}
+
+
+def _rule_exceptions(hods, today):
+    # every third HOD cancels next week's weekly hour (rule ids follow _rules order)
+    rule_id = 0
+    for rule in _rules(hods, today):
+        rule_id += 1
+        if rule["interval_weeks"] == 1 and rule["hod_id"] % 3 == 0:
+            days = (rule["starts_on"].weekday() - today.weekday()) % 7 + 7
+            yield {"rule_id": rule_id, "date": today + timedelta(days=days)}
+
+
+def _meetings(rng, n, hods, staff, departments, today):
+    # staff mostly meet HODs of "their" department (staff_id mod departments)
+    hods_by_dept = [list(range(d + 1, hods + 1, departments)) or [1] for d in range(departments)]
+    first = today - timedelta(days=PAST_DAYS)
+
+    for meeting_id in range(1, n + 1):
+        staff_id = rng.randint(1, staff)
+        if rng.random() < 0.8:
+            hod_id = rng.choice(hods_by_dept[staff_id % departments])
+        else:
+            hod_id = rng.randint(1, hods)
+
+        # more meetings recently than two years ago
+        day = first + timedelta(days=int((PAST_DAYS + FUTURE_DAYS) * rng.random() ** 0.7))
+        slot = rng.randrange(16)
+        topic = rng.choice(TOPICS)
+
+        if day >= today:
+            status = "Scheduled" if rng.random() < 0.6 else "Requested"
+        else:
+            roll = rng.random()
+            status = "Completed" if roll < 0.75 else "Scheduled" if roll < 0.9 else "Requested"
+
+        meeting = {
+            "staff_id": staff_id,
+            "hod_id": hod_id,
+            "date": day,
+            "time": dtime(9 + slot // 2, 30 * (slot % 2)),
+            "agenda": rng.choice(AGENDAS).format(topic).capitalize(),
+            "status": status,
+        }
+        review = None
+        if status == "Completed" and rng.random() < 0.85:
+            review = {
+                "meeting_id": meeting_id,
+                "summary": rng.choice(SUMMARIES).format(topic).capitalize(),
+                "improvements": rng.choice(IMPROVEMENTS),
+                "suggestions": rng.choice(SUGGESTIONS),
+            }
+        yield meeting, review
+
+
+def _load_meetings(conn, meeting_table, review_table, rows):
+    # reviews go in with their chunk of meetings, so memory stays flat at any scale
+    began = time.perf_counter()
+    meetings = reviews = 0
+    for batch in _chunks(rows):
+        conn.execute(insert(meeting_table), [m for m, _ in batch])
+        review_rows = [r for _, r in batch if r is not None]
+        if review_rows:
+            conn.execute(insert(review_table), review_rows)
+        meetings += len(batch)
+        reviews += len(review_rows)
+        print(f"  meeting        {meetings:>10,} rows  {time.perf_counter() - began:6.1f}s", end="\r")
+    print(f"  meeting        {meetings:>10,} rows  {time.perf_counter() - began:6.1f}s")
+    print(f"  review         {reviews:>10,} rows")
+
+
+def _drop_fts(conn):
+    import search
+
+    triggers = conn.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%\\_fts\\_%' ESCAPE '\\'"
+    ).scalars().all()
+    for name in triggers:
+        conn.exec_driver_sql(f"DROP TRIGGER {name}")
+    for name in search.FTS_INDEXES:
+        conn.exec_driver_sql(f"DROP TABLE IF EXISTS {name}")
+
+
+def make_config(url):
+    class DataConfig(ProductionConfig):
+        SQLALCHEMY_DATABASE_URI = url
+
+    return DataConfig
+
+
+def generate(url, meetings, seed=42, today=None, departments=None, hods=None, staff=None):
+    from app import create_app
+    import reports
+    import search
+    import versions
+    from models import (
+        db, Department, HOD, Staff, HODAvailability, AvailabilityRule, AvailabilityException, Meeting, Review
+    )
+
+    rng = random.Random(seed)
+    today = today or date.today()
+    sizes = scale(meetings)
+    departments = departments or sizes["departments"]
+    hods = hods or sizes["hods"]
+    staff = staff or sizes["staff"]
+
+    app = create_app(make_config(url))
+    result = app.test_cli_runner().invoke(args=["init-db"])
+    if result.exit_code:
+        raise RuntimeError(result.output)
+
+    began = time.perf_counter()
+    print(f"generating {meetings:,} meetings, {hods:,} HODs, {staff:,} staff, "
+          f"{departments} departments (seed {seed}, today {today})")
+
+    with app.app_context():
+        conn = db.session.connection()
+        sqlite = conn.dialect.name == "sqlite"
+        if sqlite:
+            conn.exec_driver_sql("PRAGMA synchronous = OFF")
+            _drop_fts(conn)
+
+        existing = db.session.query(Department).count()
+        _load(conn, Department.__table__,
+              ({"name": name} for name in DEPARTMENTS[existing:departments]), "department")
+        _load(conn, HOD.__table__, _hods(rng, hods, departments), "hod")
+        _load(conn, Staff.__table__, _staff(rng, staff), "staff")
+        _load(conn, HODAvailability.__table__, _availability(rng, hods, today), "availability")
+        _load(conn, AvailabilityRule.__table__, _rules(hods, today), "rules")
+        _load(conn, AvailabilityException.__table__, _rule_exceptions(hods, today), "rule skips")
+
+        _load_meetings(conn, Meeting.__table__, Review.__table__,
+                       _meetings(rng, meetings, hods, staff, departments, today))
+
+        t0 = time.perf_counter()
+        reports.rebuild()
+        if sqlite:
+            search.install_fts(conn)
+            search.rebuild_fts(conn)
+            conn.exec_driver_sql("ANALYZE")
+        versions.bump(
+            "department", "hod", "staff", "hod_availability", "availability_rule", "availability_exception",
+            "meeting", "review",
+        )
+        db.session.commit()
+        print(f"  summary, search index and statistics rebuilt in {time.perf_counter() - t0:.1f}s")
+
+    print(f"done in {time.perf_counter() - began:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic campus database.")
+    parser.add_argument("--db", help="SQLite file to create")
+    parser.add_argument("--url", help="any SQLAlchemy URL instead of --db (empty database)")
+    parser.add_argument("--meetings", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--today", type=date.fromisoformat, help="YYYY-MM-DD, default today")
+    parser.add_argument("--departments", type=int)
+    parser.add_argument("--hods", type=int)
+    parser.add_argument("--staff", type=int)
+    parser.add_argument("--force", action="store_true", help="replace an existing --db file")
+    args = parser.parse_args()
+
+    if bool(args.db) == bool(args.url):
+        parser.error("give exactly one of --db or --url")
+    if args.db:
+        if os.path.exists(args.db):
+            if not args.force:
+                parser.error(f"{args.db} exists (use --force to replace it)")
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(args.db + suffix):
+                    os.remove(args.db + suffix)
+        url = f"sqlite:///{os.path.abspath(args.db)}"
+    else:
+        url = args.url
+
+    generate(url, args.meetings, seed=args.seed, today=args.today,
+             departments=args.departments, hods=args.hods, staff=args.staff)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, time as dtime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, text  # noqa: E402
+
+from models import db, Department, HOD, Staff, HODAvailability, Meeting, Review  # noqa: E402
+
+# ----------------------------------------------------
+# Seeds a scratch SQLite database, then times the hot
+# dashboard filters with and without the composite
+# indexes declared in models.py.
+#
+#   python benchmarks/index_benchmark.py --meetings 1000000
+# ----------------------------------------------------
+INDEXED_TABLES = [Meeting.__table__, HODAvailability.__table__, Review.__table__, HOD.__table__]
+
+QUERIES = {
+    "hod_meetings_by_date":
+        "SELECT id FROM meeting WHERE hod_id = :hod_id AND date = :day",
+    "hod_meetings_by_status":
+        "SELECT count(*) FROM meeting WHERE hod_id = :hod_id AND status = 'Completed'",
+    "staff_meetings_by_date":
+        "SELECT id FROM meeting WHERE staff_id = :staff_id AND date >= :day",
+    "staff_meetings_by_status":
+        "SELECT count(*) FROM meeting WHERE staff_id = :staff_id AND status = 'Completed'",
+    "hod_availability":
+        "SELECT id FROM hod_availability WHERE hod_id = :hod_id AND date = :day",
+    "review_by_meeting":
+        "SELECT id FROM review WHERE meeting_id = :meeting_id",
+}
+
+STATUSES = ["Requested", "Scheduled", "Completed"]
+CHUNK = 50_000
+
+
+def seed(conn, meetings, hods, staff, rng):
+    start = date(2026, 1, 1)
+
+    conn.execute(insert(Department.__table__), [{"name": f"Dept {i}"} for i in range(10)])
+    conn.execute(insert(HOD.__table__), [
+        {"name": f"HOD {i}", "email": f"hod{i}@bench", "password": "x", "department_id": i % 10 + 1}
+        for i in range(hods)
+    ])
+    conn.execute(insert(Staff.__table__), [
+        {"name": f"Staff {i}", "email": f"staff{i}@bench", "password": "x"}
+        for i in range(staff)
+    ])
+    conn.execute(insert(HODAvailability.__table__), [
+        {
+            "hod_id": i % hods + 1,
+            "date": start + timedelta(days=i // hods % 180),
+            "start_time": dtime(9 + i % 6),
+            "end_time": dtime(10 + i % 6),
+        }
+        for i in range(hods * 180)
+    ])
+
+    for offset in range(0, meetings, CHUNK):
+        n = min(CHUNK, meetings - offset)
+        conn.execute(insert(Meeting.__table__), [
+            {
+                "staff_id": rng.randint(1, staff),
+                "hod_id": rng.randint(1, hods),
+                "date": start + timedelta(days=rng.randrange(365)),
+                "time": dtime(rng.randrange(9, 17)),
+                "agenda": "benchmark",
+                "status": rng.choice(STATUSES),
+            }
+            for _ in range(n)
+        ])
+        conn.execute(insert(Review.__table__), [
+            {"meeting_id": offset + i + 1, "summary": "ok"}
+            for i in range(0, n, 3)
+        ])
+
+
+def measure(conn, params, repeat):
+    results = {}
+    for name, sql in QUERIES.items():
+        plan = " | ".join(row[-1] for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql), params))
+        samples = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            conn.execute(text(sql), params).fetchall()
+            samples.append((time.perf_counter() - t0) * 1000)
+        results[name] = (statistics.median(samples), plan)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time hot filters with and without indexes.")
+    parser.add_argument("--meetings", type=int, default=1_000_000)
+    parser.add_argument("--hods", type=int, default=200)
+    parser.add_argument("--staff", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--db", default=os.path.join(tempfile.gettempdir(), "csms_bench_indexes.db"))
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        os.remove(args.db)
+    engine = create_engine(f"sqlite:///{args.db}")
+    rng = random.Random(42)
+
+    with engine.begin() as conn:
+        db.metadata.create_all(conn)
+        for table in INDEXED_TABLES:
+            for index in table.indexes:
+                index.drop(conn)
+
+        t0 = time.perf_counter()
+        seed(conn, args.meetings, args.hods, args.staff, rng)
+        print(f"seeded {args.meetings} meetings in {time.perf_counter() - t0:.1f}s")
+
+    params = {"hod_id": args.hods // 2, "staff_id": args.staff // 2,
+              "day": date(2026, 6, 1), "meeting_id": args.meetings // 2}
+
+    with engine.begin() as conn:
+        before = measure(conn, params, args.repeat)
+
+        t0 = time.perf_counter()
+        for table in INDEXED_TABLES:
+            for index in table.indexes:
+                index.create(conn)
+        conn.execute(text("ANALYZE"))
+        print(f"built indexes in {time.perf_counter() - t0:.1f}s\n")
+
+        after = measure(conn, params, args.repeat)
+
+    for name in QUERIES:
+        (ms_before, plan_before), (ms_after, plan_after) = before[name], after[name]
+        print(f"{name}")
+        print(f"  before {ms_before:9.3f} ms  {plan_before}")
+        print(f"  after  {ms_after:9.3f} ms  {plan_after}")
+
+
+if __name__ == "__main__":
+    main()
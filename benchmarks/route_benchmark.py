@@ -0,0 +1,586 @@
+import argparse
+import http.client
+import io
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from datetime import date, timedelta
+from urllib.parse import urlencode
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import create_engine, text  # noqa: E402
+
+from config import ProductionConfig  # noqa: E402
+
+# ----------------------------------------------------
+# Drives every route through the Flask test client (or,
+# with --http, through real HTTP servers in several
+# processes) against a generated campus database, and
+# reports p50/p95/p99 latency, SQL statements per
+# request and peak RSS. With --baseline the run fails
+# (exit 1) when a route needs more queries than before
+# or memory grows; a clearly slower median is only
+# reported, and fails the run with --gate-latency
+# (timings of millisecond routes are mostly machine
+# noise). --save-baseline records the current numbers
+# instead.
+#
+#   python benchmarks/route_benchmark.py --meetings 100000 --baseline benchmarks/baseline.json
+#   python benchmarks/route_benchmark.py --db /tmp/campus.db --http --workers 4 --clients 8
+#
+# Add new routes to ROUTES: a route the table doesn't
+# cover fails the in-process run.
+# ----------------------------------------------------
+Route = namedtuple("Route", "role method url form safe", defaults=(None, True))
+
+# role: which logged-in client sends it ("anon" for no session, "fresh" for
+# a new client each time); url and form are filled in from params().
+ROUTES = [
+    Route("anon", "GET", "/"),
+    Route("anon", "GET", "/login/principal"),
+    Route("anon", "GET", "/login/hod"),
+    Route("anon", "GET", "/login/staff"),
+    Route("anon", "GET", "/register/hod"),
+    Route("anon", "GET", "/register/staff"),
+
+    Route("principal", "GET", "/dashboard/principal"),
+    Route("principal", "GET", "/principal/hods"),
+    Route("principal", "GET", "/principal/hods/add"),
+    Route("principal", "GET", "/principal/import"),
+    Route("principal", "GET", "/principal/staff"),
+    Route("principal", "GET", "/principal/staff/add"),
+    Route("principal", "GET", "/principal/search/staff?q={last_name}"),
+    Route("principal", "GET", "/principal/search/hod?q={hod_last_name}"),
+    Route("principal", "GET", "/principal/search/meetings?q=exam"),
+    Route("principal", "GET", "/principal/search/meetings?q=exam&hod_id={hod}&from={month_ago}"),
+    Route("principal", "GET", "/principal/blacklist"),
+    Route("principal", "GET", "/principal/meeting/bulk"),
+    Route("principal", "GET", "/principal/reports"),
+    Route("principal", "GET", "/principal/reports/hod/{hod}"),
+    Route("principal", "GET", "/principal/reports/staff/{staff}"),
+    Route("principal", "GET", "/principal/staff/{staff}/history"),
+    Route("principal", "GET", "/export/meetings.csv?from={month_ago}&to={today}"),
+    Route("principal", "GET", "/export/meetings.xlsx?hod_id={hod}"),
+    Route("principal", "GET", "/principal/jobs/{job}"),
+
+    Route("hod", "GET", "/dashboard/hod"),
+    Route("hod", "GET", "/hod/availability/add"),
+    Route("hod", "GET", "/meeting/{open_meeting}/review"),
+    Route("hod", "GET", "/hod/report"),
+    Route("hod", "GET", "/hod/history"),
+    Route("hod", "GET", "/export/meetings.csv"),
+
+    Route("staff", "GET", "/dashboard/staff"),
+    Route("staff", "GET", "/meeting/request"),
+    Route("staff", "GET", "/staff/report"),
+    Route("staff", "GET", "/staff/history"),
+
+    Route("anon", "GET", "/calendar/hod/{hod}/{hod_feed}.ics"),
+    Route("anon", "GET", "/calendar/staff/{staff}/{staff_feed}.ics"),
+    Route("anon", "GET", "/calendar/hod/{hod}/{hod_feed}.ics?since={first_sync}"),
+
+    # streams end after their replay under BenchConfig
+    Route("hod", "GET", "/events/meetings"),
+    Route("staff", "GET", "/events/meetings?since=0"),
+
+    Route("hod", "GET", "/api/v1/meetings"),
+    Route("staff", "GET", "/api/v1/meetings/changes"),
+    Route("hod", "GET", "/api/v1/availability"),
+    Route("staff", "GET", "/api/v1/hods/{hod}/free-slots?days=14"),
+    Route("staff", "GET", "/api/v1/hods/{hod}/windows?days=28"),
+    Route("principal", "GET", "/api/v1/staff"),
+    Route("staff", "GET", "/api/v1/hods"),
+    Route("principal", "GET", "/api/v1/search/people?q={last_name_prefix}"),
+    Route("principal", "GET", "/api/v1/search/meetings?q=exam"),
+    Route("principal", "GET", "/api/v1/cache/stats"),
+    Route("staff", "GET", "/api/v1/stats"),
+    Route("principal", "GET", "/api/v1/jobs/{job}"),
+    Route("principal", "GET", "/metrics"),
+    Route("principal", "GET", "/metrics/slow-queries"),
+
+    # writes: after all the reads, and never in --http mode
+    Route("fresh", "POST", "/login/principal", lambda p: {"email": "principal@csms.com", "password": "admin123"}, False),
+    Route("fresh", "POST", "/login/hod", lambda p: {"email": p["hod_email"], "password": "password"}, False),
+    Route("fresh", "POST", "/login/staff", lambda p: {"email": p["staff_email"], "password": "password"}, False),
+    Route("fresh", "GET", "/logout", None, False),
+    Route("anon", "POST", "/register/staff", lambda p: {
+        "name": f"Bench Staff {p['n']}", "email": f"bench{p['n']}@register.staff", "password": "x",
+    }, False),
+    Route("anon", "POST", "/register/hod", lambda p: {
+        "name": f"Bench HOD {p['n']}", "email": f"bench{p['n']}@register.hod", "password": "x", "department_id": 1,
+    }, False),
+    Route("principal", "POST", "/principal/staff/add", lambda p: {
+        "name": f"Added Staff {p['n']}", "email": f"bench{p['n']}@added.staff", "password": "x",
+    }, False),
+    Route("principal", "POST", "/principal/hods/add", lambda p: {
+        "name": f"Added HOD {p['n']}", "email": f"bench{p['n']}@added.hod", "password": "x", "department_id": 1,
+    }, False),
+    Route("principal", "POST", "/principal/import", lambda p: {
+        "kind": "staff", "dry_run": "1", "file": (io.BytesIO(p["import_csv"]), "staff.csv"),
+    }, False),
+    Route("principal", "POST", "/principal/meeting/bulk", lambda p: {
+        "mode": "selected", "date": p["future_day"], "time": p["slot"], "agenda": "Bench bulk",
+        "staff_ids": p["some_staff"], "hod_ids": p["some_hods"],
+    }, False),
+    Route("hod", "POST", "/hod/availability/add", lambda p: {
+        "date": p["future_day"], "start_time": "09:00", "end_time": "12:00",
+    }, False),
+    Route("hod", "POST", "/hod/availability/add", lambda p: {
+        "date": p["future_day"], "start_time": "13:00", "end_time": "14:00", "repeat": "weekly",
+    }, False),
+    Route("hod", "POST", "/hod/availability/rules/{rule}/skip", lambda p: {"date": p["rule_day"]}, False),
+    Route("hod", "POST", "/hod/availability/rules/{rule}/end", None, False),
+    Route("staff", "POST", "/meeting/request", lambda p: {
+        "hod_id": p["hod"], "date": p["future_day"], "time": p["slot"], "agenda": "Bench request",
+    }, False),
+    Route("hod", "POST", "/meeting/{open_meeting}/review", lambda p: {
+        "summary": "Bench review", "improvements": "none", "suggestions": "none",
+    }, False),
+    Route("principal", "GET", "/principal/hods/blacklist/{victim_hod}", None, False),
+    Route("principal", "GET", "/principal/staff/blacklist/{victim_staff}", None, False),
+]
+
+LOGINS = {
+    "principal": ("principal@csms.com", "admin123"),
+    "hod": ("hod_email", "password"),
+    "staff": ("staff_email", "password"),
+}
+
+
+def make_config(url):
+    class BenchConfig(ProductionConfig):
+        SQLALCHEMY_DATABASE_URI = url
+        REQUIRE_AVAILABILITY = False
+        # caches re-check table versions only after local commits, so
+        # query counts don't depend on how long a route takes
+        CACHE_VERSION_CHECK = None
+        IDENTITY_VERSION_CHECK = None
+        BLOCKLIST_VERSION_CHECK = None
+        SLOW_QUERY_MS = 60_000
+        METRICS_TOKEN = "bench"
+        # jobs the bulk POST enqueues stay queued, off the clock
+        JOB_WORKERS = 0
+        PUSH_ENABLED = True
+        PUSH_STREAM_SECONDS = 0
+
+    return BenchConfig
+
+
+# ----------------------------------------------------
+# SAMPLE ROWS
+# The busiest HOD and staff member (the worst case for
+# every per-user page), plus pools of rows for the
+# writes to use up one per request.
+# ----------------------------------------------------
+def pick_sample(url):
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        scalar = lambda sql, **kw: conn.execute(text(sql), kw).scalar()  # noqa: E731
+        scalars = lambda sql, **kw: conn.execute(text(sql), kw).scalars().all()  # noqa: E731
+
+        busiest = "SELECT ref_id FROM meeting_summary WHERE role = :role ORDER BY total DESC, ref_id LIMIT 1"
+        hod = scalar(busiest, role="hod")
+        staff = scalar(busiest, role="staff")
+        sample = {
+            "meetings": scalar("SELECT count(*) FROM meeting"),
+            "hod": hod,
+            "staff": staff,
+            "hod_email": scalar("SELECT email FROM hod WHERE id = :id", id=hod),
+            "staff_email": scalar("SELECT email FROM staff WHERE id = :id", id=staff),
+            "hod_last_name": scalar("SELECT name FROM hod WHERE id = :id", id=hod).split()[-1],
+            "last_name": scalar("SELECT name FROM staff WHERE id = :id", id=staff).split()[-1],
+            "open_meetings": scalars(
+                "SELECT meeting.id FROM meeting LEFT JOIN review ON review.meeting_id = meeting.id "
+                "WHERE meeting.hod_id = :hod AND review.id IS NULL ORDER BY meeting.id LIMIT 1000", hod=hod),
+            "victim_hods": scalars("SELECT id FROM hod WHERE id != :id ORDER BY id DESC LIMIT 1000", id=hod),
+            "victim_staff": scalars("SELECT id FROM staff WHERE id != :id ORDER BY id DESC LIMIT 1000", id=staff),
+            "some_staff": scalars("SELECT id FROM staff ORDER BY id LIMIT 20"),
+            "some_hods": scalars("SELECT id FROM hod ORDER BY id LIMIT 5"),
+            "rule": scalar("SELECT id FROM availability_rule WHERE hod_id = :hod AND interval_weeks = 1 "
+                           "ORDER BY id LIMIT 1", hod=hod),
+        }
+        sample["rule_starts_on"] = scalar("SELECT starts_on FROM availability_rule WHERE id = :id", id=sample["rule"])
+
+    # a finished job for the progress page and endpoint to show
+    with engine.begin() as conn:
+        sample["job"] = conn.execute(text(
+            "INSERT INTO job (kind, payload, status, progress, total, result, attempts, "
+            "created_by_role, created_at, started_at, finished_at) "
+            "VALUES ('bulk_schedule', '{}', 'done', 25, 25, '{\"created\": 25}', 1, "
+            "'principal', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP) RETURNING id"
+        )).scalar()
+    engine.dispose()
+
+    rows = ["name,email,password"] + [f"Import {i},import{i}@bench.csv,x" for i in range(200)]
+    sample["import_csv"] = "\n".join(rows).encode()
+    sample["last_name_prefix"] = sample["last_name"][:3]
+    sample["rule_weekday"] = date.fromisoformat(str(sample.pop("rule_starts_on"))).weekday()
+
+    # calendar feed URLs carry a token made with the app's secret key
+    from app import create_app
+    import calendar_feed
+    from pagination import encode_cursor
+
+    with create_app(make_config(url)).app_context():
+        sample["hod_feed"] = calendar_feed.feed_token("hod", hod)
+        sample["staff_feed"] = calendar_feed.feed_token("staff", staff)
+    sample["first_sync"] = encode_cursor([0, 0])
+    return sample
+
+
+def params(sample, n):
+    today = date.today()
+    slot = n % 16
+    p = dict(sample)
+    p.update(
+        n=n,
+        today=today.isoformat(),
+        month_ago=(today - timedelta(days=30)).isoformat(),
+        # well past the generated data, one slot per request
+        future_day=(today + timedelta(days=400 + n // 16)).isoformat(),
+        slot=f"{9 + slot // 2:02d}:{30 * (slot % 2):02d}",
+        open_meeting=sample["open_meetings"][n % len(sample["open_meetings"])],
+        victim_hod=sample["victim_hods"][n % len(sample["victim_hods"])],
+        victim_staff=sample["victim_staff"][n % len(sample["victim_staff"])],
+    )
+    # one occurrence of the sample rule per request (its weekday is the rule's)
+    p["rule_day"] = (today + timedelta(days=7 * n + (sample["rule_weekday"] - today.weekday()) % 7)).isoformat()
+    return p
+
+
+def route_name(route):
+    return f"{route.method} {route.url}"
+
+
+# ----------------------------------------------------
+# MEASUREMENT HELPERS
+# ----------------------------------------------------
+def percentiles(samples):
+    if len(samples) < 2:
+        return samples[0], samples[0], samples[0]
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return cuts[49], cuts[94], cuts[98]
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def summarize(latencies, queries):
+    p50, p95, p99 = percentiles(latencies)
+    return {
+        "requests": len(latencies),
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(p95, 3),
+        "p99_ms": round(p99, 3),
+        "queries": max(queries) if queries else None,
+    }
+
+
+# ----------------------------------------------------
+# IN-PROCESS (Flask test client)
+# ----------------------------------------------------
+def login(client, role, sample):
+    ident = {"principal": 1, "hod": sample["hod"], "staff": sample["staff"]}[role]
+    with client.session_transaction() as s:
+        s["role"] = role
+        s["id"] = ident
+        s["name"] = "bench"
+
+
+def run_inprocess(url, sample, args):
+    from app import create_app
+    from instrumentation import count_queries
+
+    app = create_app(make_config(url))
+    clients = {"anon": app.test_client()}
+    for role in ("principal", "hod", "staff"):
+        clients[role] = app.test_client()
+        login(clients[role], role, sample)
+
+    covered = set()
+    adapter = app.url_map.bind("localhost")
+    results, failures = {}, []
+    n = 0
+
+    for route in ROUTES:
+        latencies, queries = [], []
+        for i in range(args.warmup + args.requests):
+            n += 1
+            p = params(sample, n)
+            path = route.url.format(**p)
+            client = app.test_client() if route.role == "fresh" else clients[route.role]
+            data = route.form(p) if route.form else None
+
+            with count_queries() as statements:
+                began = time.perf_counter()
+                response = client.open(path, method=route.method, data=data)
+                response.get_data()  # drain streamed responses inside the timing
+                elapsed = (time.perf_counter() - began) * 1000
+            response.close()
+            with client.session_transaction() as s:
+                s.pop("_flashes", None)
+
+            if response.status_code >= 400:
+                failures.append(f"{route_name(route)} -> {response.status_code}")
+                break
+            if i >= args.warmup:
+                latencies.append(elapsed)
+                queries.append(len(statements))
+
+        covered.add(adapter.match(path.split("?")[0], method=route.method)[0])
+        if latencies:
+            results[route_name(route)] = summarize(latencies, queries)
+
+    endpoints = {rule.endpoint for rule in app.url_map.iter_rules() if rule.endpoint != "static"}
+    for endpoint in sorted(endpoints - covered):
+        failures.append(f"{endpoint} is not in ROUTES")
+
+    return {"routes": results, "peak_rss_mb": round(peak_rss_mb(), 1)}, failures
+
+
+# ----------------------------------------------------
+# HTTP (forked werkzeug servers sharing one socket,
+# forked clients with their own cookies)
+# ----------------------------------------------------
+def serve(url, fd, stop, out):
+    from werkzeug.serving import make_server
+    from app import create_app
+    import instrumentation
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, create_app(make_config(url)), fd=fd)
+    server.timeout = 0.2
+    while not stop.is_set():
+        server.handle_request()
+
+    with instrumentation.metrics._lock:
+        counts = {ep: (s.requests, s.db_queries, s.max_queries)
+                  for ep, s in instrumentation.metrics.endpoints.items()}
+    out.put((counts, peak_rss_mb()))
+
+
+def _http(port, method, path, cookie=None, form=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    headers = {"Cookie": cookie} if cookie else {}
+    body = None
+    if form is not None:
+        body = urlencode(form)
+        headers["Content-Type"] = "application/x-www-form-urlencoded"
+    conn.request(method, path, body=body, headers=headers)
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    return response
+
+
+def client(port, sample, routes, requests, offset, results):
+    cookies = {}
+    for role, (email, password) in LOGINS.items():
+        r = _http(port, "POST", f"/login/{role}", form={"email": sample.get(email, email), "password": password})
+        cookies[role] = r.getheader("Set-Cookie").split(";", 1)[0]
+
+    timings = {route_name(route): [] for route in routes}
+    for i in range(requests):
+        p = params(sample, offset + i)
+        for route in routes:
+            began = time.perf_counter()
+            r = _http(port, "GET", route.url.format(**p), cookie=cookies.get(route.role))
+            elapsed = (time.perf_counter() - began) * 1000
+            timings[route_name(route)].append(elapsed if r.status < 400 else None)
+    results.put(timings)
+
+
+def run_http(url, sample, args):
+    ctx = multiprocessing.get_context("fork")
+    listener = socket.socket()
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(128)
+    port = listener.getsockname()[1]
+
+    stop, server_out, client_out = ctx.Event(), ctx.Queue(), ctx.Queue()
+    servers = [ctx.Process(target=serve, args=(url, listener.fileno(), stop, server_out))
+               for _ in range(args.workers)]
+    for proc in servers:
+        proc.start()
+    time.sleep(args.startup)
+
+    routes = [r for r in ROUTES if r.safe and r.role != "fresh"]
+    began = time.perf_counter()
+    clients = [ctx.Process(target=client, args=(port, sample, routes, args.requests, c * args.requests, client_out))
+               for c in range(args.clients)]
+    for proc in clients:
+        proc.start()
+    timings = {route_name(route): [] for route in routes}
+    for _ in clients:
+        for name, samples in client_out.get().items():
+            timings[name].extend(samples)
+    wall = time.perf_counter() - began
+    for proc in clients:
+        proc.join()
+
+    stop.set()
+    endpoint_counts, rss = {}, []
+    for _ in servers:
+        counts, peak = server_out.get()
+        rss.append(peak)
+        for ep, (requests, queries, max_queries) in counts.items():
+            total = endpoint_counts.setdefault(ep, [0, 0, 0])
+            total[0] += requests
+            total[1] += queries
+            total[2] = max(total[2], max_queries)
+    for proc in servers:
+        proc.join()
+    listener.close()
+
+    results, failures = {}, []
+    total = 0
+    for route in routes:
+        samples = timings[route_name(route)]
+        ok = [s for s in samples if s is not None]
+        if len(ok) < len(samples):
+            failures.append(f"{route_name(route)}: {len(samples) - len(ok)} failed requests")
+        if ok:
+            results[route_name(route)] = summarize(ok, [])
+        total += len(samples)
+
+    print(f"{total} requests in {wall:.1f}s = {total / wall:.0f} req/s "
+          f"({args.workers} server processes, {args.clients} clients)")
+    print("queries per request by endpoint (server side): " + ", ".join(
+        f"{ep} {q / r:.1f}" for ep, (r, q, _) in sorted(endpoint_counts.items()) if r))
+    return {"routes": results, "peak_rss_mb": round(max(rss), 1)}, failures
+
+
+# ----------------------------------------------------
+# BASELINE
+# ----------------------------------------------------
+def compare(current, baseline, tolerance, min_delta_ms):
+    # (problems, slower): query counts and memory are exact enough to gate
+    # on; medians are returned apart, since only --gate-latency fails on them
+    problems, slower = [], []
+    for name, now in current["routes"].items():
+        before = baseline["routes"].get(name)
+        if before is None:
+            continue
+        if now["queries"] is not None and before["queries"] is not None and now["queries"] > before["queries"]:
+            problems.append(f"{name}: {now['queries']} queries per request, baseline {before['queries']}")
+        # the median is what's compared: p95/p99 of a few dozen samples are mostly noise
+        limit = max(before["p50_ms"] * (1 + tolerance), before["p50_ms"] + min_delta_ms)
+        if now["p50_ms"] > limit:
+            slower.append(f"{name}: p50 {now['p50_ms']:.1f} ms, baseline {before['p50_ms']:.1f} ms")
+
+    if current["peak_rss_mb"] > baseline["peak_rss_mb"] * (1 + tolerance):
+        problems.append(f"peak RSS {current['peak_rss_mb']} MB, baseline {baseline['peak_rss_mb']} MB")
+    return problems, slower
+
+
+def report(current, baseline):
+    before = (baseline or {}).get("routes", {})
+    print(f"\n{'route':<66} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>8}   baseline p50/queries")
+    for name, r in current["routes"].items():
+        b = before.get(name)
+        was = f"{b['p50_ms']:8.2f} {b['queries'] if b['queries'] is not None else '-':>4}" if b else ""
+        queries = r["queries"] if r["queries"] is not None else "-"
+        print(f"{name:<66} {r['p50_ms']:8.2f} {r['p95_ms']:8.2f} {r['p99_ms']:8.2f} {queries:>8}   {was}")
+    print(f"\npeak RSS {current['peak_rss_mb']} MB"
+          + (f" (baseline {baseline['peak_rss_mb']} MB)" if baseline else ""))
+
+
+def prepare_database(args, workdir):
+    if args.db:
+        if args.in_place:
+            return f"sqlite:///{os.path.abspath(args.db)}"
+        path = os.path.join(workdir, "bench.db")
+        shutil.copyfile(args.db, path)
+        return f"sqlite:///{path}"
+
+    path = os.path.join(workdir, "bench.db")
+    subprocess.run([sys.executable, os.path.join(ROOT, "benchmarks", "datagen.py"), "--db", path,
+                    "--meetings", str(args.meetings), "--seed", str(args.seed)], check=True)
+    return f"sqlite:///{path}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency, queries and memory for every route.")
+    parser.add_argument("--db", help="a database made by datagen.py (copied first unless --in-place)")
+    parser.add_argument("--in-place", action="store_true", help="run against --db itself (writes to it)")
+    parser.add_argument("--meetings", type=int, default=10_000, help="generate this many when no --db")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=30, help="measured requests per route (per client)")
+    parser.add_argument("--warmup", type=int, default=3, help="unmeasured requests per route first")
+    parser.add_argument("--http", action="store_true", help="real HTTP, several server processes")
+    parser.add_argument("--workers", type=int, default=4, help="--http server processes")
+    parser.add_argument("--clients", type=int, default=4, help="--http client processes")
+    parser.add_argument("--startup", type=float, default=2.0, help="--http seconds to let servers start")
+    parser.add_argument("--baseline", help="JSON file to compare against (or write, with --save-baseline)")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed p50/RSS growth, 0.5 = +50%%")
+    parser.add_argument("--min-delta-ms", type=float, default=20.0, help="ignore p50 changes smaller than this")
+    parser.add_argument("--gate-latency", action="store_true",
+                        help="fail on slower medians too (use a quiet machine and more --requests)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="csms-bench-")
+    try:
+        url = prepare_database(args, workdir)
+        sample = pick_sample(url)
+        print(f"{sample['meetings']:,} meetings; busiest HOD {sample['hod']}, busiest staff {sample['staff']}")
+
+        mode = "http" if args.http else "inprocess"
+        current, failures = (run_http if args.http else run_inprocess)(url, sample, args)
+        current["meta"] = {"meetings": sample["meetings"], "requests": args.requests}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    stored = {}
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+    baseline = None if args.save_baseline else stored.get(mode)
+    report(current, baseline)
+
+    if args.save_baseline:
+        if not args.baseline:
+            parser.error("--save-baseline needs --baseline FILE")
+        stored[mode] = current
+        with open(args.baseline, "w") as f:
+            json.dump(stored, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"baseline saved to {args.baseline} [{mode}]")
+    elif baseline:
+        if baseline["meta"]["meetings"] != current["meta"]["meetings"]:
+            print(f"note: baseline was taken at {baseline['meta']['meetings']:,} meetings")
+        problems, slower = compare(current, baseline, args.tolerance, args.min_delta_ms)
+        failures += problems
+        if args.gate_latency:
+            failures += slower
+        elif slower:
+            print("\nslower than baseline (not gated; see --gate-latency):")
+            for line in slower:
+                print(f"  {line}")
+
+    if failures:
+        print("\nFAIL:")
+        for line in failures:
+            print(f"  {line}")
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ----------------------------------------------------
+# Cold start: a fresh interpreter imports app.py and
+# calls create_app(), as each gunicorn worker and CLI
+# invocation does. Fails (exit 1) if the median goes
+# over --budget or if any database connection is opened
+# along the way - startup must not touch the database.
+#
+#   python benchmarks/startup_benchmark.py --runs 10 --budget 1.5
+# ----------------------------------------------------
+PROBE = """
+import time
+began = time.perf_counter()
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+connects = []
+event.listen(Engine, "connect", lambda *args: connects.append(1))
+
+from app import create_app
+create_app()
+print(time.perf_counter() - began, len(connects))
+"""
+
+
+def cold_start(env):
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout.split()
+    return float(out[0]), int(out[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold import + create_app() time.")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget", type=float, default=1.5, help="seconds, median")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    # a database that can't be opened: any connection attempt would fail the probe
+    env["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.gettempdir(), "csms-no-such-dir", "x.db")
+
+    results = [cold_start(env) for _ in range(args.runs)]
+    times = [t for t, _ in results]
+    connects = sum(c for _, c in results)
+    median = statistics.median(times)
+
+    print(f"cold start over {args.runs} runs: median {median * 1000:.0f} ms, "
+          f"min {min(times) * 1000:.0f} ms, max {max(times) * 1000:.0f} ms, "
+          f"db connections {connects}")
+
+    if connects:
+        sys.exit("FAIL: startup opened a database connection")
+    if median > args.budget:
+        sys.exit(f"FAIL: median {median:.2f}s is over the {args.budget:.2f}s budget")
+    print(f"OK: within {args.budget:.2f}s budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import ProductionConfig  # noqa: E402
+
+# ----------------------------------------------------
+# Concurrent write load against a scratch SQLite file:
+# each worker process builds its own app (as a gunicorn
+# worker would) and posts meeting requests through the
+# real /meeting/request view, while reader processes
+# load the staff dashboard. Runs once with SQLite's
+# defaults and once with the configured pragmas (WAL).
+#
+#   python benchmarks/write_load.py --writers 4 --readers 2 --requests 500
+# ----------------------------------------------------
+SLOTS_PER_DAY = 16
+
+
+def make_config(path, pragmas):
+    class LoadConfig(ProductionConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        SQLITE_PRAGMAS = pragmas
+        REQUIRE_AVAILABILITY = False
+
+    return LoadConfig
+
+
+def login(client, role, ident):
+    with client.session_transaction() as s:
+        s["role"] = role
+        s["id"] = ident
+        s["name"] = "load"
+
+
+def writer(path, pragmas, worker, requests, start, results):
+    from app import create_app
+
+    client = create_app(make_config(path, pragmas)).test_client()
+    login(client, "staff", worker + 1)
+    ok = failed = 0
+
+    start.wait()
+    began = time.perf_counter()
+    for i in range(requests):
+        slot = i % SLOTS_PER_DAY
+        r = client.post("/meeting/request", data={
+            # one HOD per worker, so requests never conflict on a slot
+            "hod_id": worker + 1,
+            "date": (date(2027, 1, 1) + timedelta(days=i // SLOTS_PER_DAY)).isoformat(),
+            "time": f"{9 + slot // 2:02d}:{30 * (slot % 2):02d}",
+            "agenda": f"load {worker}/{i}",
+        })
+        if r.status_code == 302 and r.headers["Location"].endswith("/dashboard/staff"):
+            ok += 1
+        else:
+            failed += 1
+        with client.session_transaction() as s:
+            s.pop("_flashes", None)  # nobody reads them here; don't let the cookie grow
+    results.put(("write", ok, failed, time.perf_counter() - began))
+
+
+def reader(path, pragmas, worker, requests, start, results):
+    from app import create_app
+
+    client = create_app(make_config(path, pragmas)).test_client()
+    login(client, "staff", worker + 1)
+    ok = failed = 0
+
+    start.wait()
+    began = time.perf_counter()
+    for _ in range(requests):
+        if client.get("/dashboard/staff").status_code == 200:
+            ok += 1
+        else:
+            failed += 1
+    results.put(("read", ok, failed, time.perf_counter() - began))
+
+
+def seed(config, workers):
+    from app import create_app
+    from models import db, HOD, Staff
+
+    with create_app(config).app_context():
+        db.create_all()
+        db.session.add_all(
+            [HOD(name=f"HOD {i}", email=f"hod{i}@load", password="x") for i in range(workers)]
+            + [Staff(name=f"Staff {i}", email=f"staff{i}@load", password="x") for i in range(workers)]
+        )
+        db.session.commit()
+
+
+def run(label, pragmas, args):
+    path = os.path.join(tempfile.mkdtemp(prefix="csms-load-", dir=args.dir), "load.db")
+    seed(make_config(path, pragmas), max(args.writers, args.readers))
+
+    ctx = multiprocessing.get_context("spawn")
+    start = ctx.Event()
+    results = ctx.Queue()
+    procs = [ctx.Process(target=writer, args=(path, pragmas, w, args.requests, start, results))
+             for w in range(args.writers)]
+    procs += [ctx.Process(target=reader, args=(path, pragmas, r, args.requests, start, results))
+              for r in range(args.readers)]
+    for p in procs:
+        p.start()
+    time.sleep(args.warmup)  # let every worker finish importing and building its app
+
+    began = time.perf_counter()
+    start.set()
+    totals = {"write": [0, 0], "read": [0, 0]}
+    for _ in procs:
+        kind, ok, failed, _elapsed = results.get()
+        totals[kind][0] += ok
+        totals[kind][1] += failed
+    wall = time.perf_counter() - began
+    for p in procs:
+        p.join()
+
+    writes, write_errors = totals["write"]
+    reads, read_errors = totals["read"]
+    print(f"{label:<22} {writes / wall:>9.0f} writes/s {write_errors:>6} failed"
+          f" {reads / wall:>9.0f} reads/s {read_errors:>6} failed   ({wall:.1f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent write throughput, journal vs WAL.")
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=2)
+    parser.add_argument("--requests", type=int, default=500, help="per worker")
+    parser.add_argument("--dir", help="where to put the scratch database (use a real disk, not tmpfs)")
+    parser.add_argument("--warmup", type=float, default=3.0, help="seconds to wait for workers to start")
+    args = parser.parse_args()
+
+    print(f"{args.writers} writers, {args.readers} readers, {args.requests} requests each")
+    run("rollback journal", {}, args)
+    run("WAL + tuned pragmas", ProductionConfig.SQLITE_PRAGMAS, args)
+
+
+if __name__ == "__main__":
+    main()
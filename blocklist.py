@@ -0,0 +1,64 @@
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import select
+
+import versions
+from models import db, Blocklist
+
+# ----------------------------------------------------
+# BLOCKLIST MEMBERSHIP CACHE
+# Holds every (role, ref_id) pair in memory so logins
+# never touch the blocklist table. Writes in this
+# process go straight into the set; other workers
+# notice through the "blocklist" table version, which
+# is re-read at most every BLOCKLIST_VERSION_CHECK
+# seconds (None disables the cross-process check).
+# ----------------------------------------------------
+class BlocklistCache:
+    def __init__(self):
+        self._members = None
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        app.config.setdefault("BLOCKLIST_VERSION_CHECK", 2.0)
+
+    def load(self):
+        with self._lock:
+            version = versions.get(Blocklist.__tablename__)
+            members = set(db.session.execute(select(Blocklist.role, Blocklist.ref_id)).all())
+            self._members = members
+            self._version = version
+            self._checked_at = time.monotonic()
+
+    def invalidate(self):
+        self._members = None
+
+    def add(self, role, ref_id):
+        if self._members is not None:
+            self._members.add((role, ref_id))
+
+    def contains(self, role, ref_id):
+        self._refresh_if_stale()
+        return (role, ref_id) in self._members
+
+    def _refresh_if_stale(self):
+        if self._members is None:
+            self.load()
+            return
+
+        interval = current_app.config["BLOCKLIST_VERSION_CHECK"]
+        now = time.monotonic()
+        if interval is None or now - self._checked_at < interval:
+            return
+
+        if versions.get(Blocklist.__tablename__) != self._version:
+            self.load()
+        else:
+            self._checked_at = now
+
+
+blocklist_cache = BlocklistCache()
@@ -0,0 +1,158 @@
+import threading
+import time
+
+from flask import current_app
+from markupsafe import Markup
+from sqlalchemy import select
+
+import versions
+from identity import identity_cache
+from models import db, Department, HOD, Staff
+from pagination import keyset_page
+from queries import hod_picker, staff_picker
+
+# ----------------------------------------------------
+# TABLE-VERSION WATCH
+# One snapshot of the table versions the caches depend
+# on, re-read at most every CACHE_VERSION_CHECK seconds
+# (None: only after commits in this process), and right
+# after any commit here that bumped a version.
+# ----------------------------------------------------
+class VersionWatch:
+    def __init__(self):
+        self._versions = {}
+        self._checked_at = 0.0
+        self._generation = None
+        self._lock = threading.Lock()
+
+    def current(self, tables):
+        interval = current_app.config["CACHE_VERSION_CHECK"]
+        now = time.monotonic()
+        generation = versions.local_generation()
+
+        if (
+            any(t not in self._versions for t in tables)
+            or generation != self._generation
+            or (interval is not None and now - self._checked_at >= interval)
+        ):
+            snap = versions.snapshot(*set(self._versions).union(tables))
+            with self._lock:
+                self._versions = {name: v for name, (v, _) in snap.items()}
+                self._checked_at = now
+                self._generation = generation
+
+        return tuple(self._versions[t] for t in tables)
+
+
+version_watch = VersionWatch()
+
+
+# ----------------------------------------------------
+# VERSIONED CACHE
+# An entry is served while the versions of the tables
+# it was built from are unchanged and its TTL (if any)
+# has not run out.
+# ----------------------------------------------------
+class VersionedCache:
+    def __init__(self, name, ttl_key):
+        self.name = name
+        self.ttl_key = ttl_key
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_set(self, key, tables, compute):
+        stamp = version_watch.current(tables)
+        now = time.monotonic()
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == stamp and entry[1] > now:
+            self.hits += 1
+            return entry[2]
+
+        self.misses += 1
+        value = compute()
+        ttl = current_app.config[self.ttl_key]
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (stamp, now + ttl if ttl else float("inf"), value)
+            while len(self._entries) > current_app.config["CACHE_MAX_ENTRIES"]:
+                del self._entries[next(iter(self._entries))]
+        return value
+
+    def invalidate(self, name=None):
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == name]:
+                    del self._entries[key]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else None,
+        }
+
+
+fragment_cache = VersionedCache("fragments", "FRAGMENT_CACHE_TTL")
+refdata_cache = VersionedCache("refdata", "REFDATA_CACHE_TTL")
+recurrence_cache = VersionedCache("recurrence", "RECURRENCE_CACHE_TTL")   # see availability.py
+
+
+# ----------------------------------------------------
+# TEMPLATE FRAGMENTS
+#   {% call cache_fragment("recent_meetings", "meeting", "staff", "hod") %}
+#       ... rendered only on a miss ...
+#   {% endcall %}
+# Only for markup that is the same for every viewer;
+# pass key=... for anything that varies it.
+# ----------------------------------------------------
+def cache_fragment(name, *tables, key=None, caller=None):
+    html = fragment_cache.get_or_set((name, key), tables, lambda: str(caller()))
+    return Markup(html)
+
+
+# ----------------------------------------------------
+# REFERENCE DATA
+# ----------------------------------------------------
+def departments():
+    return refdata_cache.get_or_set(
+        ("departments",), ("department",),
+        lambda: db.session.execute(select(Department.id, Department.name).order_by(Department.id)).all()
+    )
+
+
+def hod_picker_first_page():
+    size = current_app.config["PAGE_SIZE"]
+    return refdata_cache.get_or_set(
+        ("hod_picker", size), ("hod", "department"),
+        lambda: keyset_page(hod_picker(), [HOD.id], size=size)
+    )
+
+
+def staff_picker_first_page():
+    size = current_app.config["PAGE_SIZE"]
+    return refdata_cache.get_or_set(
+        ("staff_picker", size), ("staff",),
+        lambda: keyset_page(staff_picker(), [Staff.id], size=size)
+    )
+
+
+def stats():
+    report = {cache.name: cache.stats() for cache in (fragment_cache, refdata_cache, recurrence_cache)}
+    report["identity"] = identity_cache.stats()
+    return report
+
+
+def init_app(app):
+    app.config.setdefault("CACHE_VERSION_CHECK", 2.0)
+    app.config.setdefault("FRAGMENT_CACHE_TTL", 300)
+    app.config.setdefault("REFDATA_CACHE_TTL", 3600)
+    app.config.setdefault("RECURRENCE_CACHE_TTL", 3600)
+    app.config.setdefault("CACHE_MAX_ENTRIES", 1000)
+    app.jinja_env.globals["cache_fragment"] = cache_fragment
@@ -0,0 +1,216 @@
+import hashlib
+import hmac
+from datetime import date, datetime, timedelta, timezone
+
+from flask import Response, current_app, request, stream_with_context
+from sqlalchemy import select, tuple_
+
+import changes
+import versions
+from models import db, Meeting
+from pagination import decode_cursor, encode_cursor
+
+# ----------------------------------------------------
+# iCALENDAR FEEDS
+# One feed per HOD / staff member, at a URL carrying an
+# HMAC of the owner, since calendar clients can't log
+# in. The owner's highest change_seq (one index probe)
+# is the feed's ETag, so a poll with nothing new is a
+# 304 and never builds the feed. ?since=<sync token>
+# returns only the meetings changed after that token;
+# every response carries X-Sync-Token for the next one.
+# ----------------------------------------------------
+FEED_CHUNK_SIZE = 500
+
+SYNC_KEYS = [Meeting.change_seq, Meeting.id]
+
+# what an event shows about a meeting
+_STATUS = {"Requested": "TENTATIVE", "Scheduled": "CONFIRMED", "Completed": "CONFIRMED"}
+
+
+def init_app(app):
+    app.config.setdefault("CALENDAR_PAST_DAYS", 90)   # None: the whole history
+    app.config.setdefault("CALENDAR_SYNC_LIMIT", 500)
+
+
+def owner_column(role):
+    return {"hod": Meeting.hod_id, "staff": Meeting.staff_id}[role]
+
+
+def feed_token(role, ref_id):
+    key = current_app.secret_key.encode()
+    return hmac.new(key, f"calendar:{role}:{ref_id}".encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def valid_token(role, ref_id, token):
+    # compared as bytes: compare_digest rejects non-ASCII str
+    return hmac.compare_digest(feed_token(role, ref_id).encode(), token.encode())
+
+
+# ----------------------------------------------------
+# SYNC TOKENS
+# A token is the (change_seq, id) of the last meeting a
+# client received, as an opaque keyset cursor; rows are
+# read in that order, so "after the token" is exactly
+# what the client hasn't seen.
+# ----------------------------------------------------
+def parse_since(token):
+    values = decode_cursor(token, SYNC_KEYS)
+    if values is None:
+        raise ValueError("bad sync token")
+    return values
+
+
+def changed(role, ref_id, since, limit):
+    # (rows, sync token, more?) for meetings of the owner after the token
+    query = changes.rows_query(owner_column(role) == ref_id)
+    if since is not None:
+        query = query.where(tuple_(*SYNC_KEYS) > tuple_(*since))
+    rows = db.session.execute(query.order_by(*SYNC_KEYS).limit(limit + 1)).all()
+
+    more = len(rows) > limit
+    rows = rows[:limit]
+    last = [rows[-1].change_seq, rows[-1].id] if rows else (since or [0, 0])
+    return rows, encode_cursor(last), more
+
+
+# ----------------------------------------------------
+# ROWS
+# ----------------------------------------------------
+def _feed_rows(role, ref_id):
+    criteria = [owner_column(role) == ref_id]
+    past_days = current_app.config["CALENDAR_PAST_DAYS"]
+    if past_days is not None:
+        criteria.append(Meeting.date >= date.today() - timedelta(days=past_days))
+
+    stmt = (
+        changes.rows_query(*criteria)
+        .order_by(Meeting.date, Meeting.id)
+        .execution_options(yield_per=FEED_CHUNK_SIZE)
+    )
+    for partition in db.session.execute(stmt).partitions():
+        yield partition
+
+
+# ----------------------------------------------------
+# ICS TEXT (RFC 5545)
+# ----------------------------------------------------
+def _escape(text):
+    return (
+        (text or "")
+        .replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def _fold(line):
+    # content lines are at most 75 octets; continuations start with a space
+    raw = line.encode()
+    if len(raw) <= 75:
+        return line + "\r\n"
+
+    parts, limit = [], 75
+    while raw:
+        cut = min(limit, len(raw))
+        while cut < len(raw) and (raw[cut] & 0xC0) == 0x80:   # don't split a UTF-8 sequence
+            cut -= 1
+        parts.append(raw[:cut].decode())
+        raw, limit = raw[cut:], 74
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _stamp(dt):
+    return dt.strftime("%Y%m%dT%H%M%S")
+
+
+def _event(row, role, duration, dtstamp):
+    start = datetime.combine(row.date, row.time)
+    other = row.staff_name if role == "hod" else row.hod_name
+    summary = f"Meeting with {other}" if other else "Meeting scheduled by the Principal"
+    description = f"{row.agenda or ''}\n\nStatus: {row.status}" + (" (reviewed)" if row.review_id else "")
+
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:meeting-{row.id}@csms",
+        f"DTSTAMP:{dtstamp}",
+        f"SEQUENCE:{row.change_seq}",
+        f"DTSTART:{_stamp(start)}",
+        f"DTEND:{_stamp(start + duration)}",
+        f"SUMMARY:{_escape(summary)}",
+        f"DESCRIPTION:{_escape(description)}",
+        f"STATUS:{_STATUS.get(row.status, 'CONFIRMED')}",
+        "END:VEVENT",
+    ]
+    return "".join(_fold(line) for line in lines)
+
+
+def ics_chunks(partitions, role, name):
+    duration = timedelta(minutes=current_app.config["MEETING_DURATION_MINUTES"])
+    dtstamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    header = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//CSMS//Meetings//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(f'CSMS meetings - {name}')}",
+    ]
+    yield "".join(_fold(line) for line in header).encode()
+    for rows in partitions:
+        yield "".join(_event(row, role, duration, dtstamp) for row in rows).encode()
+    yield b"END:VCALENDAR\r\n"
+
+
+# ----------------------------------------------------
+# RESPONSE (conditional GET)
+# ----------------------------------------------------
+def _latest(role, ref_id):
+    # (change_seq, id) of the owner's most recent change, straight off the index
+    row = db.session.execute(
+        select(Meeting.change_seq, Meeting.id)
+        .where(owner_column(role) == ref_id)
+        .order_by(Meeting.change_seq.desc(), Meeting.id.desc())
+        .limit(1)
+    ).first()
+    return list(row) if row else [0, 0]
+
+
+def feed_response(role, ref_id, name):
+    snap = versions.snapshot(changes.COUNTER, "staff", "hod")
+    latest = _latest(role, ref_id)
+    since = request.args.get("since")
+
+    key = repr((role, ref_id, latest, snap["staff"][0], snap["hod"][0], since,
+                date.today().isoformat(), current_app.config["CALENDAR_PAST_DAYS"]))
+    etag = hashlib.sha1(key.encode()).hexdigest()
+    stamps = [stamp for _, stamp in snap.values() if stamp is not None]
+    last_modified = max(stamps).replace(tzinfo=timezone.utc, microsecond=0) if stamps else None
+
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains(etag)
+    else:
+        since_header = request.if_modified_since
+        not_modified = bool(last_modified and since_header and last_modified <= since_header)
+
+    if not_modified:
+        response = Response(status=304)
+    elif since is not None:
+        rows, token, more = changed(role, ref_id, parse_since(since), current_app.config["CALENDAR_SYNC_LIMIT"])
+        response = Response(b"".join(ics_chunks([rows], role, name)), mimetype="text/calendar")
+        response.headers["X-Sync-Token"] = token
+        response.headers["X-Sync-More"] = "1" if more else "0"
+    else:
+        response = Response(
+            stream_with_context(ics_chunks(_feed_rows(role, ref_id), role, name)),
+            mimetype="text/calendar",
+        )
+        # a full feed has everything up to the owner's newest change
+        response.headers["X-Sync-Token"] = encode_cursor(latest)
+
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
@@ -0,0 +1,92 @@
+from sqlalchemy import event, inspect, select, update
+
+import versions
+from models import db, Meeting, Review, Staff, HOD
+
+# ----------------------------------------------------
+# MEETING CHANGE SEQUENCE
+# A meeting that is created, changes status or gets a
+# review is stamped with the next value of the meeting
+# table's version counter (table_version), which every
+# write to meeting bumps anyway, so stamping costs no
+# extra statement. The counter row stays write-locked
+# until commit, so sequence order is commit order: a
+# client that has everything up to N only ever needs
+# the rows above N. Calendar feeds and the changes
+# endpoint are built on this.
+# ----------------------------------------------------
+COUNTER = Meeting.__tablename__
+
+
+def next_seq(connection=None):
+    db.session.info["meetings_changed"] = True
+    return versions.next_version(COUNTER, connection=connection)
+
+
+def current_seq():
+    return versions.get(COUNTER)
+
+
+def _status_changed(meeting):
+    return inspect(meeting).attrs.status.history.has_changes()
+
+
+@event.listens_for(db.session, "before_flush")
+def _stamp_changed_meetings(session, flush_context, instances):
+    changed = [
+        obj for obj in session.new
+        if isinstance(obj, Meeting)
+    ] + [
+        obj for obj in session.dirty
+        if isinstance(obj, Meeting) and _status_changed(obj)
+    ]
+    reviewed = {obj.meeting_id for obj in session.new if isinstance(obj, Review)}
+    reviewed -= {m.id for m in changed}
+    if not changed and not reviewed:
+        return
+
+    conn = session.connection()
+    seq = next_seq(conn)
+    session.info.setdefault("versions_bumped", set()).add(COUNTER)
+    for m in changed:
+        m.change_seq = seq
+    if reviewed:
+        # reviewed meetings that aren't loaded (or didn't change status)
+        conn.execute(update(Meeting.__table__).where(Meeting.id.in_(reviewed)).values(change_seq=seq))
+
+
+# ----------------------------------------------------
+# CHANGED ROWS
+# What feeds, the changes endpoint and pushed events
+# all send about a meeting: one flat SELECT, people and
+# review outer-joined.
+# ----------------------------------------------------
+def rows_query(*criteria):
+    return (
+        select(
+            Meeting.id, Meeting.date, Meeting.time, Meeting.agenda, Meeting.status, Meeting.change_seq,
+            Meeting.staff_id, Meeting.hod_id,
+            Staff.name.label("staff_name"), HOD.name.label("hod_name"),
+            Review.id.label("review_id"),
+        )
+        .outerjoin(Staff, Meeting.staff_id == Staff.id)
+        .outerjoin(HOD, Meeting.hod_id == HOD.id)
+        .outerjoin(Review, Review.meeting_id == Meeting.id)
+        .where(*criteria)
+    )
+
+
+def as_json(row):
+    return {
+        "id": row.id,
+        "staff_id": row.staff_id,
+        "staff": row.staff_name,
+        "hod_id": row.hod_id,
+        "hod": row.hod_name,
+        "date": row.date.isoformat(),
+        "time": row.time.strftime("%H:%M"),
+        "agenda": row.agenda,
+        "status": row.status,
+        "reviewed": row.review_id is not None,
+        "change_seq": row.change_seq
+    }
@@ -0,0 +1,82 @@
+from sqlalchemy import event, insert, literal, select
+from sqlalchemy.engine import make_url
+
+import versions
+from models import db, Department, Principal
+
+# ----------------------------------------------------
+# ENGINE SETUP
+# SQLite gets its pragmas on every new connection (WAL
+# lets readers run alongside the single writer, and
+# busy_timeout makes writers queue instead of failing).
+# Server databases get a sized, pre-pinged pool.
+# ----------------------------------------------------
+def engine_options(app):
+    url = make_url(app.config["SQLALCHEMY_DATABASE_URI"])
+    if url.get_backend_name() == "sqlite":
+        return {}
+
+    return {
+        "pool_size": app.config["DB_POOL_SIZE"],
+        "max_overflow": app.config["DB_MAX_OVERFLOW"],
+        "pool_recycle": app.config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": app.config["DB_POOL_PRE_PING"],
+    }
+
+
+def _sqlite_pragmas(pragmas):
+    def on_connect(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+    return on_connect
+
+
+def init_app(app):
+    app.config.setdefault("SQLITE_PRAGMAS", {})
+    for key, value in engine_options(app).items():
+        app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", {}).setdefault(key, value)
+
+    db.init_app(app)
+
+    with app.app_context():
+        engine = db.engine
+        if engine.dialect.name == "sqlite" and app.config["SQLITE_PRAGMAS"]:
+            event.listen(engine, "connect", _sqlite_pragmas(app.config["SQLITE_PRAGMAS"]))
+
+
+# ----------------------------------------------------
+# DEFAULT DATA (flask init-db)
+# Each row is inserted by one INSERT ... SELECT guarded
+# by NOT EXISTS, so running it again adds nothing. The
+# default principal is only created while there is no
+# principal at all.
+# ----------------------------------------------------
+DEFAULT_PRINCIPAL = {"name": "Principal", "email": "principal@csms.com", "password": "admin123"}
+DEFAULT_DEPARTMENTS = ["Computer Science", "Mechanical", "Civil", "Electronics", "Management"]
+
+
+def _insert_missing(model, values, existing):
+    columns = list(values)
+    return db.session.execute(
+        insert(model).from_select(
+            columns,
+            select(*(literal(values[c]) for c in columns)).where(~existing.exists())
+        )
+    ).rowcount
+
+
+def seed():
+    added = _insert_missing(Principal, DEFAULT_PRINCIPAL, select(Principal.id))
+
+    departments = 0
+    for name in DEFAULT_DEPARTMENTS:
+        departments += _insert_missing(
+            Department, {"name": name}, select(Department.id).where(Department.name == name)
+        )
+    if departments:
+        versions.bump(Department.__tablename__)
+
+    return added + departments
@@ -0,0 +1,187 @@
+import csv
+import io
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from flask import Response, stream_with_context
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from models import db, Meeting, Review, Staff, HOD, Department
+
+# ----------------------------------------------------
+# MEETING + REVIEW EXPORT
+# One flat SELECT, read yield_per rows at a time and
+# written out as it arrives, so memory stays flat no
+# matter how many meetings match.
+# ----------------------------------------------------
+EXPORT_CHUNK_SIZE = 1000
+
+COLUMNS = [
+    "meeting_id", "date", "time", "status", "agenda",
+    "staff_id", "staff_name", "staff_email",
+    "hod_id", "hod_name", "department",
+    "review_summary", "review_improvements", "review_suggestions",
+]
+
+
+def export_rows(criteria):
+    # one review per meeting is the norm; a second one would repeat the meeting row
+    hod_department = aliased(Department)
+    stmt = (
+        select(
+            Meeting.id, Meeting.date, Meeting.time, Meeting.status, Meeting.agenda,
+            Meeting.staff_id, Staff.name, Staff.email,
+            Meeting.hod_id, HOD.name, hod_department.name,
+            Review.summary, Review.improvements, Review.suggestions,
+        )
+        .outerjoin(Staff, Meeting.staff_id == Staff.id)
+        .outerjoin(HOD, Meeting.hod_id == HOD.id)
+        .outerjoin(hod_department, HOD.department_id == hod_department.id)
+        .outerjoin(Review, Review.meeting_id == Meeting.id)
+        .where(*criteria)
+        .order_by(Meeting.date, Meeting.id)
+        .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    )
+    for partition in db.session.execute(stmt).partitions():
+        yield partition
+
+
+# ----------------------------------------------------
+# CSV
+# ----------------------------------------------------
+def csv_chunks(partitions):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+
+    writer.writerow(COLUMNS)
+    for rows in partitions:
+        writer.writerows(rows)
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+# ----------------------------------------------------
+# XLSX
+# A workbook is a zip of XML parts. The sheet is written
+# through ZipFile.open(..., "w") into a sink that hands
+# back whatever has been compressed so far, with inline
+# strings so no shared-string table has to be held.
+# ----------------------------------------------------
+_XLSX_STATIC = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Meetings" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_TAIL = "</sheetData></worksheet>"
+
+# characters XML 1.0 can't carry at all
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+class _Sink(io.RawIOBase):
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _cell(value):
+    if value is None:
+        return "<c/>"
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"<c><v>{value}</v></c>"
+    text = _XML_ILLEGAL.sub("", str(value))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+
+def _xml_row(values):
+    return "<row>" + "".join(_cell(v) for v in values) + "</row>"
+
+
+def xlsx_chunks(partitions):
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as book:
+        for name, body in _XLSX_STATIC.items():
+            book.writestr(name, body)
+        yield sink.drain()
+
+        with book.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write((_SHEET_HEAD + _xml_row(COLUMNS)).encode("utf-8"))
+            for rows in partitions:
+                sheet.write("".join(_xml_row(row) for row in rows).encode("utf-8"))
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+            sheet.write(_SHEET_TAIL.encode("utf-8"))
+
+    yield sink.drain()
+
+
+# ----------------------------------------------------
+# RESPONSE
+# ----------------------------------------------------
+FORMATS = {
+    "csv": (csv_chunks, "text/csv; charset=utf-8"),
+    "xlsx": (xlsx_chunks, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def export_response(fmt, criteria, filename="meetings"):
+    chunks, mimetype = FORMATS[fmt]
+    return Response(
+        stream_with_context(chunks(export_rows(criteria))),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
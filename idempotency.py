@@ -0,0 +1,113 @@
+import secrets
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+
+from flask import abort, current_app, flash, redirect, request, session
+from markupsafe import Markup
+from sqlalchemy import delete, event, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from models import db, IdempotencyKey
+
+# ----------------------------------------------------
+# IDEMPOTENT FORM POSTS
+# A form that creates something carries a one-time key
+# (a hidden field made when the form is rendered; other
+# clients can send an Idempotency-Key header instead).
+# The key is inserted in the same commit as the POST's
+# own writes, under a unique (role, user, key) index:
+# a retry of a submission that has committed costs one
+# indexed read and is redirected where the first one
+# went, and a retry racing the first fails on the index
+# at commit and is rolled back. Nothing is written
+# twice either way. POSTs without a key are unchanged.
+# ----------------------------------------------------
+FIELD = "idempotency_key"
+HEADER = "Idempotency-Key"
+
+_keys = IdempotencyKey.__table__
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def form_field():
+    return Markup(f'<input type="hidden" name="{FIELD}" value="{secrets.token_urlsafe(24)}">')
+
+
+def _owner():
+    return session.get("role") or "", session.get("id") or 0
+
+
+def _lookup(key):
+    role, user_id = _owner()
+    return db.session.execute(
+        select(_keys.c.location).where(_keys.c.role == role, _keys.c.user_id == user_id, _keys.c.key == key)
+    ).first()
+
+
+def _replay(found, done):
+    flash("That was already submitted, so it was not done again.", "info")
+    return redirect(found.location or done)
+
+
+def remember(location):
+    # where a retry should be sent, when it isn't the route's usual page
+    pending = db.session.info.get("idempotency")
+    if pending is not None:
+        pending["location"] = location
+
+
+def idempotent(done):
+    # done: where a retried submission is redirected by default
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = (request.headers.get(HEADER) or request.form.get(FIELD)) if request.method == "POST" else None
+            if not key:
+                return view(*args, **kwargs)
+            if len(key) > _keys.c.key.type.length:
+                abort(400)
+
+            found = _lookup(key)
+            if found is not None:
+                return _replay(found, done)
+
+            role, user_id = _owner()
+            db.session.info["idempotency"] = {
+                "role": role, "user_id": user_id, "key": key, "endpoint": request.endpoint, "location": None,
+            }
+            try:
+                return view(*args, **kwargs)
+            except IntegrityError:
+                # a retry that raced the first submission: the key is taken
+                db.session.rollback()
+                found = _lookup(key)
+                if found is None:
+                    raise
+                return _replay(found, done)
+            finally:
+                db.session.info.pop("idempotency", None)
+        return wrapper
+    return decorator
+
+
+@event.listens_for(db.session, "before_commit")
+def _record_key(session):
+    pending = session.info.pop("idempotency", None)
+    if pending is not None:
+        session.execute(insert(_keys).values(created_at=_now(), **pending))
+
+
+# ----------------------------------------------------
+# CLEANUP ("flask prune-idempotency-keys")
+# ----------------------------------------------------
+def prune():
+    cutoff = _now() - timedelta(seconds=current_app.config["IDEMPOTENCY_KEY_TTL"])
+    return db.session.execute(delete(_keys).where(_keys.c.created_at < cutoff)).rowcount
+
+
+def init_app(app):
+    app.config.setdefault("IDEMPOTENCY_KEY_TTL", 7 * 24 * 3600)
+    app.add_template_global(form_field, "idempotency_field")
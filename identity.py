@@ -0,0 +1,123 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from flask import current_app, g, session
+from sqlalchemy import event, select
+
+import versions
+from blocklist import blocklist_cache
+from models import db, HOD, Principal, Staff
+
+# ----------------------------------------------------
+# IDENTITY CACHE
+# The logged-in user's row, keyed by (role, id), held in
+# an LRU with a TTL so a request can know who is calling
+# without a query. Entries are dropped when the row is
+# flushed in this process; other processes notice via
+# the hod/staff/principal table versions, re-read at
+# most every IDENTITY_VERSION_CHECK seconds.
+# ----------------------------------------------------
+Identity = namedtuple("Identity", "role id name email")
+
+ROLE_MODELS = {"principal": Principal, "hod": HOD, "staff": Staff}
+
+
+class IdentityCache:
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        app.config.setdefault("IDENTITY_CACHE_SIZE", 10_000)
+        app.config.setdefault("IDENTITY_CACHE_TTL", 300)
+        app.config.setdefault("IDENTITY_VERSION_CHECK", 2.0)
+        app.before_request(load_identity)
+
+    def get(self, role, ref_id):
+        self._drop_stale_roles()
+        key = (role, ref_id)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        model = ROLE_MODELS[role]
+        row = db.session.execute(
+            select(model.id, model.name, model.email).where(model.id == ref_id)
+        ).first()
+        user = Identity(role, *row) if row else None
+
+        with self._lock:
+            self._entries[key] = (now + current_app.config["IDENTITY_CACHE_TTL"], user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > current_app.config["IDENTITY_CACHE_SIZE"]:
+                self._entries.popitem(last=False)
+        return user
+
+    def invalidate(self, role, ref_id):
+        with self._lock:
+            self._entries.pop((role, ref_id), None)
+
+    def clear(self, role=None):
+        with self._lock:
+            if role is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == role]:
+                    del self._entries[key]
+
+    def _drop_stale_roles(self):
+        interval = current_app.config["IDENTITY_VERSION_CHECK"]
+        now = time.monotonic()
+        if interval is None or now - self._checked_at < interval:
+            return
+
+        current = {name: v for name, (v, _) in versions.snapshot(*ROLE_MODELS).items()}
+        for role, version in current.items():
+            if self._versions.get(role, version) != version:
+                self.clear(role)
+        self._versions = current
+        self._checked_at = now
+
+    def stats(self):
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+identity_cache = IdentityCache()
+
+
+@event.listens_for(db.session, "after_flush")
+def _invalidate_flushed_users(session_, flush_context):
+    for obj in (*session_.dirty, *session_.deleted):
+        for role, model in ROLE_MODELS.items():
+            if isinstance(obj, model):
+                identity_cache.invalidate(role, obj.id)
+
+
+# ----------------------------------------------------
+# PER-REQUEST LOADER
+# g.user is the caller's Identity, or None. A session
+# whose user was deleted or blacklisted is cleared here,
+# so it stops working on the very next request.
+# ----------------------------------------------------
+def load_identity():
+    g.user = None
+    role, ref_id = session.get("role"), session.get("id")
+    if role not in ROLE_MODELS or ref_id is None:
+        return
+
+    user = identity_cache.get(role, ref_id)
+    if user is None or (role != "principal" and blocklist_cache.contains(role, ref_id)):
+        session.clear()
+        return
+    g.user = user
@@ -0,0 +1,216 @@
+import csv
+import io
+from datetime import datetime
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+
+import versions
+from models import db, Department, HOD, HODAvailability, Staff
+
+# ----------------------------------------------------
+# BULK CSV IMPORT
+# The whole file is parsed and validated in memory
+# first; existing emails / HODs / departments are looked
+# up with one IN query per lookup, and valid rows go in
+# with executemany, one transaction per chunk. Every
+# rejected row is reported with its CSV line number.
+# ----------------------------------------------------
+IMPORT_CHUNK_SIZE = 1000
+LOOKUP_CHUNK_SIZE = 5000  # one query for a typical term-start file
+
+
+class ImportReport:
+    def __init__(self, kind, dry_run=False):
+        self.kind = kind
+        self.dry_run = dry_run
+        self.rows = 0
+        self.inserted = 0
+        self.errors = []
+        self.failed = None   # the file itself couldn't be read; nothing was imported
+
+    def error(self, line, message):
+        self.errors.append((line, message))
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+def _text(row, key):
+    return (row.get(key) or "").strip()
+
+
+def _lookup(column, values, *select_cols):
+    values = list(values)
+    found = []
+    for i in range(0, len(values), LOOKUP_CHUNK_SIZE):
+        found.extend(db.session.execute(
+            select(*(select_cols or (column,))).where(column.in_(values[i:i + LOOKUP_CHUNK_SIZE]))
+        ))
+    return found
+
+
+# ----------------------------------------------------
+# ROW PARSERS (return a dict for insert, or raise ValueError)
+# ----------------------------------------------------
+def _person(row):
+    name, email, password = _text(row, "name"), _text(row, "email"), _text(row, "password")
+    if not name:
+        raise ValueError("name is required")
+    if "@" not in email:
+        raise ValueError("a valid email is required")
+    if not password:
+        raise ValueError("password is required")
+    return {"name": name, "email": email, "password": password, "phone": _text(row, "phone") or None}
+
+
+def _staff(row):
+    values = _person(row)
+    values["gender"] = _text(row, "gender") or None
+    values["address"] = _text(row, "address") or None
+    return values
+
+
+def _hod(row):
+    values = _person(row)
+    values["department"] = _text(row, "department")
+    return values
+
+
+def _availability(row):
+    email = _text(row, "hod_email").lower()
+    if not email:
+        raise ValueError("hod_email is required")
+    try:
+        day = datetime.strptime(_text(row, "date"), "%Y-%m-%d").date()
+        start = datetime.strptime(_text(row, "start_time"), "%H:%M").time()
+        end = datetime.strptime(_text(row, "end_time"), "%H:%M").time()
+    except ValueError:
+        raise ValueError("date must be YYYY-MM-DD and times HH:MM")
+    if end <= start:
+        raise ValueError("end_time must be after start_time")
+    return {"hod_email": email, "date": day, "start_time": start, "end_time": end}
+
+
+KINDS = {
+    "staff": (Staff, ["name", "email", "password"], _staff),
+    "hod": (HOD, ["name", "email", "password"], _hod),
+    "availability": (HODAvailability, ["hod_email", "date", "start_time", "end_time"], _availability),
+}
+
+
+# ----------------------------------------------------
+# SET-BASED CHECKS
+# ----------------------------------------------------
+def _check_emails(model, parsed, report):
+    # emails compare case-insensitively, as people type them either way;
+    # lower(email) is indexed on staff and hod (see models.py)
+    seen = {}
+    for line, values in list(parsed.items()):
+        first = seen.setdefault(values["email"].lower(), line)
+        if first != line:
+            report.error(line, f"duplicate email {values['email']} (also on line {first})")
+            del parsed[line]
+
+    taken = {email for email, in _lookup(func.lower(model.email), seen)}
+    for line, values in list(parsed.items()):
+        if values["email"].lower() in taken:
+            report.error(line, f"email {values['email']} already exists")
+            del parsed[line]
+
+
+def _resolve_departments(parsed, report):
+    names = {v["department"].lower() for v in parsed.values() if v["department"]}
+    by_name = {name.lower(): dept_id for dept_id, name in
+               _lookup(func.lower(Department.name), names, Department.id, Department.name)}
+
+    for line, values in list(parsed.items()):
+        department = values.pop("department")
+        if department and department.lower() not in by_name:
+            report.error(line, f"unknown department {department}")
+            del parsed[line]
+        else:
+            values["department_id"] = by_name.get(department.lower())
+
+
+def _resolve_hods(parsed, report):
+    emails = {v["hod_email"] for v in parsed.values()}
+    by_email = {email: hod_id for hod_id, email in
+                _lookup(func.lower(HOD.email), emails, HOD.id, func.lower(HOD.email))}
+
+    for line, values in list(parsed.items()):
+        email = values.pop("hod_email")
+        if email not in by_email:
+            report.error(line, f"no HOD with email {email}")
+            del parsed[line]
+        else:
+            values["hod_id"] = by_email[email]
+
+
+# ----------------------------------------------------
+# IMPORT
+# ----------------------------------------------------
+def _insert_chunks(model, parsed, report):
+    lines = list(parsed)
+    for i in range(0, len(lines), IMPORT_CHUNK_SIZE):
+        chunk = lines[i:i + IMPORT_CHUNK_SIZE]
+        try:
+            db.session.execute(insert(model), [parsed[line] for line in chunk])
+            versions.bump(model.__tablename__)
+            db.session.commit()
+            report.inserted += len(chunk)
+        except IntegrityError as e:
+            # something raced us (e.g. a registration); this chunk is rolled back whole
+            db.session.rollback()
+            for line in chunk:
+                report.error(line, f"not inserted: {e.orig}")
+
+
+def _parse_rows(reader, required, parse, report):
+    reader.fieldnames = [(f or "").strip().lower() for f in reader.fieldnames or []]
+    missing = [c for c in required if c not in reader.fieldnames]
+    if missing:
+        report.error(1, "missing column(s): " + ", ".join(missing))
+        return None
+
+    parsed = {}
+    for row in reader:
+        report.rows += 1
+        try:
+            parsed[reader.line_num] = parse(row)
+        except ValueError as e:
+            report.error(reader.line_num, str(e))
+    return parsed
+
+
+def import_csv(kind, stream, dry_run=False):
+    model, required, parse = KINDS[kind]
+    report = ImportReport(kind, dry_run)
+
+    reader = csv.DictReader(stream)
+    try:
+        parsed = _parse_rows(reader, required, parse, report)
+    except UnicodeDecodeError:
+        report.failed = "The file must be a UTF-8 CSV file (in Excel: Save As \"CSV UTF-8\")."
+    except csv.Error as e:
+        report.failed = f"The file is not a readable CSV file ({e})."
+    if report.failed or parsed is None:
+        return report
+
+    if model is HODAvailability:
+        _resolve_hods(parsed, report)
+    else:
+        _check_emails(model, parsed, report)
+    if model is HOD:
+        _resolve_departments(parsed, report)
+
+    report.errors.sort()
+    if not dry_run:
+        _insert_chunks(model, parsed, report)
+    return report
+
+
+def import_upload(kind, upload, dry_run=False):
+    # utf-8-sig drops the BOM Excel puts at the start of "CSV UTF-8" files
+    return import_csv(kind, io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline=""), dry_run)
@@ -0,0 +1,299 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from flask import Response, abort, current_app, g, has_request_context, request, session
+from flask.signals import before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+import cache
+
+log = logging.getLogger("csms.slow_query")
+
+# ----------------------------------------------------
+# REQUEST / QUERY INSTRUMENTATION
+# Cursor events time every statement; request hooks and
+# template signals add wall and render time. Totals are
+# kept per endpoint, in this process only (each worker
+# reports its own numbers on /metrics).
+# ----------------------------------------------------
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class EndpointStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.render_seconds = 0.0
+        self.max_queries = 0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.slowest = []  # (seconds, statement), longest first
+
+    def record(self, m, seconds, status, keep):
+        self.requests += 1
+        self.errors += status >= 500
+        self.seconds += seconds
+        self.db_queries += m["queries"]
+        self.db_seconds += m["db_seconds"]
+        self.render_seconds += m["render_seconds"]
+        self.max_queries = max(self.max_queries, m["queries"])
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+
+        if m["slowest"] and (len(self.slowest) < keep or m["slowest"][0] > self.slowest[-1][0]):
+            self.slowest = sorted(self.slowest + [m["slowest"]], reverse=True)[:keep]
+
+
+class Metrics:
+    def __init__(self):
+        self.endpoints = {}
+        self.slow_queries = deque(maxlen=200)
+        self.slow_total = 0
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, m, seconds, status, keep):
+        with self._lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = EndpointStats()
+            stats.record(m, seconds, status, keep)
+
+    def slow(self, entry):
+        with self._lock:
+            self.slow_total += 1
+            self.slow_queries.append(entry)
+
+    def reset(self):
+        with self._lock:
+            self.endpoints.clear()
+            self.slow_queries.clear()
+            self.slow_total = 0
+
+
+metrics = Metrics()
+
+
+def _current():
+    return g.get("_metrics") if has_request_context() else None
+
+
+# ----------------------------------------------------
+# SQLALCHEMY CURSOR EVENTS (every engine)
+# ----------------------------------------------------
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+
+    m = _current()
+    if m is None:
+        return
+    m["queries"] += 1
+    m["db_seconds"] += elapsed
+    if m["slowest"] is None or elapsed > m["slowest"][0]:
+        m["slowest"] = (elapsed, statement)
+
+    if elapsed * 1000 >= current_app.config["SLOW_QUERY_MS"]:
+        entry = {
+            "at": time.time(),
+            "endpoint": request.endpoint,
+            "ms": round(elapsed * 1000, 2),
+            "statement": statement,
+        }
+        metrics.slow(entry)
+        log.warning("slow query (%.1f ms) in %s: %s", entry["ms"], entry["endpoint"], statement)
+
+
+# ----------------------------------------------------
+# FLASK REQUEST HOOKS + TEMPLATE SIGNALS
+# ----------------------------------------------------
+def _start_request():
+    g._metrics = {
+        "start": time.perf_counter(),
+        "queries": 0,
+        "db_seconds": 0.0,
+        "render_seconds": 0.0,
+        "render_start": None,
+        "slowest": None,
+    }
+
+
+def _finish_request(response):
+    m = _current()
+    if m is None or request.endpoint == "metrics":
+        return response
+
+    endpoint, status = request.endpoint or "(unmatched)", response.status_code
+    keep = current_app.config["METRICS_TOP_STATEMENTS"]
+
+    def record():
+        metrics.record(endpoint, m, time.perf_counter() - m["start"], status, keep)
+
+    if response.is_streamed:
+        # streamed exports run their queries while the body is sent
+        response.call_on_close(record)
+    else:
+        record()
+    return response
+
+
+def _render_started(app, template, context, **extra):
+    m = _current()
+    if m is not None:
+        m["render_start"] = time.perf_counter()
+
+
+def _render_finished(app, template, context, **extra):
+    m = _current()
+    if m is not None and m["render_start"] is not None:
+        m["render_seconds"] += time.perf_counter() - m["render_start"]
+        m["render_start"] = None
+
+
+# ----------------------------------------------------
+# /metrics (Prometheus text format)
+# Readable by a principal session, or by a scraper
+# sending "Authorization: Bearer <METRICS_TOKEN>".
+# ----------------------------------------------------
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def render_metrics():
+    lines = []
+
+    def family(name, kind, help_text):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    with metrics._lock:
+        endpoints = sorted(metrics.endpoints.items())
+
+        family("csms_requests_total", "counter", "Requests handled, by endpoint.")
+        for ep, s in endpoints:
+            lines.append(f'csms_requests_total{{endpoint="{_label(ep)}"}} {s.requests}')
+
+        family("csms_request_errors_total", "counter", "Responses with a 5xx status, by endpoint.")
+        for ep, s in endpoints:
+            lines.append(f'csms_request_errors_total{{endpoint="{_label(ep)}"}} {s.errors}')
+
+        family("csms_request_duration_seconds", "histogram", "Request wall time, by endpoint.")
+        for ep, s in endpoints:
+            for bound, count in zip(LATENCY_BUCKETS, s.buckets):
+                lines.append(f'csms_request_duration_seconds_bucket{{endpoint="{_label(ep)}",le="{bound}"}} {count}')
+            lines.append(f'csms_request_duration_seconds_bucket{{endpoint="{_label(ep)}",le="+Inf"}} {s.requests}')
+            lines.append(f'csms_request_duration_seconds_sum{{endpoint="{_label(ep)}"}} {s.seconds:.6f}')
+            lines.append(f'csms_request_duration_seconds_count{{endpoint="{_label(ep)}"}} {s.requests}')
+
+        family("csms_db_queries_total", "counter", "SQL statements executed, by endpoint.")
+        for ep, s in endpoints:
+            lines.append(f'csms_db_queries_total{{endpoint="{_label(ep)}"}} {s.db_queries}')
+
+        family("csms_db_queries_max", "gauge", "Most SQL statements seen in one request, by endpoint.")
+        for ep, s in endpoints:
+            lines.append(f'csms_db_queries_max{{endpoint="{_label(ep)}"}} {s.max_queries}')
+
+        family("csms_db_seconds_total", "counter", "Time spent executing SQL, by endpoint.")
+        for ep, s in endpoints:
+            lines.append(f'csms_db_seconds_total{{endpoint="{_label(ep)}"}} {s.db_seconds:.6f}')
+
+        family("csms_render_seconds_total", "counter", "Time spent rendering templates, by endpoint.")
+        for ep, s in endpoints:
+            lines.append(f'csms_render_seconds_total{{endpoint="{_label(ep)}"}} {s.render_seconds:.6f}')
+
+        family("csms_slow_queries_total", "counter", "Statements slower than SLOW_QUERY_MS.")
+        lines.append(f"csms_slow_queries_total {metrics.slow_total}")
+
+    family("csms_cache_hits_total", "counter", "Cache hits, by cache.")
+    family_misses = []
+    for name, s in cache.stats().items():
+        lines.append(f'csms_cache_hits_total{{cache="{name}"}} {s["hits"]}')
+        family_misses.append(f'csms_cache_misses_total{{cache="{name}"}} {s["misses"]}')
+    family("csms_cache_misses_total", "counter", "Cache misses, by cache.")
+    lines.extend(family_misses)
+
+    return "\n".join(lines) + "\n"
+
+
+def _authorized():
+    token = current_app.config["METRICS_TOKEN"]
+    if token and request.headers.get("Authorization") == f"Bearer {token}":
+        return True
+    return session.get("role") == "principal"
+
+
+def metrics_view():
+    if not _authorized():
+        abort(403)
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+
+def slow_queries_view():
+    if not _authorized():
+        abort(403)
+    with metrics._lock:
+        entries = list(metrics.slow_queries)
+    return {"slow_queries": entries[::-1]}
+
+
+def slowest_statements():
+    with metrics._lock:
+        return {ep: [(round(sec * 1000, 2), stmt) for sec, stmt in s.slowest]
+                for ep, s in metrics.endpoints.items()}
+
+
+def init_app(app):
+    app.config.setdefault("METRICS_ENABLED", True)
+    app.config.setdefault("SLOW_QUERY_MS", 100)
+    app.config.setdefault("METRICS_TOP_STATEMENTS", 5)
+    app.config.setdefault("METRICS_TOKEN", None)
+    if not app.config["METRICS_ENABLED"]:
+        return
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    before_render_template.connect(_render_started, app)
+    template_rendered.connect(_render_finished, app)
+    app.add_url_rule("/metrics", "metrics", metrics_view)
+    app.add_url_rule("/metrics/slow-queries", "slow_queries", slow_queries_view)
+
+
+# ----------------------------------------------------
+# TEST HELPERS
+#   with assert_max_queries(3):
+#       client.get("/dashboard/hod")
+# fails with the statements listed, so an N+1 that
+# creeps into a view shows up as a failing budget.
+# ----------------------------------------------------
+@contextmanager
+def count_queries(engine=Engine):
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "after_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "after_cursor_execute", _record)
+
+
+@contextmanager
+def assert_max_queries(limit, engine=Engine):
+    with count_queries(engine) as statements:
+        yield statements
+    if len(statements) > limit:
+        listing = "\n".join(f"  {i}. {s}" for i, s in enumerate(statements, 1))
+        raise AssertionError(f"{len(statements)} queries, budget {limit}:\n{listing}")
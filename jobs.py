@@ -0,0 +1,291 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+
+from flask import current_app
+from sqlalchemy import and_, event, func, insert, or_, select, update
+
+from models import db, Job
+
+log = logging.getLogger("csms.jobs")
+
+# ----------------------------------------------------
+# BACKGROUND JOBS
+# A job is a row in the job table, so queued work
+# survives a restart. Each process runs JOB_WORKERS
+# threads (started by its first request, or by
+# "flask run-jobs" in a process of its own) that claim
+# the oldest runnable job with a single UPDATE. A claim
+# is a lease of JOB_LEASE seconds, renewed whenever the
+# handler reports progress; a job whose lease ran out
+# (its process died) is claimed again and resumes from
+# its checkpoint. Handlers commit each step together
+# with its progress, so a resumed job never repeats a
+# committed step.
+# ----------------------------------------------------
+HANDLERS = {}
+
+_job = Job.__table__
+
+
+class LeaseLost(Exception):
+    pass
+
+
+def handler(kind):
+    def decorator(fn):
+        HANDLERS[kind] = fn
+        return fn
+
+    return decorator
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+
+
+# ----------------------------------------------------
+# ENQUEUE (the caller commits; workers here are woken
+# by that commit, other processes poll)
+# ----------------------------------------------------
+def enqueue(kind, payload, total=None, created_by=(None, None)):
+    if kind not in HANDLERS:
+        raise ValueError(f"No job handler for {kind!r}")
+
+    job_id = db.session.execute(insert(_job).values(
+        kind=kind,
+        payload=json.dumps(payload),
+        status="queued",
+        progress=0,
+        total=total,
+        attempts=0,
+        created_by_role=created_by[0],
+        created_by_id=created_by[1],
+        created_at=_now(),
+    )).inserted_primary_key[0]
+    db.session.info["jobs_enqueued"] = True
+    return job_id
+
+
+def queued(kind):
+    return db.session.execute(
+        select(_job.c.id).where(_job.c.status == "queued", _job.c.kind == kind).limit(1)
+    ).scalar() is not None
+
+
+@event.listens_for(db.session, "after_commit")
+def _wake_workers(session):
+    if session.info.pop("jobs_enqueued", False):
+        runner.wake()
+
+
+# ----------------------------------------------------
+# HANDLER SIDE
+# ----------------------------------------------------
+class JobContext:
+    def __init__(self, row, worker, lease):
+        self.id = row.id
+        self.kind = row.kind
+        self.payload = json.loads(row.payload)
+        self.checkpoint = json.loads(row.checkpoint) if row.checkpoint else None
+        self.progress = row.progress
+        self.total = row.total
+        self.attempts = row.attempts
+        self._worker = worker
+        self._lease = lease
+
+    def advance(self, progress, total=None, checkpoint=None):
+        # commits the step's own writes too; if another worker has taken the
+        # job over meanwhile, the step is rolled back instead
+        values = {"progress": progress, "locked_until": time.time() + self._lease}
+        if total is not None:
+            values["total"] = total
+        if checkpoint is not None:
+            values["checkpoint"] = json.dumps(checkpoint)
+
+        updated = db.session.execute(
+            update(_job).where(_job.c.id == self.id, _job.c.locked_by == self._worker).values(**values)
+        ).rowcount
+        if not updated:
+            db.session.rollback()
+            raise LeaseLost(self.id)
+        db.session.commit()
+
+        self.progress = progress
+        self.total = total if total is not None else self.total
+        self.checkpoint = checkpoint if checkpoint is not None else self.checkpoint
+
+
+def _claim(worker):
+    # an idle poll is one read; the UPDATE re-checks the row, so of two
+    # workers that saw the same job only one gets it (the other looks again)
+    while True:
+        now = time.time()
+        runnable = or_(
+            _job.c.status == "queued",
+            and_(_job.c.status == "running", _job.c.locked_until < now),
+        )
+        job_id = db.session.execute(
+            select(_job.c.id).where(runnable).order_by(_job.c.id).limit(1)
+        ).scalar()
+        db.session.rollback()
+        if job_id is None:
+            return None
+
+        claim = (
+            update(_job)
+            .where(_job.c.id == job_id, runnable)
+            .values(
+                status="running",
+                locked_by=worker,
+                locked_until=now + current_app.config["JOB_LEASE"],
+                attempts=_job.c.attempts + 1,
+                started_at=func.coalesce(_job.c.started_at, _now()),
+            )
+        )
+        if db.session.get_bind().dialect.update_returning:
+            row = db.session.execute(claim.returning(*_job.c)).first()
+        else:
+            # no UPDATE ... RETURNING (MySQL): the rowcount says whether we won,
+            # and the row is read back inside the same transaction
+            row = None
+            if db.session.execute(claim).rowcount:
+                row = db.session.execute(select(_job).where(_job.c.id == job_id)).first()
+        db.session.commit()
+        if row is not None:
+            return row
+
+
+def _finish(job, status, result=None, error=None):
+    updated = db.session.execute(
+        update(_job).where(_job.c.id == job.id, _job.c.locked_by == job._worker).values(
+            status=status,
+            result=json.dumps(result) if result is not None else None,
+            error=error,
+            finished_at=_now(),
+            locked_until=None,
+        )
+    ).rowcount
+    if updated:
+        db.session.commit()
+    else:
+        db.session.rollback()
+
+
+def run_next():
+    worker = _worker_id()
+    row = _claim(worker)
+    if row is None:
+        return False
+
+    job = JobContext(row, worker, current_app.config["JOB_LEASE"])
+    if job.attempts > current_app.config["JOB_MAX_ATTEMPTS"]:
+        _finish(job, "failed", error=f"gave up after {job.attempts - 1} attempts")
+        return True
+
+    try:
+        result = HANDLERS[job.kind](job)
+    except LeaseLost:
+        log.warning("job %s (%s): lease lost, another worker has it", job.id, job.kind)
+        return True
+    except Exception as e:
+        db.session.rollback()
+        log.exception("job %s (%s) failed", job.id, job.kind)
+        _finish(job, "failed", error=f"{type(e).__name__}: {e}")
+        return True
+
+    _finish(job, "done", result=result)
+    return True
+
+
+def run_pending(limit=None):
+    # inline, in the caller's app context: "flask run-jobs --once" and tests
+    ran = 0
+    while (limit is None or ran < limit) and run_next():
+        ran += 1
+    return ran
+
+
+# ----------------------------------------------------
+# WORKER THREADS
+# ----------------------------------------------------
+class JobRunner:
+    def __init__(self):
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def start(self, app):
+        # threads don't survive a fork, so each worker process starts its own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            for i in range(app.config["JOB_WORKERS"]):
+                threading.Thread(target=self._loop, args=(app,), name=f"job-worker-{i}", daemon=True).start()
+
+    def wake(self):
+        self._wake.set()
+
+    def _loop(self, app):
+        while True:
+            with app.app_context():
+                try:
+                    ran = run_next()
+                except Exception:
+                    log.exception("job worker error")
+                    db.session.rollback()
+                    ran = False
+            if not ran:
+                self._wake.wait(app.config["JOB_POLL_INTERVAL"])
+                self._wake.clear()
+
+
+runner = JobRunner()
+
+
+def _start_workers():
+    if current_app.config["JOB_WORKERS"]:
+        runner.start(current_app._get_current_object())
+
+
+# ----------------------------------------------------
+# STATUS (progress endpoint)
+# ----------------------------------------------------
+def get(job_id):
+    row = db.session.execute(select(_job).where(_job.c.id == job_id)).first()
+    if row is None:
+        return None
+
+    return {
+        "id": row.id,
+        "kind": row.kind,
+        "status": row.status,
+        "progress": row.progress,
+        "total": row.total,
+        "percent": 100 if row.status == "done" else (round(100 * row.progress / row.total) if row.total else 0),
+        "result": json.loads(row.result) if row.result else None,
+        "error": row.error,
+        "created_by": [row.created_by_role, row.created_by_id],
+        "created_at": row.created_at.isoformat(timespec="seconds"),
+        "started_at": row.started_at.isoformat(timespec="seconds") if row.started_at else None,
+        "finished_at": row.finished_at.isoformat(timespec="seconds") if row.finished_at else None,
+    }
+
+
+def init_app(app):
+    app.config.setdefault("JOB_WORKERS", 2)
+    app.config.setdefault("JOB_POLL_INTERVAL", 5.0)
+    app.config.setdefault("JOB_LEASE", 60)
+    app.config.setdefault("JOB_MAX_ATTEMPTS", 3)
+    app.before_request(_start_workers)
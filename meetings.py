@@ -0,0 +1,153 @@
+from datetime import date, time
+
+from sqlalchemy import func, insert, select
+
+import changes
+import jobs
+import outbox
+import reports
+from models import db, HOD, Staff, Meeting
+
+# ----------------------------------------------------
+# BULK MEETING SCHEDULING (a background job)
+# The request only validates and enqueues. The job walks
+# the targets in id order, BULK_CHUNK_SIZE at a time:
+# "all_*" modes page through staff/hod, "selected" mode
+# through the posted ids that still exist. Each chunk is
+# one executemany plus its summary counters, committed
+# with the job's checkpoint, so a restarted job carries
+# on after the last committed chunk. No ORM objects are
+# built on either path.
+# ----------------------------------------------------
+BULK_CHUNK_SIZE = 1000
+
+MODES = {
+    "all_staff": ("staff",),
+    "all_hod": ("hod",),
+    "all_both": ("staff", "hod"),
+    "selected": ("staff", "hod"),
+}
+
+_TARGETS = {"staff": (Staff, "staff_id"), "hod": (HOD, "hod_id")}
+
+
+def _existing_ids(model, ids):
+    return db.session.execute(select(model.id).where(model.id.in_(ids)).order_by(model.id)).scalars().all()
+
+
+def _target_chunks(mode, selected, phase=0, after=0):
+    # yields (phase, role, ids, cursor); (phase, cursor) is where to resume
+    for index, role in enumerate(MODES[mode]):
+        if index < phase:
+            continue
+        model = _TARGETS[role][0]
+
+        if mode == "selected":
+            wanted = sorted(set(selected.get(role, ())))
+            wanted = wanted[next((i for i, ref_id in enumerate(wanted) if ref_id > after), len(wanted)):]
+            for i in range(0, len(wanted), BULK_CHUNK_SIZE):
+                chunk = wanted[i:i + BULK_CHUNK_SIZE]
+                yield index, role, _existing_ids(model, chunk), chunk[-1]
+        else:
+            while True:
+                ids = db.session.execute(
+                    select(model.id).where(model.id > after).order_by(model.id).limit(BULK_CHUNK_SIZE)
+                ).scalars().all()
+                if not ids:
+                    break
+                yield index, role, ids, ids[-1]
+                after = ids[-1]
+        after = 0
+
+
+def count_targets(mode, selected):
+    if mode == "selected":
+        return sum(len(set(selected.get(role, ()))) for role in MODES[mode])
+    return sum(
+        db.session.execute(select(func.count()).select_from(_TARGETS[role][0])).scalar()
+        for role in MODES[mode]
+    )
+
+
+def _insert_rows(role, ids, date_val, time_val, agenda):
+    if not ids:
+        return 0
+
+    base = {
+        "staff_id": None,
+        "hod_id": None,
+        "date": date_val,
+        "time": time_val,
+        "agenda": agenda,
+        "status": "Scheduled",
+        # Core inserts skip the ORM flush hook; taking a sequence number
+        # bumps the meeting version that hook would have
+        "change_seq": changes.next_seq(),
+    }
+    target = _TARGETS[role][1]
+    db.session.execute(insert(Meeting), [dict(base, **{target: ref_id}) for ref_id in ids])
+    reports.record_created_for_ids(role, ids)
+    return len(ids)
+
+
+def enqueue_bulk(mode, date_val, time_val, agenda, staff_ids=(), hod_ids=(), created_by=(None, None)):
+    # staff_ids / hod_ids: ints, checked by the caller; the job trusts them
+    payload = {
+        "mode": mode,
+        "date": date_val.isoformat(),
+        "time": time_val.strftime("%H:%M"),
+        "agenda": agenda,
+        "staff_ids": list(staff_ids),
+        "hod_ids": list(hod_ids),
+    }
+    return jobs.enqueue("bulk_schedule", payload, created_by=created_by)
+
+
+def _selected(payload):
+    return {"staff": payload["staff_ids"], "hod": payload["hod_ids"]}
+
+
+@jobs.handler("bulk_schedule")
+def run_bulk_schedule(job):
+    p = job.payload
+    date_val, time_val = date.fromisoformat(p["date"]), time.fromisoformat(p["time"])
+    state = job.checkpoint or {"phase": 0, "after": 0, "created": 0}
+    if job.total is None:
+        job.advance(0, total=count_targets(p["mode"], _selected(p)))
+
+    created = state["created"]
+    for phase, role, ids, cursor in _target_chunks(p["mode"], _selected(p), state["phase"], state["after"]):
+        created += _insert_rows(role, ids, date_val, time_val, p["agenda"])
+        job.advance(created, checkpoint={"phase": phase, "after": cursor, "created": created})
+
+    notify_job = jobs.enqueue("notify_bulk", dict(p, source_job=job.id)) if created else None
+    return {"created": created, "notify_job": notify_job}
+
+
+# ----------------------------------------------------
+# NOTIFICATION FAN-OUT
+# One outbox row per person the bulk job scheduled,
+# copied from staff/hod a chunk at a time; delivery is
+# the outbox's own job.
+# ----------------------------------------------------
+@jobs.handler("notify_bulk")
+def run_notify_bulk(job):
+    p = job.payload
+    subject = f"Meeting scheduled for {p['date']} at {p['time']}"
+    body = (
+        f"A meeting has been scheduled for you on {p['date']} at {p['time']}.\n\n"
+        f"Agenda: {p['agenda'] or '-'}\n"
+    )
+    state = job.checkpoint or {"phase": 0, "after": 0, "queued": 0}
+    if job.total is None:
+        job.advance(0, total=count_targets(p["mode"], _selected(p)))
+
+    queued = state["queued"]
+    for phase, role, ids, cursor in _target_chunks(p["mode"], _selected(p), state["phase"], state["after"]):
+        if ids:
+            queued += outbox.queue_for(_TARGETS[role][0], role, ids, subject, body, job_id=job.id)
+        job.advance(queued, checkpoint={"phase": phase, "after": cursor, "queued": queued})
+
+    if queued:
+        outbox.request_delivery()
+    return {"queued": queued}
@@ -0,0 +1,48 @@
+"""meeting_summary report counters
+
+Revision ID: 2b7d5f9e0c46
+Revises: d41b8e2f6a93
+Create Date: 2026-10-18 10:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2b7d5f9e0c46'
+down_revision = 'd41b8e2f6a93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('meeting_summary',
+    sa.Column('role', sa.String(length=20), nullable=False),
+    sa.Column('ref_id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('completed', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('role', 'ref_id')
+    )
+
+    # backfill from existing meetings
+    completed = "COALESCE(SUM(CASE WHEN status = 'Completed' THEN 1 ELSE 0 END), 0)"
+    op.execute("DELETE FROM meeting_summary")
+    op.execute(
+        "INSERT INTO meeting_summary (role, ref_id, total, completed) "
+        f"SELECT 'hod', hod_id, COUNT(id), {completed} FROM meeting "
+        "WHERE hod_id IS NOT NULL GROUP BY hod_id"
+    )
+    op.execute(
+        "INSERT INTO meeting_summary (role, ref_id, total, completed) "
+        f"SELECT 'staff', staff_id, COUNT(id), {completed} FROM meeting "
+        "WHERE staff_id IS NOT NULL GROUP BY staff_id"
+    )
+    op.execute(
+        "INSERT INTO meeting_summary (role, ref_id, total, completed) "
+        f"SELECT 'all', 0, COUNT(id), {completed} FROM meeting"
+    )
+
+
+def downgrade():
+    op.drop_table('meeting_summary')
@@ -0,0 +1,76 @@
+"""meeting_fts full-text index over agendas and reviews
+
+Revision ID: 4c9f2a7e8d10
+Revises: 7e2a4c8d1b35
+Create Date: 2026-10-18 11:15:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '4c9f2a7e8d10'
+down_revision = '7e2a4c8d1b35'
+branch_labels = None
+depends_on = None
+
+TRIGGERS = [
+    'meeting_fts_insert', 'meeting_fts_update', 'meeting_fts_delete',
+    'review_fts_insert', 'review_fts_update', 'review_fts_delete',
+]
+
+# the schema as of this revision, not search.py's current one
+REVIEW_TEXT = (
+    "summary = (SELECT group_concat(summary, ' ') FROM review WHERE meeting_id = {id}), "
+    "improvements = (SELECT group_concat(improvements, ' ') FROM review WHERE meeting_id = {id}), "
+    "suggestions = (SELECT group_concat(suggestions, ' ') FROM review WHERE meeting_id = {id})"
+)
+
+DDL = [
+    'CREATE VIRTUAL TABLE IF NOT EXISTS meeting_fts USING fts5('
+    "agenda, summary, improvements, suggestions, prefix='3')",
+
+    'CREATE TRIGGER IF NOT EXISTS meeting_fts_insert AFTER INSERT ON meeting BEGIN '
+    'INSERT INTO meeting_fts (rowid, agenda) VALUES (NEW.id, NEW.agenda); END',
+
+    'CREATE TRIGGER IF NOT EXISTS meeting_fts_update AFTER UPDATE OF agenda ON meeting BEGIN '
+    'UPDATE meeting_fts SET agenda = NEW.agenda WHERE rowid = NEW.id; END',
+
+    'CREATE TRIGGER IF NOT EXISTS meeting_fts_delete AFTER DELETE ON meeting BEGIN '
+    'DELETE FROM meeting_fts WHERE rowid = OLD.id; END',
+
+    'CREATE TRIGGER IF NOT EXISTS review_fts_insert AFTER INSERT ON review BEGIN '
+    f"UPDATE meeting_fts SET {REVIEW_TEXT.format(id='NEW.meeting_id')} WHERE rowid = NEW.meeting_id; END",
+
+    'CREATE TRIGGER IF NOT EXISTS review_fts_update AFTER UPDATE ON review BEGIN '
+    f"UPDATE meeting_fts SET {REVIEW_TEXT.format(id='OLD.meeting_id')} WHERE rowid = OLD.meeting_id; "
+    f"UPDATE meeting_fts SET {REVIEW_TEXT.format(id='NEW.meeting_id')} WHERE rowid = NEW.meeting_id; END",
+
+    'CREATE TRIGGER IF NOT EXISTS review_fts_delete AFTER DELETE ON review BEGIN '
+    f"UPDATE meeting_fts SET {REVIEW_TEXT.format(id='OLD.meeting_id')} WHERE rowid = OLD.meeting_id; END",
+]
+
+REBUILD = [
+    'DELETE FROM meeting_fts',
+    'INSERT INTO meeting_fts (rowid, agenda, summary, improvements, suggestions) '
+    "SELECT meeting.id, meeting.agenda, group_concat(review.summary, ' '), "
+    "group_concat(review.improvements, ' '), group_concat(review.suggestions, ' ') "
+    'FROM meeting LEFT JOIN review ON review.meeting_id = meeting.id GROUP BY meeting.id',
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    for stmt in DDL + REBUILD:
+        op.execute(stmt)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    for name in TRIGGERS:
+        op.execute(f'DROP TRIGGER IF EXISTS {name}')
+    op.execute('DROP TABLE IF EXISTS meeting_fts')
@@ -0,0 +1,78 @@
+"""person_fts full-text index over staff and hod
+
+Revision ID: 7e2a4c8d1b35
+Revises: 2b7d5f9e0c46
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7e2a4c8d1b35'
+down_revision = '2b7d5f9e0c46'
+branch_labels = None
+depends_on = None
+
+TRIGGERS = [
+    'staff_fts_insert', 'staff_fts_update', 'staff_fts_delete',
+    'hod_fts_insert', 'hod_fts_update', 'hod_fts_delete',
+]
+
+# the schema as of this revision, not search.py's current one
+DEPARTMENT_NAME = '(SELECT name FROM department WHERE id = NEW.department_id)'
+
+DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS person_fts USING fts5("
+    "name, email, phone, department, role, prefix='1 2 3 4')",
+
+    'CREATE TRIGGER IF NOT EXISTS staff_fts_insert AFTER INSERT ON staff BEGIN '
+    'INSERT INTO person_fts (rowid, name, email, phone, department, role) '
+    "VALUES (NEW.id * 2, NEW.name, NEW.email, NEW.phone, NULL, 'staff'); END",
+
+    'CREATE TRIGGER IF NOT EXISTS staff_fts_update AFTER UPDATE ON staff BEGIN '
+    'DELETE FROM person_fts WHERE rowid = OLD.id * 2; '
+    'INSERT INTO person_fts (rowid, name, email, phone, department, role) '
+    "VALUES (NEW.id * 2, NEW.name, NEW.email, NEW.phone, NULL, 'staff'); END",
+
+    'CREATE TRIGGER IF NOT EXISTS staff_fts_delete AFTER DELETE ON staff BEGIN '
+    'DELETE FROM person_fts WHERE rowid = OLD.id * 2; END',
+
+    'CREATE TRIGGER IF NOT EXISTS hod_fts_insert AFTER INSERT ON hod BEGIN '
+    'INSERT INTO person_fts (rowid, name, email, phone, department, role) '
+    f"VALUES (NEW.id * 2 + 1, NEW.name, NEW.email, NEW.phone, {DEPARTMENT_NAME}, 'hod'); END",
+
+    'CREATE TRIGGER IF NOT EXISTS hod_fts_update AFTER UPDATE ON hod BEGIN '
+    'DELETE FROM person_fts WHERE rowid = OLD.id * 2 + 1; '
+    'INSERT INTO person_fts (rowid, name, email, phone, department, role) '
+    f"VALUES (NEW.id * 2 + 1, NEW.name, NEW.email, NEW.phone, {DEPARTMENT_NAME}, 'hod'); END",
+
+    'CREATE TRIGGER IF NOT EXISTS hod_fts_delete AFTER DELETE ON hod BEGIN '
+    'DELETE FROM person_fts WHERE rowid = OLD.id * 2 + 1; END',
+]
+
+REBUILD = [
+    'DELETE FROM person_fts',
+    'INSERT INTO person_fts (rowid, name, email, phone, department, role) '
+    "SELECT id * 2, name, email, phone, NULL, 'staff' FROM staff",
+    'INSERT INTO person_fts (rowid, name, email, phone, department, role) '
+    "SELECT hod.id * 2 + 1, hod.name, hod.email, hod.phone, department.name, 'hod' "
+    'FROM hod LEFT JOIN department ON department.id = hod.department_id',
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    for stmt in DDL + REBUILD:
+        op.execute(stmt)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    for name in TRIGGERS:
+        op.execute(f'DROP TRIGGER IF EXISTS {name}')
+    op.execute('DROP TABLE IF EXISTS person_fts')
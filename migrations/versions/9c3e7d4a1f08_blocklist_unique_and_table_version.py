@@ -0,0 +1,39 @@
+"""blocklist (role, ref_id) unique constraint and table_version counters
+
+Revision ID: 9c3e7d4a1f08
+Revises: 5a0f6c1e2b71
+Create Date: 2026-10-18 10:06:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c3e7d4a1f08'
+down_revision = '5a0f6c1e2b71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # keep the oldest entry of any duplicated (role, ref_id) pair
+    op.execute(
+        "DELETE FROM blocklist WHERE id NOT IN "
+        "(SELECT MIN(id) FROM blocklist GROUP BY role, ref_id)"
+    )
+    with op.batch_alter_table('blocklist', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_blocklist_role_ref', ['role', 'ref_id'])
+
+    op.create_table('table_version',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('table_version')
+    with op.batch_alter_table('blocklist', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_blocklist_role_ref', type_='unique')
@@ -0,0 +1,52 @@
+"""meeting.change_seq for calendar feeds and delta sync
+
+Revision ID: a3f6d8e1c5b9
+Revises: e5a9c3b7d214
+Create Date: 2026-10-18 15:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f6d8e1c5b9'
+down_revision = 'e5a9c3b7d214'
+branch_labels = None
+depends_on = None
+
+# as created by 4c9f2a7e8d10_meeting_fts
+MEETING_FTS_TRIGGERS = [
+    'CREATE TRIGGER IF NOT EXISTS meeting_fts_insert AFTER INSERT ON meeting BEGIN '
+    'INSERT INTO meeting_fts (rowid, agenda) VALUES (NEW.id, NEW.agenda); END',
+
+    'CREATE TRIGGER IF NOT EXISTS meeting_fts_update AFTER UPDATE OF agenda ON meeting BEGIN '
+    'UPDATE meeting_fts SET agenda = NEW.agenda WHERE rowid = NEW.id; END',
+
+    'CREATE TRIGGER IF NOT EXISTS meeting_fts_delete AFTER DELETE ON meeting BEGIN '
+    'DELETE FROM meeting_fts WHERE rowid = OLD.id; END',
+]
+
+
+def upgrade():
+    # existing meetings start at 0: before any change a client can have seen
+    with op.batch_alter_table('meeting', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('change_seq', sa.Integer(), server_default='0', nullable=False))
+        batch_op.create_index('ix_meeting_hod_change_seq', ['hod_id', 'change_seq'], unique=False)
+        batch_op.create_index('ix_meeting_staff_change_seq', ['staff_id', 'change_seq'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('meeting', schema=None) as batch_op:
+        batch_op.drop_index('ix_meeting_staff_change_seq')
+        batch_op.drop_index('ix_meeting_hod_change_seq')
+        batch_op.drop_column('change_seq')
+
+    # SQLite drops the column by rebuilding the table, which takes the
+    # meeting_fts triggers with it
+    conn = op.get_bind()
+    if conn.dialect.name == 'sqlite' and conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'meeting_fts'"
+    ).first() is not None:
+        for stmt in MEETING_FTS_TRIGGERS:
+            op.execute(stmt)
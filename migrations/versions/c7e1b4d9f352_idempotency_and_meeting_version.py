@@ -0,0 +1,75 @@
+"""idempotency keys, meeting.version and one review per meeting
+
+Revision ID: c7e1b4d9f352
+Revises: a3f6d8e1c5b9
+Create Date: 2026-10-18 17:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e1b4d9f352'
+down_revision = 'a3f6d8e1c5b9'
+branch_labels = None
+depends_on = None
+
+# as created by 4c9f2a7e8d10_meeting_fts
+MEETING_FTS_TRIGGERS = [
+    'CREATE TRIGGER IF NOT EXISTS meeting_fts_insert AFTER INSERT ON meeting BEGIN '
+    'INSERT INTO meeting_fts (rowid, agenda) VALUES (NEW.id, NEW.agenda); END',
+
+    'CREATE TRIGGER IF NOT EXISTS meeting_fts_update AFTER UPDATE OF agenda ON meeting BEGIN '
+    'UPDATE meeting_fts SET agenda = NEW.agenda WHERE rowid = NEW.id; END',
+
+    'CREATE TRIGGER IF NOT EXISTS meeting_fts_delete AFTER DELETE ON meeting BEGIN '
+    'DELETE FROM meeting_fts WHERE rowid = OLD.id; END',
+]
+
+
+def upgrade():
+    op.create_table('idempotency_key',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('role', sa.String(length=20), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('endpoint', sa.String(length=100), nullable=False),
+    sa.Column('location', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('role', 'user_id', 'key', name='uq_idempotency_key_owner_key')
+    )
+    op.create_index('ix_idempotency_key_created_at', 'idempotency_key', ['created_at'], unique=False)
+
+    # existing meetings start at version 1
+    with op.batch_alter_table('meeting', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+    # keep the first review of any meeting that was reviewed more than once
+    op.execute(
+        "DELETE FROM review WHERE meeting_id IS NOT NULL AND id NOT IN "
+        "(SELECT MIN(id) FROM review GROUP BY meeting_id)"
+    )
+    op.drop_index('ix_review_meeting_id', table_name='review')
+    op.create_index('uq_review_meeting_id', 'review', ['meeting_id'], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_review_meeting_id', table_name='review')
+    op.create_index('ix_review_meeting_id', 'review', ['meeting_id'], unique=False)
+
+    with op.batch_alter_table('meeting', schema=None) as batch_op:
+        batch_op.drop_column('version')
+
+    # SQLite drops the column by rebuilding the table, which takes the
+    # meeting_fts triggers with it
+    conn = op.get_bind()
+    if conn.dialect.name == 'sqlite' and conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'meeting_fts'"
+    ).first() is not None:
+        for stmt in MEETING_FTS_TRIGGERS:
+            op.execute(stmt)
+
+    op.drop_index('ix_idempotency_key_created_at', table_name='idempotency_key')
+    op.drop_table('idempotency_key')
@@ -0,0 +1,49 @@
+"""composite indexes for meeting, hod_availability and review filters
+
+Revision ID: d41b8e2f6a93
+Revises: 9c3e7d4a1f08
+Create Date: 2026-10-18 10:07:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41b8e2f6a93'
+down_revision = '9c3e7d4a1f08'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('meeting', schema=None) as batch_op:
+        batch_op.create_index('ix_meeting_hod_date', ['hod_id', 'date'], unique=False)
+        batch_op.create_index('ix_meeting_hod_status', ['hod_id', 'status'], unique=False)
+        batch_op.create_index('ix_meeting_staff_date', ['staff_id', 'date'], unique=False)
+        batch_op.create_index('ix_meeting_staff_status', ['staff_id', 'status'], unique=False)
+
+    with op.batch_alter_table('hod_availability', schema=None) as batch_op:
+        batch_op.create_index('ix_hod_availability_hod_date', ['hod_id', 'date', 'start_time'], unique=False)
+
+    with op.batch_alter_table('review', schema=None) as batch_op:
+        batch_op.create_index('ix_review_meeting_id', ['meeting_id'], unique=False)
+
+    with op.batch_alter_table('hod', schema=None) as batch_op:
+        batch_op.create_index('ix_hod_department_id', ['department_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('hod', schema=None) as batch_op:
+        batch_op.drop_index('ix_hod_department_id')
+
+    with op.batch_alter_table('review', schema=None) as batch_op:
+        batch_op.drop_index('ix_review_meeting_id')
+
+    with op.batch_alter_table('hod_availability', schema=None) as batch_op:
+        batch_op.drop_index('ix_hod_availability_hod_date')
+
+    with op.batch_alter_table('meeting', schema=None) as batch_op:
+        batch_op.drop_index('ix_meeting_staff_status')
+        batch_op.drop_index('ix_meeting_staff_date')
+        batch_op.drop_index('ix_meeting_hod_status')
+        batch_op.drop_index('ix_meeting_hod_date')
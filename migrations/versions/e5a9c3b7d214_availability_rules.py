@@ -0,0 +1,45 @@
+"""recurring availability rules and their exception dates
+
+Revision ID: e5a9c3b7d214
+Revises: b8d3f1a6c2e4
+Create Date: 2026-10-18 14:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a9c3b7d214'
+down_revision = 'b8d3f1a6c2e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('availability_rule',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('hod_id', sa.Integer(), nullable=False),
+    sa.Column('starts_on', sa.Date(), nullable=False),
+    sa.Column('ends_on', sa.Date(), nullable=True),
+    sa.Column('interval_weeks', sa.Integer(), nullable=False),
+    sa.Column('start_time', sa.Time(), nullable=False),
+    sa.Column('end_time', sa.Time(), nullable=False),
+    sa.ForeignKeyConstraint(['hod_id'], ['hod.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_availability_rule_hod_id', 'availability_rule', ['hod_id'], unique=False)
+
+    op.create_table('availability_exception',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('rule_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.ForeignKeyConstraint(['rule_id'], ['availability_rule.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('rule_id', 'date', name='uq_availability_exception_rule_date')
+    )
+
+
+def downgrade():
+    op.drop_table('availability_exception')
+    op.drop_table('availability_rule')
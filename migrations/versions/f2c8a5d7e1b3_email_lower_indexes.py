@@ -0,0 +1,26 @@
+"""lower(email) indexes for case-insensitive import lookups
+
+Revision ID: f2c8a5d7e1b3
+Revises: c7e1b4d9f352
+Create Date: 2026-10-18 18:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c8a5d7e1b3'
+down_revision = 'c7e1b4d9f352'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_staff_email_lower', 'staff', [sa.text('lower(email)')], unique=False)
+    op.create_index('ix_hod_email_lower', 'hod', [sa.text('lower(email)')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_hod_email_lower', table_name='hod')
+    op.drop_index('ix_staff_email_lower', table_name='staff')
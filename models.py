@@ -24,6 +24,12 @@ class Department(db.Model):
 # HOD MODEL
 # -------------------------
 class HOD(db.Model):
+    __table_args__ = (
+        db.Index("ix_hod_department_id", "department_id"),
+        # imports look emails up case-insensitively (see importer.py)
+        db.Index("ix_hod_email_lower", db.func.lower(db.column("email"))),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
@@ -39,6 +45,10 @@ class HOD(db.Model):
 # STAFF MODEL
 # -------------------------
 class Staff(db.Model):
+    __table_args__ = (
+        db.Index("ix_staff_email_lower", db.func.lower(db.column("email"))),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
@@ -52,6 +62,10 @@ class Staff(db.Model):
 # HOD AVAILABILITY MODEL
 # -------------------------
 class HODAvailability(db.Model):
+    __table_args__ = (
+        db.Index("ix_hod_availability_hod_date", "hod_id", "date", "start_time"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     hod_id = db.Column(db.Integer, db.ForeignKey("hod.id"))
     date = db.Column(db.Date, nullable=False)
@@ -59,10 +73,51 @@ class HODAvailability(db.Model):
     end_time = db.Column(db.Time, nullable=False)
 
 
+# -------------------------
+# AVAILABILITY RULE MODEL
+# (recurring office hours, stored once; see availability.py)
+# -------------------------
+class AvailabilityRule(db.Model):
+    __table_args__ = (
+        db.Index("ix_availability_rule_hod_id", "hod_id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    hod_id = db.Column(db.Integer, db.ForeignKey("hod.id"), nullable=False)
+    starts_on = db.Column(db.Date, nullable=False)     # first occurrence; its weekday is the rule's
+    ends_on = db.Column(db.Date)                       # last day it can occur on, None = open-ended
+    interval_weeks = db.Column(db.Integer, nullable=False, default=1)   # 1 weekly, 2 biweekly
+    start_time = db.Column(db.Time, nullable=False)
+    end_time = db.Column(db.Time, nullable=False)
+
+
+# -------------------------
+# AVAILABILITY EXCEPTION MODEL
+# (a date a rule skips)
+# -------------------------
+class AvailabilityException(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint("rule_id", "date", name="uq_availability_exception_rule_date"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    rule_id = db.Column(db.Integer, db.ForeignKey("availability_rule.id"), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+
+
 # -------------------------
 # MEETING MODEL (FIXED)
 # -------------------------
 class Meeting(db.Model):
+    __table_args__ = (
+        db.Index("ix_meeting_hod_date", "hod_id", "date"),
+        db.Index("ix_meeting_hod_status", "hod_id", "status"),
+        db.Index("ix_meeting_staff_date", "staff_id", "date"),
+        db.Index("ix_meeting_staff_status", "staff_id", "status"),
+        db.Index("ix_meeting_hod_change_seq", "hod_id", "change_seq"),
+        db.Index("ix_meeting_staff_change_seq", "staff_id", "change_seq"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
 
     staff_id = db.Column(db.Integer, db.ForeignKey("staff.id"), nullable=True)
@@ -72,15 +127,27 @@ class Meeting(db.Model):
     time = db.Column(db.Time, nullable=False)
     agenda = db.Column(db.Text, nullable=False)
     status = db.Column(db.String(50), default="Requested")
+    # position in the meeting change sequence (see changes.py); 0 = before it existed
+    change_seq = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    # optimistic locking: an ORM UPDATE only applies to the version it read
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
 
     staff = db.relationship("Staff", backref="meetings", lazy=True)
     hod = db.relationship("HOD", backref="meetings", lazy=True)
+    review = db.relationship("Review", backref="meeting", uselist=False, lazy=True)
+
+    __mapper_args__ = {"version_id_col": version}
 
 
 # -------------------------
 # REVIEW MODEL
 # -------------------------
 class Review(db.Model):
+    __table_args__ = (
+        # one review per meeting
+        db.Index("uq_review_meeting_id", "meeting_id", unique=True),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     meeting_id = db.Column(db.Integer, db.ForeignKey("meeting.id"))
     summary = db.Column(db.Text)
@@ -88,11 +155,104 @@ class Review(db.Model):
     suggestions = db.Column(db.Text)
 
 
+# -------------------------
+# MEETING SUMMARY MODEL
+# (per-HOD / per-staff counters kept current as meetings
+# are created and completed; role "all" holds the totals)
+# -------------------------
+class MeetingSummary(db.Model):
+    role = db.Column(db.String(20), primary_key=True)   # "hod", "staff" or "all"
+    ref_id = db.Column(db.Integer, primary_key=True)    # hod_id / staff_id, 0 for "all"
+    total = db.Column(db.Integer, nullable=False, default=0)
+    completed = db.Column(db.Integer, nullable=False, default=0)
+
+
 # -------------------------
 # BLOCKLIST MODEL
 # -------------------------
 class Blocklist(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint("role", "ref_id", name="uq_blocklist_role_ref"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     role = db.Column(db.String(20))   # "hod" or "staff"
     ref_id = db.Column(db.Integer)    # holds hod_id or staff_id
     reason = db.Column(db.String(200))
+
+
+# -------------------------
+# TABLE VERSION MODEL
+# (one change counter per table, bumped on every write)
+# -------------------------
+class TableVersion(db.Model):
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime)
+
+
+# -------------------------
+# JOB MODEL
+# (background work queue, see jobs.py; payload/result are JSON)
+# -------------------------
+class Job(db.Model):
+    __table_args__ = (
+        db.Index("ix_job_status_id", "status", "id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="queued")   # queued / running / done / failed
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer)
+    checkpoint = db.Column(db.Text)   # handler state to resume from after a restart
+    result = db.Column(db.Text)
+    error = db.Column(db.Text)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    created_by_role = db.Column(db.String(20))
+    created_by_id = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, nullable=False)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    locked_by = db.Column(db.String(64))
+    locked_until = db.Column(db.Float)   # epoch seconds; a running job past this is picked up again
+
+
+# -------------------------
+# OUTBOX MODEL
+# (notifications waiting for / done with delivery, see outbox.py)
+# -------------------------
+class OutboxMessage(db.Model):
+    __table_args__ = (
+        db.Index("ix_outbox_message_sent_at", "sent_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer)
+    recipient_role = db.Column(db.String(20))
+    recipient_id = db.Column(db.Integer)
+    recipient_email = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    sent_at = db.Column(db.DateTime)
+
+
+# -------------------------
+# IDEMPOTENCY KEY MODEL
+# (form submissions already carried out, see idempotency.py)
+# -------------------------
+class IdempotencyKey(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint("role", "user_id", "key", name="uq_idempotency_key_owner_key"),
+        db.Index("ix_idempotency_key_created_at", "created_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    role = db.Column(db.String(20), nullable=False)   # "" and 0 when nobody is logged in
+    user_id = db.Column(db.Integer, nullable=False)
+    key = db.Column(db.String(64), nullable=False)
+    endpoint = db.Column(db.String(100), nullable=False)
+    location = db.Column(db.String(255))   # where the first submission was redirected
+    created_at = db.Column(db.DateTime, nullable=False)
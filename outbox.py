@@ -0,0 +1,96 @@
+import io
+import os
+import threading
+import time
+from email.generator import BytesGenerator
+from email.message import EmailMessage
+
+from flask import current_app
+from sqlalchemy import DateTime, Integer, String, Text, insert, literal, select, update
+
+import jobs
+from models import db, OutboxMessage
+
+# ----------------------------------------------------
+# NOTIFICATION OUTBOX
+# A notification is a row first: queue_for() copies one
+# message per recipient straight out of staff/hod with
+# INSERT ... SELECT, in the same transaction as the
+# change it announces. A "deliver_outbox" job then hands
+# unsent rows to the mail stand-in (appended to the mbox
+# file OUTBOX_MBOX) OUTBOX_BATCH_SIZE at a time and marks
+# them sent. Delivery is at-least-once: a crash between
+# writing a batch and marking it repeats that batch.
+# ----------------------------------------------------
+_outbox = OutboxMessage.__table__
+_mbox_lock = threading.Lock()
+
+_COLUMNS = ["job_id", "recipient_role", "recipient_id", "recipient_email", "subject", "body", "created_at"]
+
+
+def queue_for(model, role, ids, subject, body, job_id=None):
+    return db.session.execute(insert(_outbox).from_select(
+        _COLUMNS,
+        select(
+            literal(job_id, Integer),
+            literal(role, String),
+            model.id,
+            model.email,
+            literal(subject, String),
+            literal(body, Text),
+            literal(jobs._now(), DateTime),
+        ).where(model.id.in_(ids))
+    )).rowcount
+
+
+def request_delivery():
+    # a delivery job that is already running may have looked for the
+    # last time, so only a queued one can be relied on to see new rows
+    if not jobs.queued("deliver_outbox"):
+        jobs.enqueue("deliver_outbox", {})
+
+
+def _send_batch(rows):
+    buffer = io.BytesIO()
+    generator = BytesGenerator(buffer, mangle_from_=True)
+    for row in rows:
+        msg = EmailMessage()
+        msg["From"] = current_app.config["OUTBOX_SENDER"]
+        msg["To"] = row.recipient_email
+        msg["Subject"] = row.subject
+        msg["Message-ID"] = f"<outbox-{row.id}@csms>"
+        msg.set_content(row.body)
+        msg.set_unixfrom(f"From csms {time.asctime()}")
+        generator.flatten(msg, unixfrom=True)
+        buffer.write(b"\n")
+
+    path = current_app.config["OUTBOX_MBOX"]
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with _mbox_lock, open(path, "ab") as f:
+        f.write(buffer.getvalue())
+
+
+@jobs.handler("deliver_outbox")
+def deliver(job):
+    sent = job.progress
+    size = current_app.config["OUTBOX_BATCH_SIZE"]
+
+    while True:
+        rows = db.session.execute(
+            select(_outbox).where(_outbox.c.sent_at.is_(None)).order_by(_outbox.c.id).limit(size)
+        ).all()
+        if not rows:
+            return {"sent": sent}
+
+        _send_batch(rows)
+        db.session.execute(
+            update(_outbox).where(_outbox.c.id.in_([row.id for row in rows])).values(sent_at=jobs._now())
+        )
+        sent += len(rows)
+        job.advance(sent)
+
+
+def init_app(app):
+    app.config.setdefault("OUTBOX_MBOX", os.path.join(app.instance_path, "outbox.mbox"))
+    app.config.setdefault("OUTBOX_SENDER", "CSMS <no-reply@csms.local>")
+    app.config.setdefault("OUTBOX_BATCH_SIZE", 500)
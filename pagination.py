@@ -0,0 +1,85 @@
+import base64
+import json
+from datetime import date
+
+from flask import current_app, request, url_for
+from sqlalchemy import Date, tuple_
+
+from models import db
+
+# ----------------------------------------------------
+# KEYSET (CURSOR) PAGINATION
+# Pages are fetched with WHERE (key...) > (cursor...)
+# ORDER BY key... LIMIT n, so page N costs the same as
+# page 1. The cursor is the last row's key values,
+# base64-encoded JSON so it is opaque to clients.
+# ----------------------------------------------------
+class Page:
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+
+def init_app(app):
+    app.config.setdefault("PAGE_SIZE", 50)
+    app.config.setdefault("MAX_PAGE_SIZE", 500)
+    app.add_template_global(page_url)
+
+
+def page_url(after=None):
+    # this page's URL with only the cursor changed, so limit, filters and q carry over
+    args = request.args.to_dict(flat=False)
+    args.pop("after", None)
+    if after:
+        args["after"] = after
+    return url_for(request.endpoint, **(request.view_args or {}), **args)
+
+
+def page_size():
+    size = request.args.get("limit", current_app.config["PAGE_SIZE"], type=int)
+    return max(1, min(size, current_app.config["MAX_PAGE_SIZE"]))
+
+
+def encode_cursor(values):
+    plain = [v.isoformat() if isinstance(v, date) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(plain).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, keys):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if len(values) != len(keys):
+            return None
+        return [
+            date.fromisoformat(v) if isinstance(key.type, Date) else v
+            for key, v in zip(keys, values)
+        ]
+    except (ValueError, TypeError):
+        return None
+
+
+def keyset_page(query, keys, cursor=None, size=None, descending=False):
+    if size is None:
+        size = page_size()
+
+    values = decode_cursor(cursor, keys) if cursor else None
+    if values is not None:
+        position = tuple_(*keys)
+        query = query.filter(position < tuple_(*values) if descending else position > tuple_(*values))
+
+    query = query.order_by(*(k.desc() if descending else k for k in keys)).limit(size + 1)
+    rows = query.all() if hasattr(query, "all") else db.session.execute(query).all()
+
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        next_cursor = encode_cursor([getattr(rows[-1], k.key) for k in keys])
+
+    return Page(rows, next_cursor)
+
+
+def current_page(query, keys, **kwargs):
+    return keyset_page(query, keys, request.args.get("after"), **kwargs)
@@ -0,0 +1,253 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+from flask import Response, current_app
+from sqlalchemy import event
+
+import changes
+from calendar_feed import owner_column
+from models import db, Meeting
+
+log = logging.getLogger("csms.push")
+
+# ----------------------------------------------------
+# LIVE MEETING EVENTS (server-sent events)
+# Off unless PUSH_ENABLED: an open stream occupies a
+# worker, so it needs threaded or async workers (see
+# wsgi.py), never a handful of sync ones.
+#
+# A dashboard keeps one EventSource open on
+# /events/meetings and is sent each meeting of its
+# owner that changes (see changes.py), as it changes.
+# The meeting table is the backplane: each process runs
+# one hub thread that, while anyone is listening, checks
+# the meeting version every PUSH_POLL_INTERVAL seconds
+# (one PK lookup) and, when it has moved, reads the rows
+# stamped since, for the listening owners only, and
+# hands them to their connections. A commit in the same
+# process wakes the hub at once; other processes are
+# seen on the next check. Nothing extra is written.
+#
+# An event's id is its change_seq, so a reconnecting
+# browser (Last-Event-ID) or a freshly rendered page
+# (?since=) is first replayed what it missed. A stream
+# ends after PUSH_STREAM_SECONDS and the browser
+# reconnects; a client too far behind is sent "resync"
+# and reloads.
+# ----------------------------------------------------
+OWNER_CHUNK_SIZE = 500
+
+RETRY_MS = 3000
+
+
+def _messages(rows):
+    # [(change_seq, SSE text)]; only the last event of a change_seq carries
+    # the id, so a reconnect mid-group replays the whole group
+    out = []
+    for i, row in enumerate(rows):
+        text = f"event: meeting\ndata: {json.dumps(changes.as_json(row))}\n"
+        if i + 1 == len(rows) or rows[i + 1].change_seq != row.change_seq:
+            text += f"id: {row.change_seq}\n"
+        out.append((row.change_seq, text + "\n"))
+    return out
+
+
+def _resync():
+    return "event: resync\ndata: {}\n\n"
+
+
+class Subscription:
+    def __init__(self, key, size):
+        self.key = key
+        self.queue = queue.Queue(size)
+        self.overflowed = False
+
+    def put(self, messages):
+        try:
+            self.queue.put_nowait(messages)
+        except queue.Full:
+            self.overflowed = True
+
+
+# ----------------------------------------------------
+# HUB (one per process)
+# ----------------------------------------------------
+class Hub:
+    def __init__(self):
+        self._subs = {}    # (role, ref_id) -> set of Subscription
+        self._seq = None   # change_seq published up to; None while nobody listens
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pid = None
+
+    def start(self, app):
+        # on the first subscription in each process (so never in a gunicorn
+        # master before it forks); later ones find the pid already set
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._loop, args=(app,), name="push-hub", daemon=True).start()
+
+    def wake(self):
+        self._wake.set()
+
+    def subscribe(self, role, ref_id):
+        # the caller's session reads the starting point, so anything
+        # committed after this is published to the new subscription
+        sub = Subscription((role, ref_id), current_app.config["PUSH_QUEUE_SIZE"])
+        with self._lock:
+            if self._seq is None:
+                self._seq = changes.current_seq()
+            self._subs.setdefault(sub.key, set()).add(sub)
+        self.start(current_app._get_current_object())
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            subs = self._subs.get(sub.key, set())
+            subs.discard(sub)
+            if not subs:
+                self._subs.pop(sub.key, None)
+            if not self._subs:
+                self._seq = None
+
+    def _loop(self, app):
+        while True:
+            self._wake.wait(app.config["PUSH_POLL_INTERVAL"])
+            self._wake.clear()
+            if not self._subs:
+                continue
+            with app.app_context():
+                try:
+                    self._publish()
+                except Exception:
+                    log.exception("push hub error")
+                finally:
+                    db.session.remove()
+
+    def _publish(self):
+        with self._lock:
+            since = self._seq
+            owners = {}
+            for role, ref_id in self._subs:
+                owners.setdefault(role, []).append(ref_id)
+        if since is None:
+            return
+
+        upto = changes.current_seq()
+        if upto == since:
+            return
+
+        batches = {}
+        for role, ids in owners.items():
+            column = owner_column(role)
+            for i in range(0, len(ids), OWNER_CHUNK_SIZE):
+                rows = db.session.execute(
+                    changes.rows_query(
+                        column.in_(ids[i:i + OWNER_CHUNK_SIZE]),
+                        Meeting.change_seq > since,
+                        Meeting.change_seq <= upto,
+                    ).order_by(Meeting.change_seq, Meeting.id)
+                ).all()
+                for row in rows:
+                    batches.setdefault((role, getattr(row, column.key)), []).append(row)
+
+        with self._lock:
+            if self._seq != since:
+                # everyone left (and maybe came back) meanwhile; next round
+                return
+            self._seq = upto
+            for key, rows in batches.items():
+                messages = _messages(rows)
+                for sub in self._subs.get(key, ()):
+                    sub.put(messages)
+
+
+hub = Hub()
+
+
+@event.listens_for(db.session, "after_commit")
+def _wake_hub(session):
+    if session.info.pop("meetings_changed", False):
+        hub.wake()
+
+
+@event.listens_for(db.session, "after_soft_rollback")
+def _forget_changes(session, previous_transaction):
+    session.info.pop("meetings_changed", None)
+
+
+# ----------------------------------------------------
+# STREAM
+# ----------------------------------------------------
+def _stream(sub, replay, sent, seconds, heartbeat):
+    yield f"retry: {RETRY_MS}\n\n"
+    if replay is None:
+        yield _resync()
+        return
+    for _, text in replay:
+        yield text
+    if sub is None:
+        return
+
+    deadline = time.monotonic() + seconds
+    while (remaining := deadline - time.monotonic()) > 0:
+        try:
+            messages = sub.queue.get(timeout=min(heartbeat, remaining))
+        except queue.Empty:
+            yield ": keepalive\n\n"
+            continue
+        if sub.overflowed:
+            yield _resync()
+            return
+        # the replay may already have covered the first batches
+        fresh = [text for seq, text in messages if seq > sent]
+        if fresh:
+            sent = messages[-1][0]
+            yield "".join(fresh)
+
+
+def event_stream(role, ref_id, since):
+    config = current_app.config
+    seconds = config["PUSH_STREAM_SECONDS"]
+    # the replay must read a snapshot taken after subscribing, not the
+    # one this request's earlier reads opened
+    db.session.rollback()
+    sub = hub.subscribe(role, ref_id) if seconds > 0 else None
+    if since is None:
+        since = changes.current_seq()
+
+    limit = config["PUSH_REPLAY_LIMIT"]
+    rows = db.session.execute(
+        changes.rows_query(owner_column(role) == ref_id, Meeting.change_seq > since)
+        .order_by(Meeting.change_seq, Meeting.id)
+        .limit(limit + 1)
+    ).all()
+    replay = _messages(rows) if len(rows) <= limit else None
+    sent = rows[-1].change_seq if rows and replay is not None else since
+
+    response = Response(
+        _stream(sub, replay, sent, seconds, config["PUSH_HEARTBEAT"]),
+        mimetype="text/event-stream",
+    )
+    if sub is not None:
+        response.call_on_close(lambda: hub.unsubscribe(sub))
+    response.cache_control.no_cache = True
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+def init_app(app):
+    app.config.setdefault("PUSH_ENABLED", False)
+    app.config.setdefault("PUSH_POLL_INTERVAL", 1.0)
+    app.config.setdefault("PUSH_STREAM_SECONDS", 300)   # 0: replay, then end
+    app.config.setdefault("PUSH_HEARTBEAT", 15)
+    app.config.setdefault("PUSH_QUEUE_SIZE", 100)
+    app.config.setdefault("PUSH_REPLAY_LIMIT", 500)
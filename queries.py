@@ -0,0 +1,157 @@
+import logging
+from collections import defaultdict
+from datetime import date
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, select
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
+
+from models import db, Meeting, HOD, Staff, Department
+
+log = logging.getLogger(__name__)
+
+
+# ----------------------------------------------------
+# MEETING LISTS
+# Staff and HOD are outer-joined into the same SELECT so
+# templates can read m.staff.name / m.hod.name without a
+# query per row.
+# ----------------------------------------------------
+MEETING_KEYS = [Meeting.date, Meeting.id]
+
+
+def meetings_with_people(*criteria):
+    return (
+        Meeting.query
+        .outerjoin(Meeting.staff)
+        .outerjoin(Meeting.hod)
+        .options(contains_eager(Meeting.staff), contains_eager(Meeting.hod))
+        .filter(*criteria)
+    )
+
+
+def meetings_with_review(*criteria):
+    return meetings_with_people(*criteria).options(selectinload(Meeting.review))
+
+
+# ----------------------------------------------------
+# MEETING FILTERS (shared by search and export)
+# ----------------------------------------------------
+def meeting_filter_args(args):
+    return dict(
+        date_from=args.get("from", type=date.fromisoformat),
+        date_to=args.get("to", type=date.fromisoformat),
+        department_id=args.get("department_id", type=int),
+        hod_id=args.get("hod_id", type=int),
+        staff_id=args.get("staff_id", type=int),
+        status=args.get("status") or None,
+    )
+
+
+def meeting_criteria(date_from=None, date_to=None, department_id=None,
+                     hod_id=None, staff_id=None, status=None):
+    criteria = []
+    if date_from:
+        criteria.append(Meeting.date >= date_from)
+    if date_to:
+        criteria.append(Meeting.date <= date_to)
+    if department_id:
+        criteria.append(Meeting.hod_id.in_(select(HOD.id).where(HOD.department_id == department_id)))
+    if hod_id:
+        criteria.append(Meeting.hod_id == hod_id)
+    if staff_id:
+        criteria.append(Meeting.staff_id == staff_id)
+    if status:
+        criteria.append(Meeting.status == status)
+    return criteria
+
+
+# ----------------------------------------------------
+# HOD LISTS (department joined in)
+# ----------------------------------------------------
+def hods_with_department(*criteria):
+    return HOD.query.options(joinedload(HOD.department)).filter(*criteria)
+
+
+# ----------------------------------------------------
+# PICKER STATEMENTS (only the columns a <select> needs)
+# ----------------------------------------------------
+def staff_picker():
+    return select(Staff.id, Staff.name, Staff.email)
+
+
+def hod_picker():
+    return (
+        select(HOD.id, HOD.name, Department.name.label("department"))
+        .outerjoin(Department, HOD.department_id == Department.id)
+    )
+
+
+# ----------------------------------------------------
+# (role, ref_id) NAME RESOLUTION
+# Groups references by role and loads each group with
+# one IN query (chunked to stay under SQLite's bound
+# parameter limit).
+# ----------------------------------------------------
+REF_MODELS = {
+    "hod": (HOD, "HOD"),
+    "staff": (Staff, "Staff"),
+}
+
+IN_CHUNK_SIZE = 500
+
+
+def resolve_names(refs):
+    ids_by_role = defaultdict(set)
+    for role, ref_id in refs:
+        ids_by_role[role].add(ref_id)
+
+    names = {}
+    for role, ids in ids_by_role.items():
+        if role not in REF_MODELS:
+            continue
+        model = REF_MODELS[role][0]
+        ids = list(ids)
+        for i in range(0, len(ids), IN_CHUNK_SIZE):
+            rows = db.session.execute(
+                select(model.id, model.name).where(model.id.in_(ids[i:i + IN_CHUNK_SIZE]))
+            )
+            names.update(((role, ref_id), name) for ref_id, name in rows)
+    return names
+
+
+def ref_label(names, role, ref_id):
+    if (role, ref_id) in names:
+        return names[(role, ref_id)]
+    if role in REF_MODELS:
+        return f"{REF_MODELS[role][1]} (ID {ref_id})"
+    return "Unknown"
+
+
+# ----------------------------------------------------
+# LAZY-LOAD GUARD
+# LAZY_LOAD_GUARD = "raise" | "log" | None. When unset it
+# logs in debug mode, so a template that walks a relationship
+# per row shows up before it reaches production.
+# ----------------------------------------------------
+class LazyLoadError(RuntimeError):
+    pass
+
+
+def init_lazy_load_guard(app):
+    app.config.setdefault("LAZY_LOAD_GUARD", None)
+
+
+@event.listens_for(db.session, "do_orm_execute")
+def _guard_lazy_load(state):
+    if not state.is_select or state.lazy_loaded_from is None or not has_app_context():
+        return
+
+    mode = current_app.config.get("LAZY_LOAD_GUARD")
+    if mode is None and current_app.debug:
+        mode = "log"
+
+    if mode == "raise":
+        raise LazyLoadError(f"Lazy load of {state.loader_strategy_path[-1]}")
+    if mode == "log":
+        log.warning("Lazy load of %s", state.loader_strategy_path[-1])
@@ -0,0 +1,118 @@
+from sqlalchemy import Integer, String, case, delete, func, literal, select
+
+from models import db, Department, HOD, Staff, Meeting, MeetingSummary
+from versions import UPSERT_DIALECTS
+
+# ----------------------------------------------------
+# MEETING SUMMARY (materialized report counters)
+# Meeting writes add to meeting_summary in the same
+# transaction, so report pages read a handful of rows
+# instead of aggregating the whole meeting history.
+# rebuild() recomputes everything with GROUP BY.
+# ----------------------------------------------------
+_summary = MeetingSummary.__table__
+
+
+def _upsert(rows=None, from_select=None):
+    conn = db.session.connection()
+    insert = UPSERT_DIALECTS.get(conn.dialect.name)
+
+    if insert is None:
+        # no ON CONFLICT here (MySQL, ...): update, then insert what wasn't there
+        if from_select is not None:
+            rows = [row._asdict() for row in conn.execute(from_select)]
+        for row in rows:
+            result = conn.execute(
+                _summary.update()
+                .where(_summary.c.role == row["role"], _summary.c.ref_id == row["ref_id"])
+                .values(total=_summary.c.total + row["total"], completed=_summary.c.completed + row["completed"])
+            )
+            if result.rowcount == 0:
+                conn.execute(_summary.insert().values(row))
+        return
+
+    if from_select is not None:
+        stmt = insert(_summary).from_select(["role", "ref_id", "total", "completed"], from_select)
+    else:
+        stmt = insert(_summary).values(rows)
+
+    conn.execute(stmt.on_conflict_do_update(
+        index_elements=[_summary.c.role, _summary.c.ref_id],
+        set_={
+            "total": _summary.c.total + stmt.excluded.total,
+            "completed": _summary.c.completed + stmt.excluded.completed,
+        },
+    ))
+
+
+def _rows(staff_id, hod_id, total, completed):
+    rows = [{"role": "all", "ref_id": 0, "total": total, "completed": completed}]
+    if staff_id is not None:
+        rows.append({"role": "staff", "ref_id": staff_id, "total": total, "completed": completed})
+    if hod_id is not None:
+        rows.append({"role": "hod", "ref_id": hod_id, "total": total, "completed": completed})
+    return rows
+
+
+def record_created(staff_id, hod_id):
+    _upsert(_rows(staff_id, hod_id, 1, 0))
+
+
+def record_completed(staff_id, hod_id):
+    _upsert(_rows(staff_id, hod_id, 0, 1))
+
+
+def record_created_for_ids(role, ids):
+    if not ids:
+        return
+    _upsert([{"role": role, "ref_id": ref_id, "total": 1, "completed": 0} for ref_id in ids])
+    _upsert([{"role": "all", "ref_id": 0, "total": len(ids), "completed": 0}])
+
+
+def rebuild():
+    completed = func.coalesce(func.sum(case((Meeting.status == "Completed", 1), else_=0)), 0)
+    columns = ["role", "ref_id", "total", "completed"]
+
+    db.session.execute(delete(MeetingSummary))
+    for role, key in (("hod", Meeting.hod_id), ("staff", Meeting.staff_id)):
+        db.session.execute(_summary.insert().from_select(columns, (
+            select(literal(role, String), key, func.count(Meeting.id), completed)
+            .where(key.is_not(None))
+            .group_by(key)
+        )))
+    db.session.execute(_summary.insert().from_select(columns, (
+        select(literal("all", String), literal(0, Integer), func.count(Meeting.id), completed)
+    )))
+
+
+# ----------------------------------------------------
+# REPORT QUERIES
+# ----------------------------------------------------
+def counts(role, ref_id):
+    row = db.session.get(MeetingSummary, (role, ref_id))
+    return (row.total, row.completed) if row else (0, 0)
+
+
+def overview():
+    total_hods, total_staff = db.session.execute(select(
+        select(func.count()).select_from(HOD).scalar_subquery(),
+        select(func.count()).select_from(Staff).scalar_subquery(),
+    )).one()
+
+    department_data = db.session.execute(
+        select(
+            Department.name.label("department"),
+            func.coalesce(HOD.name, "—").label("hod"),
+            func.coalesce(MeetingSummary.total, 0).label("meeting_count"),
+        )
+        .outerjoin(HOD, HOD.department_id == Department.id)
+        .outerjoin(MeetingSummary, (MeetingSummary.role == "hod") & (MeetingSummary.ref_id == HOD.id))
+        .order_by(Department.name, HOD.name)
+    ).all()
+
+    return {
+        "total_hods": total_hods,
+        "total_staff": total_staff,
+        "total_meetings": counts("all", 0)[0],
+        "department_data": department_data,
+    }
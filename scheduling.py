@@ -0,0 +1,100 @@
+from bisect import bisect_left
+from datetime import datetime, timedelta, time
+
+from flask import current_app
+from sqlalchemy import exists, select, true
+
+import availability
+from models import db, Meeting
+
+# ----------------------------------------------------
+# MEETING CONFLICT DETECTION
+# Every lookup is a range scan on the (hod_id, date, ...)
+# indexes, so cost depends on one HOD's day, not on the
+# size of the availability or meeting tables.
+# ----------------------------------------------------
+def init_app(app):
+    app.config.setdefault("MEETING_DURATION_MINUTES", 30)
+    app.config.setdefault("REQUIRE_AVAILABILITY", True)
+    # office hours listed on the HOD dashboard
+    app.config.setdefault("OFFICE_HOURS_DAYS", 14)
+
+
+def _duration():
+    return timedelta(minutes=current_app.config["MEETING_DURATION_MINUTES"])
+
+
+def _shift(t, delta):
+    moved = datetime.combine(datetime.min, t) + delta
+    if moved.date() != datetime.min.date():
+        return time.max if delta > timedelta(0) else time.min
+    return moved.time()
+
+
+def check_request(hod_id, day, start):
+    duration = _duration()
+    end = _shift(start, duration)
+
+    require = current_app.config["REQUIRE_AVAILABILITY"]
+    covered = availability.covering(hod_id, day, start, end) if require else true()
+    booked = exists().where(
+        Meeting.hod_id == hod_id,
+        Meeting.date == day,
+        Meeting.time > _shift(start, -duration),
+        Meeting.time < end,
+    )
+    is_covered, is_booked = db.session.execute(select(covered, booked)).one()
+
+    if require and not is_covered:
+        return "HOD is not available at that time."
+    if is_booked:
+        return "HOD already has a meeting at that time."
+    return None
+
+
+# ----------------------------------------------------
+# NEXT FREE SLOTS
+# The windows in range (one-off and recurring, see
+# availability.py), one query for the bookings in
+# range; slots are stepped through each window and
+# checked against the sorted bookings.
+# ----------------------------------------------------
+def free_slots(hod_id, start_day, days=7, limit=10):
+    duration = _duration()
+    last_day = start_day + timedelta(days=days - 1)
+
+    windows = availability.windows(hod_id, start_day, last_day)
+    if not windows:
+        return []
+
+    booked = {}
+    for day, t in db.session.execute(
+        select(Meeting.date, Meeting.time)
+        .where(Meeting.hod_id == hod_id, Meeting.date.between(start_day, last_day))
+        .order_by(Meeting.date, Meeting.time)
+    ):
+        booked.setdefault(day, []).append(datetime.combine(day, t))
+
+    slots = []
+    seen = set()
+    for day, window_start, window_end, _ in windows:
+        taken = booked.get(day, [])
+        slot = datetime.combine(day, window_start)
+        close = datetime.combine(day, window_end)
+
+        while slot + duration <= close:
+            # first booking that ends after this slot starts
+            i = bisect_left(taken, slot - duration + timedelta(microseconds=1))
+            if i < len(taken) and taken[i] < slot + duration:
+                slot = taken[i] + duration
+                continue
+
+            # overlapping windows would otherwise offer the same slot twice
+            if slot not in seen:
+                seen.add(slot)
+                slots.append(slot)
+            if len(slots) == limit:
+                return slots
+            slot += duration
+
+    return slots
@@ -0,0 +1,386 @@
+import re
+import threading
+from bisect import bisect_left
+
+from sqlalchemy import and_, column, event, or_, select, table, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import joinedload
+
+import versions
+from models import db, Department, HOD, Meeting, Review, Staff
+from queries import meeting_criteria, meetings_with_review
+
+# ----------------------------------------------------
+# PEOPLE SEARCH
+# On SQLite, staff and HODs are mirrored into an FTS5
+# table by triggers, so every insert/update/delete path
+# (registration, principal add, imports) keeps it in
+# sync without application code. rowid = id * 2 + role
+# bit, so triggers touch exactly one FTS row.
+# Anywhere FTS5 is missing, an in-memory prefix index
+# rebuilt on table-version change answers instead.
+# ----------------------------------------------------
+_DEPARTMENT_NAME = "(SELECT name FROM department WHERE id = NEW.department_id)"
+
+PERSON_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS person_fts USING fts5("
+    "name, email, phone, department, role, prefix='1 2 3 4')",
+
+    "CREATE TRIGGER IF NOT EXISTS staff_fts_insert AFTER INSERT ON staff BEGIN "
+    "INSERT INTO person_fts (rowid, name, email, phone, department, role) "
+    "VALUES (NEW.id * 2, NEW.name, NEW.email, NEW.phone, NULL, 'staff'); END",
+
+    "CREATE TRIGGER IF NOT EXISTS staff_fts_update AFTER UPDATE ON staff BEGIN "
+    "DELETE FROM person_fts WHERE rowid = OLD.id * 2; "
+    "INSERT INTO person_fts (rowid, name, email, phone, department, role) "
+    "VALUES (NEW.id * 2, NEW.name, NEW.email, NEW.phone, NULL, 'staff'); END",
+
+    "CREATE TRIGGER IF NOT EXISTS staff_fts_delete AFTER DELETE ON staff BEGIN "
+    "DELETE FROM person_fts WHERE rowid = OLD.id * 2; END",
+
+    "CREATE TRIGGER IF NOT EXISTS hod_fts_insert AFTER INSERT ON hod BEGIN "
+    "INSERT INTO person_fts (rowid, name, email, phone, department, role) "
+    f"VALUES (NEW.id * 2 + 1, NEW.name, NEW.email, NEW.phone, {_DEPARTMENT_NAME}, 'hod'); END",
+
+    "CREATE TRIGGER IF NOT EXISTS hod_fts_update AFTER UPDATE ON hod BEGIN "
+    "DELETE FROM person_fts WHERE rowid = OLD.id * 2 + 1; "
+    "INSERT INTO person_fts (rowid, name, email, phone, department, role) "
+    f"VALUES (NEW.id * 2 + 1, NEW.name, NEW.email, NEW.phone, {_DEPARTMENT_NAME}, 'hod'); END",
+
+    "CREATE TRIGGER IF NOT EXISTS hod_fts_delete AFTER DELETE ON hod BEGIN "
+    "DELETE FROM person_fts WHERE rowid = OLD.id * 2 + 1; END",
+]
+
+PERSON_FTS_REBUILD = [
+    "DELETE FROM person_fts",
+    "INSERT INTO person_fts (rowid, name, email, phone, department, role) "
+    "SELECT id * 2, name, email, phone, NULL, 'staff' FROM staff",
+    "INSERT INTO person_fts (rowid, name, email, phone, department, role) "
+    "SELECT hod.id * 2 + 1, hod.name, hod.email, hod.phone, department.name, 'hod' "
+    "FROM hod LEFT JOIN department ON department.id = hod.department_id",
+]
+
+# ----------------------------------------------------
+# MEETING SEARCH
+# rowid = meeting.id. Meeting triggers maintain the
+# agenda; review triggers recompute that meeting's
+# review columns, so bulk INSERT ... SELECT scheduling
+# and review_meeting both index incrementally.
+# ----------------------------------------------------
+_REVIEW_TEXT = (
+    "summary = (SELECT group_concat(summary, ' ') FROM review WHERE meeting_id = {id}), "
+    "improvements = (SELECT group_concat(improvements, ' ') FROM review WHERE meeting_id = {id}), "
+    "suggestions = (SELECT group_concat(suggestions, ' ') FROM review WHERE meeting_id = {id})"
+)
+
+MEETING_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS meeting_fts USING fts5("
+    "agenda, summary, improvements, suggestions, prefix='3')",
+
+    "CREATE TRIGGER IF NOT EXISTS meeting_fts_insert AFTER INSERT ON meeting BEGIN "
+    "INSERT INTO meeting_fts (rowid, agenda) VALUES (NEW.id, NEW.agenda); END",
+
+    "CREATE TRIGGER IF NOT EXISTS meeting_fts_update AFTER UPDATE OF agenda ON meeting BEGIN "
+    "UPDATE meeting_fts SET agenda = NEW.agenda WHERE rowid = NEW.id; END",
+
+    "CREATE TRIGGER IF NOT EXISTS meeting_fts_delete AFTER DELETE ON meeting BEGIN "
+    "DELETE FROM meeting_fts WHERE rowid = OLD.id; END",
+
+    "CREATE TRIGGER IF NOT EXISTS review_fts_insert AFTER INSERT ON review BEGIN "
+    f"UPDATE meeting_fts SET {_REVIEW_TEXT.format(id='NEW.meeting_id')} WHERE rowid = NEW.meeting_id; END",
+
+    "CREATE TRIGGER IF NOT EXISTS review_fts_update AFTER UPDATE ON review BEGIN "
+    f"UPDATE meeting_fts SET {_REVIEW_TEXT.format(id='OLD.meeting_id')} WHERE rowid = OLD.meeting_id; "
+    f"UPDATE meeting_fts SET {_REVIEW_TEXT.format(id='NEW.meeting_id')} WHERE rowid = NEW.meeting_id; END",
+
+    "CREATE TRIGGER IF NOT EXISTS review_fts_delete AFTER DELETE ON review BEGIN "
+    f"UPDATE meeting_fts SET {_REVIEW_TEXT.format(id='OLD.meeting_id')} WHERE rowid = OLD.meeting_id; END",
+]
+
+MEETING_FTS_REBUILD = [
+    "DELETE FROM meeting_fts",
+    "INSERT INTO meeting_fts (rowid, agenda, summary, improvements, suggestions) "
+    "SELECT meeting.id, meeting.agenda, group_concat(review.summary, ' '), "
+    "group_concat(review.improvements, ' '), group_concat(review.suggestions, ' ') "
+    "FROM meeting LEFT JOIN review ON review.meeting_id = meeting.id GROUP BY meeting.id",
+]
+
+FTS_INDEXES = {
+    "person_fts": (PERSON_FTS_DDL, PERSON_FTS_REBUILD),
+    "meeting_fts": (MEETING_FTS_DDL, MEETING_FTS_REBUILD),
+}
+
+# bm25 column weights: name, email, phone, department, role
+_BM25 = "bm25(person_fts, 10.0, 4.0, 2.0, 1.0, 0.0)"
+
+# autocomplete ranks only the first POOL matches, so a short
+# prefix like "st" costs the same on 100 people as on 100k.
+# bm25 is skipped there: its IDF term has to count every
+# match of a prefix, which is exactly the cost being avoided.
+AUTOCOMPLETE_POOL = 200
+
+_TOKEN = re.compile(r"[\w@.+-]+")
+
+
+def _tokens(q):
+    return [t.lower() for t in _TOKEN.findall(q or "")][:8]
+
+
+def _name_rank(name, tokens):
+    name_tokens = _tokens(name)
+    hits = sum(any(n.startswith(t) for n in name_tokens) for t in tokens)
+    return (-hits, len(name or ""), (name or "").lower())
+
+
+def is_fts_table(name):
+    return any(name == index or name.startswith(index + "_") for index in FTS_INDEXES)
+
+
+def install_fts(conn, names=tuple(FTS_INDEXES)):
+    for name in names:
+        for stmt in FTS_INDEXES[name][0]:
+            conn.exec_driver_sql(stmt)
+
+
+def rebuild_fts(conn, names=tuple(FTS_INDEXES)):
+    for name in names:
+        for stmt in FTS_INDEXES[name][1]:
+            conn.exec_driver_sql(stmt)
+
+
+def fts_exists(conn, name):
+    return conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).first() is not None
+
+
+@event.listens_for(db.metadata, "after_create")
+def _create_fts(target, connection, **kw):
+    if connection.dialect.name != "sqlite":
+        return
+    missing = [name for name in FTS_INDEXES if not fts_exists(connection, name)]
+    try:
+        install_fts(connection, missing)
+        rebuild_fts(connection, missing)
+    except OperationalError:
+        # SQLite built without FTS5; the fallbacks take over
+        pass
+
+
+# ----------------------------------------------------
+# FTS5 BACKEND
+# ----------------------------------------------------
+_fts_ready = {}
+
+
+def _fts_available(name="person_fts"):
+    if name not in _fts_ready:
+        try:
+            db.session.execute(text(f"SELECT rowid FROM {name} LIMIT 0"))
+            _fts_ready[name] = True
+        except OperationalError:
+            db.session.rollback()
+            _fts_ready[name] = False
+    return _fts_ready[name]
+
+
+def _match_expr(tokens, role):
+    # every token is a quoted prefix term, so user input can't inject FTS syntax
+    terms = " AND ".join('"%s"*' % t.replace('"', "") for t in tokens)
+    return f'role : {role} AND ({terms})' if role else terms
+
+
+def _fts_search(role, tokens, limit, offset):
+    rows = db.session.execute(
+        text(
+            "SELECT rowid, name, email, role FROM person_fts "
+            f"WHERE person_fts MATCH :q ORDER BY {_BM25} LIMIT :limit OFFSET :offset"
+        ),
+        {"q": _match_expr(tokens, role), "limit": limit, "offset": offset},
+    )
+    return [(r.role, r.rowid // 2, r.name, r.email) for r in rows]
+
+
+def _fts_suggest(role, tokens, limit):
+    # no ORDER BY: FTS5 streams matches in rowid order and stops at the pool
+    rows = db.session.execute(
+        text(
+            "SELECT rowid, name, email, role FROM person_fts "
+            "WHERE person_fts MATCH :q AND (:role IS NULL OR role = :role) LIMIT :pool"
+        ),
+        {"q": _match_expr(tokens, None), "role": role, "pool": AUTOCOMPLETE_POOL},
+    )
+    best = sorted(rows, key=lambda r: (_name_rank(r.name, tokens), r.rowid))[:limit]
+    return [(r.role, r.rowid // 2, r.name, r.email) for r in best]
+
+
+# ----------------------------------------------------
+# IN-MEMORY PREFIX INDEX (fallback)
+# ----------------------------------------------------
+class PrefixIndex:
+    TABLES = ("staff", "hod", "department")
+
+    def __init__(self):
+        self._entries = []
+        self._people = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        version = tuple(v for v, _ in versions.snapshot(*self.TABLES).values())
+        if version == self._version:
+            return
+
+        people = {}
+        for row in db.session.execute(select(Staff.id, Staff.name, Staff.email, Staff.phone)):
+            people[("staff", row.id)] = (row.name, row.email, row.phone, None)
+        for row in db.session.execute(
+            select(HOD.id, HOD.name, HOD.email, HOD.phone, Department.name.label("department"))
+            .outerjoin(Department, HOD.department_id == Department.id)
+        ):
+            people[("hod", row.id)] = (row.name, row.email, row.phone, row.department)
+
+        entries = []
+        for key, fields in people.items():
+            for field in fields:
+                entries.extend((token, key) for token in _tokens(field))
+        entries.sort()
+
+        with self._lock:
+            self._entries, self._people, self._version = entries, people, version
+
+    def _span(self, token):
+        lo = bisect_left(self._entries, (token,))
+        hi = bisect_left(self._entries, (token + "\uffff",), lo)
+        return lo, hi
+
+    def _matches_all(self, key, tokens):
+        words = [w for field in self._people[key] for w in _tokens(field)]
+        return all(any(w.startswith(t) for w in words) for t in tokens)
+
+    def search(self, role, tokens, limit, offset, pool=None):
+        self._refresh()
+
+        # walk the narrowest token's span and verify the rest per person
+        lo, hi = min((self._span(t) for t in tokens), key=lambda span: span[1] - span[0])
+        keys = []
+        seen = set()
+        for _, key in self._entries[lo:hi]:
+            if key in seen or (role is not None and key[0] != role):
+                continue
+            seen.add(key)
+            if self._matches_all(key, tokens):
+                keys.append(key)
+                if pool is not None and len(keys) >= pool:
+                    break
+
+        keys.sort(key=lambda k: (_name_rank(self._people[k][0], tokens), k))
+        return [(r, ref_id, *self._people[(r, ref_id)][:2]) for r, ref_id in keys[offset:offset + limit]]
+
+
+prefix_index = PrefixIndex()
+
+
+# ----------------------------------------------------
+# PUBLIC API
+# ----------------------------------------------------
+def search(role, q, limit=20, offset=0):
+    tokens = _tokens(q)
+    if not tokens:
+        return []
+    if _fts_available():
+        return _fts_search(role, tokens, limit, offset)
+    return prefix_index.search(role, tokens, limit, offset)
+
+
+def suggest(role, q, limit=8):
+    tokens = _tokens(q)
+    if not tokens:
+        return []
+    if _fts_available():
+        return _fts_suggest(role, tokens, limit)
+    return prefix_index.search(role, tokens, limit, 0, pool=AUTOCOMPLETE_POOL)
+
+
+def search_people(role, q, page=1, per_page=20):
+    model = Staff if role == "staff" else HOD
+    hits = search(role, q, limit=per_page + 1, offset=(page - 1) * per_page)
+    has_more = len(hits) > per_page
+    ids = [ref_id for _, ref_id, _, _ in hits[:per_page]]
+
+    query = model.query.filter(model.id.in_(ids))
+    if model is HOD:
+        query = query.options(joinedload(HOD.department))
+    by_id = {obj.id: obj for obj in query}
+    return [by_id[i] for i in ids if i in by_id], has_more
+
+
+def autocomplete(q, role=None, limit=8):
+    return [
+        {"role": r, "id": ref_id, "name": name, "email": email}
+        for r, ref_id, name, email in suggest(role, q, limit=limit)
+    ]
+
+
+# ----------------------------------------------------
+# MEETING / REVIEW TEXT SEARCH
+# Quoted "phrases" match exactly, bare words as
+# prefixes. Filters are applied in the same statement
+# as MATCH, so only one page of ids leaves SQLite.
+# ----------------------------------------------------
+_PHRASE = re.compile(r'"([^"]*)"|(\S+)')
+
+_meeting_fts = table("meeting_fts", column("rowid"))
+
+# agenda counts more than the review columns
+_MEETING_BM25 = "bm25(meeting_fts, 4.0, 1.0, 1.0, 1.0)"
+
+
+def _terms(q):
+    terms = []
+    for phrase, word in _PHRASE.findall(q or ""):
+        tokens = _tokens(phrase or word)
+        if tokens:
+            terms.append((" ".join(tokens), bool(phrase)))
+    return terms[:8]
+
+
+def _fts_meeting_ids(terms, criteria):
+    expr = " AND ".join('"%s"' % t if phrase else '"%s"*' % t for t, phrase in terms)
+    return (
+        select(Meeting.id)
+        .join(_meeting_fts, _meeting_fts.c.rowid == Meeting.id)
+        .where(text("meeting_fts MATCH :q").bindparams(q=expr), *criteria)
+        .order_by(text(_MEETING_BM25), Meeting.date.desc(), Meeting.id.desc())
+    )
+
+
+def _like_meeting_ids(terms, criteria):
+    columns = (Meeting.agenda, Review.summary, Review.improvements, Review.suggestions)
+    matches = [or_(*(c.ilike(f"%{t}%") for c in columns)) for t, _ in terms]
+    return (
+        select(Meeting.id)
+        .outerjoin(Review, Review.meeting_id == Meeting.id)
+        .where(and_(*matches), *criteria)
+        .group_by(Meeting.id)
+        .order_by(Meeting.date.desc(), Meeting.id.desc())
+    )
+
+
+def search_meetings(q, page=1, per_page=20, **filters):
+    terms = _terms(q)
+    if not terms:
+        return [], False
+
+    criteria = meeting_criteria(**filters)
+    if _fts_available("meeting_fts"):
+        stmt = _fts_meeting_ids(terms, criteria)
+    else:
+        stmt = _like_meeting_ids(terms, criteria)
+
+    ids = db.session.scalars(stmt.limit(per_page + 1).offset((page - 1) * per_page)).all()
+    has_more = len(ids) > per_page
+    ids = ids[:per_page]
+
+    by_id = {m.id: m for m in meetings_with_review(Meeting.id.in_(ids))}
+    return [by_id[i] for i in ids if i in by_id], has_more
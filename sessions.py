@@ -0,0 +1,189 @@
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+from flask import current_app
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+# ----------------------------------------------------
+# SERVER-SIDE SESSIONS (optional)
+# SESSION_BACKEND = None keeps Flask's signed cookie.
+# "sqlite" keeps session data in a small SQLite file of
+# its own (instance/sessions.db by default), shared by
+# every worker on the host; "memory" is a per-process
+# dict standing in for a local Redis. Either way the
+# cookie only carries a random id, and deleting the row
+# ends the session on its next request. The main
+# database is never touched.
+# ----------------------------------------------------
+class ServerSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.owner = self._owner()
+
+    def _owner(self):
+        return self.get("role"), self.get("id")
+
+
+class MemorySessionStore:
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, sid):
+        entry = self._data.get(sid)
+        if entry is None or entry[3] < time.time():
+            return None
+        return entry[0]
+
+    def set(self, sid, data, role, ref_id, expires_at):
+        with self._lock:
+            self._data[sid] = (data, role, ref_id, expires_at)
+
+    def delete(self, sid):
+        with self._lock:
+            self._data.pop(sid, None)
+
+    def revoke_user(self, role, ref_id):
+        with self._lock:
+            for sid in [s for s, e in self._data.items() if (e[1], e[2]) == (role, ref_id)]:
+                del self._data[sid]
+
+    def purge_expired(self):
+        now = time.time()
+        with self._lock:
+            for sid in [s for s, e in self._data.items() if e[3] < now]:
+                del self._data[sid]
+
+
+class SqliteSessionStore:
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS session ("
+        "sid TEXT PRIMARY KEY, data TEXT NOT NULL, role TEXT, ref_id INTEGER, expires_at REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS ix_session_owner ON session (role, ref_id)",
+    )
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _connect(self):
+        # one connection per thread, opened on first use
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            with conn:
+                for stmt in self.SCHEMA:
+                    conn.execute(stmt)
+            self._local.conn = conn
+        return conn
+
+    def get(self, sid):
+        row = self._connect().execute(
+            "SELECT data FROM session WHERE sid = ? AND expires_at >= ?", (sid, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, sid, data, role, ref_id, expires_at):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO session (sid, data, role, ref_id, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (sid, data, role, ref_id, expires_at),
+            )
+
+    def delete(self, sid):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM session WHERE sid = ?", (sid,))
+
+    def revoke_user(self, role, ref_id):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM session WHERE role = ? AND ref_id = ?", (role, ref_id))
+
+    def purge_expired(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM session WHERE expires_at < ?", (time.time(),))
+
+
+class ServerSessionInterface(SessionInterface):
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, store):
+        self.store = store
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            data = self.store.get(sid)
+            if data is not None:
+                return ServerSession(self.serializer.loads(data), sid=sid)
+        return ServerSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            if session.modified:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        if session.modified and session._owner() != session.owner:
+            # logged in (or switched user): never keep a pre-login session id
+            self.store.delete(session.sid)
+            session.sid = secrets.token_urlsafe(32)
+            self.store.purge_expired()
+
+        if session.modified:
+            role, ref_id = session._owner()
+            self.store.set(
+                session.sid, self.serializer.dumps(dict(session)), role, ref_id,
+                time.time() + app.permanent_session_lifetime.total_seconds(),
+            )
+        elif not self.should_set_cookie(app, session):
+            return
+
+        response.set_cookie(
+            name, session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain, path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+
+def init_app(app):
+    app.config.setdefault("SESSION_BACKEND", None)
+    app.config.setdefault("SESSION_DB_PATH", os.path.join(app.instance_path, "sessions.db"))
+
+    backend = app.config["SESSION_BACKEND"]
+    if backend == "sqlite":
+        store = SqliteSessionStore(app.config["SESSION_DB_PATH"])
+    elif backend == "memory":
+        store = MemorySessionStore()
+    elif backend is None:
+        return
+    else:
+        raise ValueError(f"Unknown SESSION_BACKEND {backend!r}")
+    app.session_interface = ServerSessionInterface(store)
+
+
+def revoke_user(role, ref_id):
+    interface = current_app.session_interface
+    if isinstance(interface, ServerSessionInterface):
+        interface.store.revoke_user(role, ref_id)
@@ -0,0 +1,27 @@
+// Job progress: polls the job's JSON status until it is done or failed.
+(function () {
+    var box = document.getElementById("job");
+    if (!box) return;
+
+    function field(name) { return box.querySelector('[data-field="' + name + '"]'); }
+
+    function show(job) {
+        field("status").textContent = job.status;
+        field("progress").textContent = job.progress;
+        field("total").textContent = job.total === null ? "?" : job.total;
+        field("bar").style.width = job.percent + "%";
+        field("bar").textContent = job.percent + "%";
+        field("result").textContent = job.result ? JSON.stringify(job.result) : "";
+        field("error").textContent = job.error || "";
+        return job.status === "done" || job.status === "failed";
+    }
+
+    function poll() {
+        fetch(box.dataset.url, { credentials: "same-origin" })
+            .then(function (r) { return r.json(); })
+            .then(function (job) { if (!show(job)) setTimeout(poll, 1000); })
+            .catch(function () { setTimeout(poll, 5000); });
+    }
+
+    if (box.dataset.status !== "done" && box.dataset.status !== "failed") poll();
+})();
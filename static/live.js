@@ -0,0 +1,106 @@
+// Live dashboard: applies pushed meeting events (see push.py) to the meetings
+// table and the counters, so the page never has to be reloaded to catch up.
+(function () {
+    var table = document.getElementById("meetings");
+    if (!table || !table.dataset.live || !window.EventSource) return;
+
+    var role = table.dataset.live;
+    var today = table.dataset.today;
+    var lastId = +table.dataset.lastId;   // our meetings above this id came after the page
+    var tbody = table.querySelector("tbody");
+    var statuses = {};                    // id -> status shown/counted
+
+    tbody.querySelectorAll("tr[data-id]").forEach(function (tr) {
+        statuses[tr.dataset.id] = tr.dataset.status;
+    });
+
+    function bump(name) {
+        var el = document.querySelector('[data-counter="' + name + '"]');
+        if (el) el.textContent = +el.textContent + 1;
+    }
+
+    function created(m) {
+        if (role === "staff") {
+            bump("total");
+            if (m.date >= today) bump("upcoming");
+        } else if (m.date === today) {
+            bump("today_meetings");
+        } else if (m.date > today) {
+            bump("upcoming_meetings");
+        }
+    }
+
+    function cell(text) {
+        var td = document.createElement("td");
+        td.textContent = text === null ? "" : text;
+        return td;
+    }
+
+    function addRow(m) {
+        var tr = document.createElement("tr");
+        tr.dataset.id = m.id;
+        tr.className = "table-warning";
+        tr.appendChild(cell(role === "staff" ? m.hod : m.staff));
+        tr.appendChild(cell(m.date));
+        tr.appendChild(cell(m.time));
+        tr.appendChild(cell(m.agenda));
+
+        var status = cell("");
+        if (role === "staff") {
+            var badge = document.createElement("span");
+            badge.className = "badge bg-secondary";
+            badge.dataset.field = "status";
+            status.appendChild(badge);
+        } else {
+            status.dataset.field = "status";
+        }
+        tr.appendChild(status);
+
+        var review = cell("");
+        review.dataset.field = "review";
+        tr.appendChild(review);
+
+        tbody.insertBefore(tr, tbody.firstChild);
+        return tr;
+    }
+
+    function showReview(td, m) {
+        td.textContent = "";
+        if (role === "hod" && m.status !== "Completed") {
+            var a = document.createElement("a");
+            a.href = table.dataset.reviewUrl.replace("/0/", "/" + m.id + "/");
+            a.className = "btn btn-sm btn-dark";
+            a.textContent = "Add Review";
+            td.appendChild(a);
+        } else if (role === "hod") {
+            td.innerHTML = '<span class="badge bg-info">Done</span>';
+        } else if (m.reviewed) {
+            td.innerHTML = '<span class="text-muted">Reviewed (reload to read)</span>';
+        } else {
+            td.innerHTML = '<span class="text-muted">—</span>';
+        }
+    }
+
+    function apply(m) {
+        var before = statuses[m.id];
+        var isNew = before === undefined && m.id > lastId;
+        if (isNew) created(m);
+        if (m.status === "Completed" && before !== "Completed") bump(role === "staff" ? "completed" : "completed_meetings");
+        statuses[m.id] = m.status;
+
+        // new meetings go on top; others only if they are on this page
+        var tr = tbody.querySelector('tr[data-id="' + m.id + '"]') || (isNew ? addRow(m) : null);
+        if (!tr) return;
+        tr.dataset.status = m.status;
+        tr.querySelector('[data-field="status"]').textContent = m.status;
+        var review = tr.querySelector('[data-field="review"]');
+        if (!review.querySelector("button")) showReview(review, m);
+    }
+
+    var source = new EventSource(table.dataset.url + "?since=" + table.dataset.since);
+    source.addEventListener("meeting", function (e) { apply(JSON.parse(e.data)); });
+    source.addEventListener("resync", function () {
+        source.close();
+        window.location.reload();
+    });
+})();
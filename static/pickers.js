@@ -0,0 +1,26 @@
+// "Load more" for <select> pickers: fetches the next keyset page
+// from the JSON list endpoint and appends it as <option>s.
+document.querySelectorAll("[data-load-more]").forEach(function (btn) {
+    btn.addEventListener("click", function () {
+        var select = document.getElementById(btn.dataset.target);
+        var url = btn.dataset.loadMore + "?after=" + encodeURIComponent(btn.dataset.after);
+
+        btn.disabled = true;
+        fetch(url, { credentials: "same-origin" })
+            .then(function (r) { return r.json(); })
+            .then(function (page) {
+                page.items.forEach(function (item) {
+                    var detail = item[btn.dataset.detail] || btn.dataset.fallback || "";
+                    select.add(new Option(item.name + " (" + detail + ")", item.id));
+                });
+
+                if (page.next) {
+                    btn.dataset.after = page.next;
+                    btn.disabled = false;
+                } else {
+                    btn.remove();
+                }
+            })
+            .catch(function () { btn.disabled = false; });
+    });
+});
@@ -0,0 +1,24 @@
+// Search-as-you-type: fills the input's <datalist> from the
+// autocomplete endpoint, at most one request in flight.
+document.querySelectorAll("[data-autocomplete]").forEach(function (input) {
+    var list = document.getElementById(input.getAttribute("list"));
+    var pending = null;
+
+    input.addEventListener("input", function () {
+        var q = input.value.trim();
+        if (q.length < 2) { return; }
+        if (pending) { pending.abort(); }
+        pending = new AbortController();
+
+        var url = "/api/v1/search/people?role=" + input.dataset.autocomplete + "&q=" + encodeURIComponent(q);
+        fetch(url, { credentials: "same-origin", signal: pending.signal })
+            .then(function (r) { return r.json(); })
+            .then(function (data) {
+                list.innerHTML = "";
+                data.items.forEach(function (item) {
+                    list.appendChild(new Option(item.email, item.name));
+                });
+            })
+            .catch(function () {});
+    });
+});
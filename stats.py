@@ -0,0 +1,67 @@
+from sqlalchemy import case, func, select
+
+from models import db, HOD, Staff, Meeting, Blocklist
+
+
+# ----------------------------------------------------
+# HELPERS
+# ----------------------------------------------------
+def _count(model):
+    return select(func.count()).select_from(model).scalar_subquery()
+
+
+def _sum_if(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _last(column):
+    return func.coalesce(func.max(column), 0)
+
+
+# ----------------------------------------------------
+# PRINCIPAL — all counters in one statement
+# ----------------------------------------------------
+def principal_stats():
+    row = db.session.execute(
+        select(
+            _count(HOD).label("hod_count"),
+            _count(Staff).label("staff_count"),
+            _count(Meeting).label("meeting_count"),
+            _count(Blocklist).label("blacklist_count"),
+        )
+    ).one()
+    return row._asdict()
+
+
+# ----------------------------------------------------
+# HOD — SUM(CASE ...) over the HOD's meetings
+# The last change_seq / meeting id are where a live
+# dashboard picks up (see push.py).
+# ----------------------------------------------------
+def hod_stats(hod_id, today):
+    row = db.session.execute(
+        select(
+            _sum_if(Meeting.date == today).label("today_meetings"),
+            _sum_if(Meeting.date > today).label("upcoming_meetings"),
+            _sum_if(Meeting.status == "Completed").label("completed_meetings"),
+            _last(Meeting.change_seq).label("last_change_seq"),
+            _last(Meeting.id).label("last_meeting_id"),
+        ).where(Meeting.hod_id == hod_id)
+    ).one()
+    return row._asdict()
+
+
+# ----------------------------------------------------
+# STAFF — SUM(CASE ...) over the staff member's meetings
+# ----------------------------------------------------
+def staff_stats(staff_id, today):
+    row = db.session.execute(
+        select(
+            func.count(Meeting.id).label("total"),
+            _sum_if(Meeting.date >= today).label("upcoming"),
+            _sum_if(Meeting.status == "Completed").label("completed"),
+            _last(Meeting.change_seq).label("last_change_seq"),
+            _last(Meeting.id).label("last_meeting_id"),
+        ).where(Meeting.staff_id == staff_id)
+    ).one()
+    return row._asdict()
@@ -0,0 +1,104 @@
+import os
+import sys
+from datetime import date, time, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import TestingConfig  # noqa: E402
+
+
+# ----------------------------------------------------
+# One seeded in-memory app for the whole run: the
+# identity, blocklist and table caches are module
+# globals, so a second app would see the first one's.
+# ----------------------------------------------------
+class QueryBudgetConfig(TestingConfig):
+    # caches re-check table versions only after local commits, so a
+    # warm request's query count doesn't depend on the clock
+    CACHE_VERSION_CHECK = None
+    IDENTITY_VERSION_CHECK = None
+    BLOCKLIST_VERSION_CHECK = None
+
+
+def add_campus(hods, staff, meetings_each):
+    # hods x staff pairs with meetings_each meetings per pair, half of
+    # them in the past (completed and reviewed), half upcoming
+    import reports
+    from models import db, Department, HOD, HODAvailability, Staff, Meeting, Review
+
+    department = db.session.query(Department).first()
+    start = db.session.query(HOD).count()
+    new_hods = [
+        HOD(name=f"Hod {start + i}", email=f"hod{start + i}@test.edu", password="password",
+            department_id=department.id)
+        for i in range(hods)
+    ]
+    start = db.session.query(Staff).count()
+    new_staff = [
+        Staff(name=f"Staff {start + i}", email=f"staff{start + i}@test.edu", password="password")
+        for i in range(staff)
+    ]
+    db.session.add_all(new_hods + new_staff)
+    db.session.flush()
+
+    today = date.today()
+    for hod in new_hods:
+        db.session.add(HODAvailability(hod_id=hod.id, date=today + timedelta(days=1),
+                                       start_time=time(10), end_time=time(12)))
+        for member in new_staff:
+            for i in range(meetings_each):
+                past = i % 2 == 0
+                meeting = Meeting(
+                    hod_id=hod.id, staff_id=member.id,
+                    date=today + timedelta(days=-(i + 1) if past else i + 1),
+                    time=time(9 + i % 8), agenda=f"Planning review {i}",
+                    status="Completed" if past else "Scheduled",
+                )
+                db.session.add(meeting)
+                if past:
+                    db.session.add(Review(meeting=meeting, summary="Budget agreed"))
+    db.session.flush()
+    reports.rebuild()
+    db.session.commit()
+    return new_hods[0].id, new_staff[0].id
+
+
+@pytest.fixture(scope="session")
+def app():
+    from app import create_app
+    import database
+    from models import db
+
+    app = create_app(QueryBudgetConfig)
+    with app.app_context():
+        db.create_all()
+        database.seed()
+        db.session.commit()
+    return app
+
+
+@pytest.fixture(scope="session")
+def campus(app):
+    # (hod_id, staff_id) of a HOD and a staff member with meetings
+    with app.app_context():
+        return add_campus(hods=3, staff=4, meetings_each=2)
+
+
+def login(client, role, ident):
+    with client.session_transaction() as s:
+        s["role"] = role
+        s["id"] = ident
+        s["name"] = "test"
+    return client
+
+
+@pytest.fixture
+def clients(app, campus):
+    hod_id, staff_id = campus
+    return {
+        "principal": login(app.test_client(), "principal", 1),
+        "hod": login(app.test_client(), "hod", hod_id),
+        "staff": login(app.test_client(), "staff", staff_id),
+    }
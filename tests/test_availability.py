@@ -0,0 +1,53 @@
+from datetime import date, time, timedelta
+
+import availability
+from conftest import add_campus
+from models import db
+
+# ----------------------------------------------------
+# RECURRING OFFICE HOURS
+# ----------------------------------------------------
+MONDAY = date(2030, 1, 7)
+
+
+def test_weekly_occurrences_with_skip_and_end():
+    days = list(availability.occurrences(
+        MONDAY, MONDAY + timedelta(weeks=3), 1, MONDAY, MONDAY + timedelta(weeks=10),
+        skipped={MONDAY + timedelta(weeks=1)},
+    ))
+    assert days == [MONDAY, MONDAY + timedelta(weeks=2), MONDAY + timedelta(weeks=3)]
+
+
+def test_fortnightly_occurrences_keep_to_the_rule_weeks():
+    # asked from a week the rule skips: the first day is the following one
+    days = list(availability.occurrences(
+        MONDAY, None, 2, MONDAY + timedelta(days=8), MONDAY + timedelta(weeks=7),
+    ))
+    assert days == [MONDAY + timedelta(weeks=2), MONDAY + timedelta(weeks=4), MONDAY + timedelta(weeks=6)]
+
+
+def test_rule_windows_follow_skip_and_end(app):
+    today = date.today()
+    with app.app_context():
+        hod_id, _ = add_campus(hods=1, staff=1, meetings_each=0)
+        starts_on = today - timedelta(weeks=2)
+        rule = availability.add_rule(hod_id, starts_on, time(14), time(15), "weekly")
+        db.session.commit()
+
+        window = (today - timedelta(weeks=2), today + timedelta(weeks=2))
+        assert [w[0] for w in availability.windows(hod_id, *window) if w[3] == rule.id] == [
+            starts_on + timedelta(weeks=i) for i in range(5)
+        ]
+
+        assert availability.skip(rule, today + timedelta(weeks=1))
+        assert not availability.skip(rule, today + timedelta(days=1))
+        availability.end_rule(rule, today)
+        db.session.commit()
+        assert [w[0] for w in availability.windows(hod_id, *window) if w[3] == rule.id] == [
+            starts_on, starts_on + timedelta(weeks=1)
+        ]
+
+        # ending it again doesn't bring back the days it already lost
+        availability.end_rule(rule, today + timedelta(weeks=4))
+        db.session.commit()
+        assert rule.ends_on == today - timedelta(days=1)
@@ -0,0 +1,28 @@
+from conftest import add_campus, login
+from instrumentation import assert_max_queries
+
+# ----------------------------------------------------
+# DASHBOARDS DON'T QUERY PER ROW
+# The same budget must hold after the campus (and each
+# dashboard's own meeting list) has grown several-fold.
+# ----------------------------------------------------
+BUDGETS = {"principal": 1, "hod": 3, "staff": 3}
+
+
+def _check_dashboards(app, hod_id, staff_id):
+    ids = {"principal": 1, "hod": hod_id, "staff": staff_id}
+    for role, budget in BUDGETS.items():
+        client = login(app.test_client(), role, ids[role])
+        url = f"/dashboard/{role}"
+        assert client.get(url).status_code == 200
+        with assert_max_queries(budget):
+            response = client.get(url)
+        assert response.status_code == 200
+
+
+def test_dashboard_queries_do_not_grow_with_data(app, campus):
+    _check_dashboards(app, *campus)
+
+    with app.app_context():
+        hod_id, staff_id = add_campus(hods=6, staff=10, meetings_each=6)
+    _check_dashboards(app, hod_id, staff_id)
@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+
+from sqlalchemy import func, select
+
+from conftest import add_campus, login
+from models import db, Meeting, Review
+
+# ----------------------------------------------------
+# REPLAYED SUBMISSIONS AND STALE FORMS
+# ----------------------------------------------------
+def _flashes(client):
+    with client.session_transaction() as s:
+        return s.pop("_flashes", [])
+
+
+def test_replayed_idempotency_key_creates_one_meeting(app):
+    with app.app_context():
+        hod_id, staff_id = add_campus(hods=1, staff=1, meetings_each=0)
+    client = login(app.test_client(), "staff", staff_id)
+    form = {
+        "hod_id": hod_id,
+        "date": (date.today() + timedelta(days=1)).isoformat(),   # add_campus: 10:00-12:00
+        "time": "10:30",
+        "agenda": "Lab budget",
+    }
+
+    first = client.post("/meeting/request", data=form, headers={"Idempotency-Key": "lab-budget-1"})
+    assert first.location == "/dashboard/staff"
+    assert _flashes(client) == [("success", "Meeting requested!")]
+
+    again = client.post("/meeting/request", data=form, headers={"Idempotency-Key": "lab-budget-1"})
+    assert again.location == "/dashboard/staff"
+    assert [category for category, _ in _flashes(client)] == ["info"]
+
+    with app.app_context():
+        assert db.session.execute(
+            select(func.count()).select_from(Meeting).where(Meeting.staff_id == staff_id)
+        ).scalar() == 1
+
+
+def test_review_of_a_changed_meeting_is_rejected(app):
+    with app.app_context():
+        hod_id, _ = add_campus(hods=1, staff=1, meetings_each=2)
+        meeting = db.session.execute(
+            select(Meeting).where(Meeting.hod_id == hod_id, Meeting.status == "Scheduled")
+        ).scalar_one()
+        meeting_id, version = meeting.id, meeting.version
+    client = login(app.test_client(), "hod", hod_id)
+    form = {"summary": "Agreed", "improvements": "-", "suggestions": "-"}
+
+    stale = client.post(f"/meeting/{meeting_id}/review", data=dict(form, version=version - 1))
+    assert stale.location == f"/meeting/{meeting_id}/review"
+    assert [category for category, _ in _flashes(client)] == ["warning"]
+    with app.app_context():
+        assert db.session.execute(select(Review.id).where(Review.meeting_id == meeting_id)).first() is None
+
+    fresh = client.post(f"/meeting/{meeting_id}/review", data=dict(form, version=version))
+    assert fresh.location == "/dashboard/hod"
+    with app.app_context():
+        assert db.session.get(Meeting, meeting_id).status == "Completed"
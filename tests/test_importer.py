@@ -0,0 +1,58 @@
+import io
+
+from sqlalchemy import func, select
+
+import importer
+from models import db, Staff
+
+# ----------------------------------------------------
+# CSV IMPORT
+# ----------------------------------------------------
+ROWS = (
+    "name,email,password\n"
+    "Asha Rao,asha.import@test.edu,pw\n"      # line 2: fine
+    ",nobody.import@test.edu,pw\n"            # line 3: no name
+    "Ben Das,not-an-email,pw\n"               # line 4: bad email
+    "Asha R,ASHA.import@test.edu,pw\n"        # line 5: same email as line 2
+    "Carl Dias,carl.import@test.edu,pw\n"     # line 6: fine
+)
+
+
+def _staff_count():
+    return db.session.execute(select(func.count()).select_from(Staff)).scalar()
+
+
+def test_row_errors_are_reported_by_line(app):
+    with app.app_context():
+        before = _staff_count()
+        report = importer.import_csv("staff", io.StringIO(ROWS))
+
+        assert report.rows == 5
+        assert [line for line, _ in report.errors] == [3, 4, 5]
+        assert report.inserted == 2
+        assert _staff_count() == before + 2
+
+        # the same file again: every email is taken now
+        again = importer.import_csv("staff", io.StringIO(ROWS))
+        assert again.inserted == 0
+        assert [line for line, message in again.errors if "already exists" in message] == [2, 6]
+
+
+def test_dry_run_leaves_the_database_untouched(app):
+    with app.app_context():
+        before = _staff_count()
+        report = importer.import_csv("staff", io.StringIO(ROWS.replace(".import@", ".dry@")), dry_run=True)
+
+        assert report.rows == 5 and len(report.errors) == 3
+        assert report.inserted == 0
+        assert _staff_count() == before
+
+
+def test_missing_columns_and_unreadable_files(app):
+    with app.app_context():
+        report = importer.import_csv("staff", io.StringIO("name,email\nA,a@b.c\n"))
+        assert report.errors == [(1, "missing column(s): password")]
+
+        upload = io.BytesIO("name,email,password\nJos\xe9,j@b.c,pw\n".encode("latin-1"))
+        report = importer.import_csv("staff", io.TextIOWrapper(upload, encoding="utf-8", newline=""))
+        assert report.failed and report.inserted == 0
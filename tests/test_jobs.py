@@ -0,0 +1,52 @@
+from datetime import date, time, timedelta
+
+from sqlalchemy import func, select, update
+
+import jobs
+import meetings
+from conftest import add_campus
+from models import db, Job, Meeting
+
+# ----------------------------------------------------
+# JOB LEASES
+# A worker that dies mid-job leaves its lease to run
+# out; the next claim resumes from the checkpoint and
+# repeats none of the committed chunks.
+# ----------------------------------------------------
+class DiesAfterFirstChunk(jobs.JobContext):
+    def advance(self, progress, total=None, checkpoint=None):
+        super().advance(progress, total, checkpoint)
+        if checkpoint is not None:
+            raise SystemExit("worker killed")
+
+
+def test_job_resumes_from_checkpoint_after_lease_expires(app, monkeypatch):
+    monkeypatch.setattr(meetings, "BULK_CHUNK_SIZE", 2)
+    day = date.today() + timedelta(days=30)
+    with app.app_context():
+        _, first_staff = add_campus(hods=1, staff=5, meetings_each=0)
+        staff_ids = list(range(first_staff, first_staff + 5))
+        job_id = meetings.enqueue_bulk("selected", day, time(11), "Exam duty", staff_ids=staff_ids)
+        db.session.commit()
+
+        row = jobs._claim("dead-worker")
+        assert row.id == job_id
+        job = DiesAfterFirstChunk(row, "dead-worker", app.config["JOB_LEASE"])
+        try:
+            meetings.run_bulk_schedule(job)
+        except SystemExit:
+            db.session.rollback()
+
+        # the lease runs out
+        db.session.execute(update(Job).where(Job.id == job_id).values(locked_until=0))
+        db.session.commit()
+        jobs.run_pending()
+
+        job = db.session.get(Job, job_id)
+        assert (job.status, job.attempts, job.progress) == ("done", 2, 5)
+        booked = db.session.execute(
+            select(Meeting.staff_id, func.count())
+            .where(Meeting.date == day, Meeting.agenda == "Exam duty")
+            .group_by(Meeting.staff_id)
+        ).all()
+        assert sorted(booked) == [(staff_id, 1) for staff_id in staff_ids]
@@ -0,0 +1,36 @@
+import pytest
+
+from instrumentation import assert_max_queries
+
+# ----------------------------------------------------
+# QUERY BUDGETS
+# Each route is requested once to warm the caches, then
+# must stay within its budget on the next request.
+# ----------------------------------------------------
+BUDGETS = [
+    ("principal", "/dashboard/principal", 1),
+    ("hod", "/dashboard/hod", 3),
+    ("staff", "/dashboard/staff", 3),
+
+    ("principal", "/principal/search/staff?q=staff", 2),
+    ("principal", "/principal/search/hod?q=hod", 2),
+    ("principal", "/principal/search/meetings?q=planning", 3),
+    ("principal", "/api/v1/search/people?q=sta", 2),
+    ("principal", "/api/v1/search/meetings?q=planning", 4),
+
+    ("principal", "/api/v1/meetings", 2),
+    ("hod", "/api/v1/meetings", 2),
+    ("staff", "/api/v1/meetings", 2),
+    ("principal", "/api/v1/staff", 2),
+    ("principal", "/api/v1/hods", 2),
+    ("hod", "/api/v1/availability", 2),
+]
+
+
+@pytest.mark.parametrize("role, url, budget", BUDGETS)
+def test_query_budget(clients, role, url, budget):
+    client = clients[role]
+    assert client.get(url).status_code == 200
+    with assert_max_queries(budget):
+        response = client.get(url)
+    assert response.status_code == 200
@@ -0,0 +1,33 @@
+from datetime import date, time, timedelta
+
+from conftest import add_campus, login
+from models import db, Meeting
+
+# ----------------------------------------------------
+# DELTA SYNC (/api/v1/meetings/changes)
+# ----------------------------------------------------
+def test_sync_token_returns_only_later_changes(app):
+    with app.app_context():
+        hod_id, staff_id = add_campus(hods=1, staff=1, meetings_each=2)
+    client = login(app.test_client(), "staff", staff_id)
+
+    first = client.get("/api/v1/meetings/changes").get_json()
+    assert len(first["items"]) == 2 and not first["more"]
+
+    nothing = client.get("/api/v1/meetings/changes", query_string={"since": first["sync_token"]}).get_json()
+    assert nothing["items"] == []
+
+    with app.app_context():
+        meeting = Meeting(staff_id=staff_id, hod_id=hod_id, date=date.today() + timedelta(days=5),
+                          time=time(15), agenda="Timetable", status="Requested")
+        db.session.add(meeting)
+        db.session.commit()
+        meeting_id = meeting.id
+
+    later = client.get("/api/v1/meetings/changes", query_string={"since": first["sync_token"]}).get_json()
+    assert [item["id"] for item in later["items"]] == [meeting_id]
+
+
+def test_bad_sync_token_is_rejected(clients):
+    response = clients["staff"].get("/api/v1/meetings/changes?since=not-a-token")
+    assert response.status_code == 400
@@ -0,0 +1,110 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models import db, TableVersion
+
+# ----------------------------------------------------
+# PER-TABLE CHANGE COUNTERS
+# Every flush that touches a mapped table bumps that
+# table's row in table_version inside the same
+# transaction, so any process can tell whether its
+# cached view of a table is stale with one PK lookup.
+# ----------------------------------------------------
+UPSERT_DIALECTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+# bumped here and then committed: caches in this process
+# can look again straight away instead of waiting out
+# their version-check interval
+_local = {"pending": False, "generation": 0}
+
+
+def local_generation():
+    return _local["generation"]
+
+
+def bump(*names, connection=None):
+    conn = connection if connection is not None else db.session.connection()
+    for name in names:
+        _increment(conn, name)
+
+
+def next_version(name, connection=None):
+    # bump one counter and return its new value (see changes.py)
+    conn = connection if connection is not None else db.session.connection()
+    return _increment(conn, name, returning=True)
+
+
+def _increment(conn, name, returning=False):
+    _local["pending"] = True
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    table = TableVersion.__table__
+    insert = UPSERT_DIALECTS.get(conn.dialect.name)
+
+    if insert is not None:
+        stmt = insert(table).values(name=name, version=1, updated_at=now).on_conflict_do_update(
+            index_elements=[table.c.name],
+            set_={"version": table.c.version + 1, "updated_at": now},
+        )
+        if returning:
+            return conn.execute(stmt.returning(table.c.version)).scalar()
+        conn.execute(stmt)
+        return None
+
+    result = conn.execute(
+        table.update()
+        .where(table.c.name == name)
+        .values(version=table.c.version + 1, updated_at=now)
+    )
+    if result.rowcount == 0:
+        conn.execute(table.insert().values(name=name, version=1, updated_at=now))
+    if returning:
+        return conn.execute(select(table.c.version).where(table.c.name == name)).scalar()
+    return None
+
+
+def get(name):
+    return db.session.execute(
+        select(TableVersion.version).where(TableVersion.name == name)
+    ).scalar() or 0
+
+
+def snapshot(*names):
+    rows = db.session.execute(
+        select(TableVersion.name, TableVersion.version, TableVersion.updated_at)
+        .where(TableVersion.name.in_(names))
+    )
+    found = {name: (version, updated_at) for name, version, updated_at in rows}
+    return {name: found.get(name, (0, None)) for name in names}
+
+
+@event.listens_for(db.session, "after_flush")
+def _bump_flushed_tables(session, flush_context):
+    changed = [
+        *session.new,
+        *(obj for obj in session.dirty if session.is_modified(obj)),
+        *session.deleted,
+    ]
+    names = {obj.__table__.name for obj in changed if not isinstance(obj, TableVersion)}
+    # tables a before_flush hook has already bumped for this flush
+    names -= session.info.pop("versions_bumped", set())
+    if names:
+        bump(*sorted(names), connection=session.connection())
+
+
+@event.listens_for(db.session, "after_commit")
+def _count_local_commit(session):
+    if _local["pending"]:
+        _local["pending"] = False
+        _local["generation"] += 1
+
+
+@event.listens_for(db.session, "after_soft_rollback")
+def _forget_flush_bumps(session, previous_transaction):
+    # a flush that failed after before_flush never reached after_flush
+    session.info.pop("versions_bumped", None)
@@ -0,0 +1,9 @@
+from app import create_app
+
+# gunicorn wsgi:app
+#
+# Live dashboards (PUSH_ENABLED=1, see push.py) keep a request open per
+# viewer, which would tie up sync workers; turn them on only with threaded
+# or async workers, e.g.
+#   PUSH_ENABLED=1 gunicorn -k gthread --threads 32 wsgi:app
+app = create_app()